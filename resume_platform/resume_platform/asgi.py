@@ -14,3 +14,9 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'resume_platform.settings')
 
 application = get_asgi_application()
+
+from django.conf import settings  # noqa: E402
+from resume_platform.warmup import warm_up  # noqa: E402
+
+if settings.WORKER_WARM_UP:
+    warm_up()
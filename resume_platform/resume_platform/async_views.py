@@ -0,0 +1,40 @@
+import asyncio
+from asgiref.sync import sync_to_async
+from rest_framework.views import APIView
+
+
+class AsyncAPIView(APIView):
+    """
+    APIView whose dispatch awaits async handlers.
+
+    DRF's own dispatch is synchronous and would hand the coroutine returned by
+    an `async def` handler straight to finalize_response. Authentication,
+    permission and throttle checks may hit the database, so they run in a
+    worker thread before the handler is awaited on the event loop.
+    """
+
+    async def dispatch(self, request, *args, **kwargs):
+        """Run the DRF request cycle, awaiting the handler if it is async."""
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(self, request.method.lower(), self.http_method_not_allowed)
+            else:
+                handler = self.http_method_not_allowed
+
+            response = handler(request, *args, **kwargs)
+            if asyncio.iscoroutine(response):
+                response = await response
+
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
@@ -0,0 +1,167 @@
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+PRIMARY = 'default'
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+# True while the current request or task must read from the primary
+_pinned = ContextVar('db_pinned_to_primary', default=False)
+# Set by read_your_writes(): records whether the scope has written. Tasks
+# started inside the scope copy the context and so share the record.
+_writes = ContextVar('db_scope_writes', default=None)
+
+
+def replica_aliases():
+    """Aliases of the configured read replicas."""
+    return list(settings.DATABASE_REPLICAS)
+
+
+class PrimaryReplicaRouter:
+    """
+    Sends writes to the primary and safe reads to a random replica.
+
+    Reads stay on the primary inside a transaction, after anything in the
+    current read_your_writes() scope (each request is one) has written, and
+    while the user is pinned by ReplicaStickinessMiddleware after a recent
+    write. Outside a scope, such as in management commands, writes pin
+    nothing; wrap reads that must see them in use_primary().
+    """
+
+    def __init__(self):
+        self.replicas = replica_aliases()
+
+    def db_for_read(self, model, **hints):
+        if not self.replicas or _pinned.get() or connections[PRIMARY].in_atomic_block:
+            return PRIMARY
+        writes = _writes.get()
+        if writes is not None and writes['written']:
+            return PRIMARY
+        return random.choice(self.replicas)
+
+    def db_for_write(self, model, **hints):
+        # Whatever runs after a write in this scope must see it
+        writes = _writes.get()
+        if writes is not None:
+            writes['written'] = True
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same data as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas get the schema by replication
+        return db not in self.replicas
+
+
+@contextmanager
+def use_primary():
+    """Read from the primary for the duration of the block."""
+    token = _pinned.set(True)
+    try:
+        yield
+    finally:
+        _pinned.reset(token)
+
+
+@contextmanager
+def read_your_writes():
+    """Reads in the block that follow a write in the block go to the primary."""
+    token = _writes.set({'written': False})
+    try:
+        yield
+    finally:
+        _writes.reset(token)
+
+
+def _sticky_key(user_id):
+    return f"db-primary-pin:{user_id}"
+
+
+def _token_user_id(request):
+    """User id from the request's bearer token, without touching the database."""
+    header = request.META.get(jwt_settings.AUTH_HEADER_NAME, '')
+    parts = header.split()
+    if len(parts) != 2 or parts[0] not in jwt_settings.AUTH_HEADER_TYPES:
+        return None
+    try:
+        return AccessToken(parts[1]).get(jwt_settings.USER_ID_CLAIM)
+    except TokenError:
+        return None
+
+
+class ReplicaStickinessMiddleware:
+    """
+    Gives each user read-your-writes consistency across requests.
+
+    A successful unsafe request pins its user to the primary for
+    DATABASE_REPLICA_STICKY_SECONDS, recorded in the cache so every worker
+    sharing it sees the pin. Requests from a pinned user read only from
+    the primary until the window expires.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.enabled = bool(replica_aliases())
+        self.sticky_seconds = settings.DATABASE_REPLICA_STICKY_SECONDS
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not self.enabled:
+            return self.get_response(request)
+
+        user_id = _token_user_id(request)
+        pinned = user_id is not None and bool(cache.get(_sticky_key(user_id)))
+        with read_your_writes(), self._pin(pinned):
+            response = self.get_response(request)
+
+        user_id = self._written_user_id(request, response, user_id)
+        if user_id is not None:
+            cache.set(_sticky_key(user_id), True, self.sticky_seconds)
+        return response
+
+    async def __acall__(self, request):
+        if not self.enabled:
+            return await self.get_response(request)
+
+        user_id = _token_user_id(request)
+        pinned = user_id is not None and bool(await cache.aget(_sticky_key(user_id)))
+        with read_your_writes(), self._pin(pinned):
+            response = await self.get_response(request)
+
+        user_id = self._written_user_id(request, response, user_id)
+        if user_id is not None:
+            await cache.aset(_sticky_key(user_id), True, self.sticky_seconds)
+        return response
+
+    @contextmanager
+    def _pin(self, pinned):
+        token = _pinned.set(pinned)
+        try:
+            yield
+        finally:
+            _pinned.reset(token)
+
+    def _written_user_id(self, request, response, user_id):
+        """The user to pin after a successful unsafe request, else None."""
+        if request.method in SAFE_METHODS or response.status_code >= 400:
+            return None
+        # DRF authenticates inside the view and stores the user on the request
+        user = getattr(request, 'user', None)
+        if user is not None and user.is_authenticated:
+            return user.pk
+        return user_id
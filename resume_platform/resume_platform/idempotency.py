@@ -0,0 +1,154 @@
+import json
+import time
+import hashlib
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework import status
+from rest_framework.exceptions import APIException, ValidationError
+from rest_framework.response import Response
+
+HEADER = 'Idempotency-Key'
+MAX_KEY_LENGTH = 255
+# Response headers worth replaying alongside the body
+REPLAYED_HEADERS = ('Location',)
+
+
+class IdempotencyKeyInUse(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = 'A request with this Idempotency-Key is still in progress; retry shortly.'
+    default_code = 'idempotency_key_in_use'
+
+
+class IdempotencyKeyReused(APIException):
+    status_code = status.HTTP_422_UNPROCESSABLE_ENTITY
+    default_detail = 'This Idempotency-Key was already used with a different request.'
+    default_code = 'idempotency_key_reused'
+
+
+class _Replay(Exception):
+    """Carries a stored response out of the request checks."""
+
+    def __init__(self, response):
+        self.response = response
+
+
+def request_fingerprint(request):
+    """
+    Hash of the request body, so a key reused for a different request is
+    caught. Uploaded files count by name and size rather than content.
+    """
+    files = request.FILES
+    data = request.data
+    if hasattr(data, 'lists'):
+        fields = sorted((name, values) for name, values in data.lists() if name not in files)
+    else:
+        fields = data
+    uploads = sorted(
+        (name, [(upload.name, upload.size) for upload in uploads]) for name, uploads in files.lists()
+    )
+    payload = json.dumps([fields, uploads], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class IdempotencyMixin:
+    """
+    Honour an Idempotency-Key header on POST requests.
+
+    The first request with a key claims it in the cache and runs; its
+    response is stored for IDEMPOTENCY_TTL_SECONDS and replayed, with an
+    Idempotent-Replayed header, to any repeat of the same request by the
+    same user on the same path. A repeat that arrives while the original
+    is still running waits up to IDEMPOTENCY_WAIT_SECONDS for its response
+    instead of running again, then gets a 409. Server errors and throttled
+    requests release the key so a retry runs afresh.
+
+    The key is checked after authentication and permissions but before
+    throttles, so replays don't use up AI quota. Viewsets may limit keys to
+    some actions with `idempotent_actions`. Claims only exclude each other
+    across workers when the cache backend is shared.
+    """
+
+    idempotent_actions = None
+
+    def check_throttles(self, request):
+        self._idempotency_key = None
+        if self._is_idempotent(request):
+            self._claim_idempotency_key(request)
+        super().check_throttles(request)
+
+    def handle_exception(self, exc):
+        if isinstance(exc, _Replay):
+            return exc.response
+        try:
+            return super().handle_exception(exc)
+        except Exception:
+            # Uncaught errors never reach finalize_response
+            self._release_idempotency_key()
+            raise
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        if getattr(self, '_idempotency_key', None) is not None:
+            if response.status_code >= 500 or response.status_code == 429 or not hasattr(response, 'data'):
+                self._release_idempotency_key()
+            else:
+                self._store_idempotent_response(response)
+        return response
+
+    def _is_idempotent(self, request):
+        if request.method != 'POST' or HEADER not in request.headers:
+            return False
+        if not request.user or not request.user.is_authenticated:
+            return False
+        return self.idempotent_actions is None or getattr(self, 'action', None) in self.idempotent_actions
+
+    def _claim_idempotency_key(self, request):
+        key = request.headers[HEADER].strip()
+        if not key or len(key) > MAX_KEY_LENGTH:
+            raise ValidationError({HEADER: f'Must be 1 to {MAX_KEY_LENGTH} characters.'})
+
+        digest = hashlib.sha256(key.encode()).hexdigest()
+        cache_key = f"idempotency:{request.user.pk}:{request.path}:{digest}"
+        fingerprint = request_fingerprint(request)
+        deadline = time.monotonic() + settings.IDEMPOTENCY_WAIT_SECONDS
+        delay = 0.05
+
+        while True:
+            pending = {'state': 'pending', 'fingerprint': fingerprint}
+            if cache.add(cache_key, pending, timeout=settings.IDEMPOTENCY_LOCK_SECONDS):
+                self._idempotency_key = (cache_key, fingerprint)
+                return
+
+            record = cache.get(cache_key)
+            if record is None:
+                # Released or expired since the add; try to claim it again
+                continue
+            if record['fingerprint'] != fingerprint:
+                raise IdempotencyKeyReused()
+            if record['state'] == 'done':
+                raise _Replay(Response(
+                    record['data'],
+                    status=record['status'],
+                    headers={**record['headers'], 'Idempotent-Replayed': 'true'}
+                ))
+
+            if time.monotonic() >= deadline:
+                raise IdempotencyKeyInUse()
+            time.sleep(delay)
+            delay = min(delay * 2, 0.5)
+
+    def _store_idempotent_response(self, response):
+        cache_key, fingerprint = self._idempotency_key
+        cache.set(cache_key, {
+            'state': 'done',
+            'fingerprint': fingerprint,
+            'status': response.status_code,
+            'data': response.data,
+            'headers': {name: response[name] for name in REPLAYED_HEADERS if response.has_header(name)},
+        }, timeout=settings.IDEMPOTENCY_TTL_SECONDS)
+        self._idempotency_key = None
+
+    def _release_idempotency_key(self):
+        if getattr(self, '_idempotency_key', None) is not None:
+            cache.delete(self._idempotency_key[0])
+            self._idempotency_key = None
@@ -0,0 +1,212 @@
+import re
+import time
+import traceback
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+# Collapses placeholder lists so IN (%s, %s) and IN (%s, %s, %s) share a shape
+PLACEHOLDER_LIST = re.compile(r'\((?:\s*%s\s*,)+\s*%s\s*\)')
+LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+\b")
+WHITESPACE = re.compile(r'\s+')
+# Nested atomic blocks repeat these by design; they count, but are never an N+1
+TRANSACTION_CONTROL = re.compile(r'^\s*(BEGIN|COMMIT|ROLLBACK|SAVEPOINT|RELEASE)\b', re.IGNORECASE)
+# Allowed on top of a view's budget: authentication reads the user's
+# auth_version when it isn't cached, or the user for tokens without claims
+AUTHENTICATION_QUERIES = 1
+
+# Reports of the recordings active in this context, outermost first
+_recorders = ContextVar('query_recorders', default=())
+
+
+def normalize_sql(sql):
+    """Reduce a statement to its shape: literals and placeholder lists collapsed."""
+    sql = PLACEHOLDER_LIST.sub('(...)', sql)
+    sql = LITERALS.sub('?', sql)
+    return WHITESPACE.sub(' ', sql).strip()
+
+
+def _caller():
+    """The innermost frame in project code, skipping this module."""
+    base_dir = str(settings.BASE_DIR)
+    for frame in reversed(traceback.extract_stack()[:-3]):
+        if frame.filename.startswith(base_dir) and 'site-packages' not in frame.filename \
+                and frame.filename != __file__:
+            return frame
+    return None
+
+
+class QueryReport:
+    """The statements run while recording, grouped by shape."""
+
+    def __init__(self):
+        self.queries = []
+        self.shapes = Counter()
+        self.callers = {}
+
+    def add(self, sql, duration):
+        self.queries.append((sql, duration))
+        if TRANSACTION_CONTROL.match(sql):
+            return
+        shape = normalize_sql(sql)
+        self.shapes[shape] += 1
+        if self.shapes[shape] == 1:
+            self.callers[shape] = _caller()
+
+    @property
+    def count(self):
+        return len(self.queries)
+
+    @property
+    def duration(self):
+        return sum(duration for _, duration in self.queries)
+
+    def repeated_shapes(self, threshold=None):
+        """[(shape, count, caller frame)] for shapes run at least `threshold` times."""
+        threshold = threshold or settings.QUERY_INSPECTION_REPEAT_THRESHOLD
+        return [
+            (shape, count, self.callers[shape])
+            for shape, count in self.shapes.most_common() if count >= threshold
+        ]
+
+    def describe(self, threshold=None):
+        lines = [f"{self.count} queries in {self.duration * 1000:.1f} ms"]
+        for shape, count, frame in self.repeated_shapes(threshold):
+            location = f"{frame.filename}:{frame.lineno} in {frame.name}" if frame else 'unknown caller'
+            lines.append(f"  N+1: {count}x from {location}\n    {shape[:300]}")
+        return '\n'.join(lines)
+
+
+def _record(execute, sql, params, many, context):
+    reports = _recorders.get()
+    if not reports:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        duration = time.perf_counter() - started
+        for report in reports:
+            report.add(sql, duration)
+
+
+def _install(connection):
+    if _record not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_record)
+
+
+@receiver(connection_created)
+def install_query_recorder(sender, connection, **kwargs):
+    """Every new connection reports to whichever recording is active in its context."""
+    _install(connection)
+
+
+@contextmanager
+def record_queries():
+    """
+    Record every statement run in this context, including ORM calls that
+    sync_to_async runs in another thread, since the context is copied.
+    Recordings nest: a statement counts in every enclosing one.
+    """
+    for connection in connections.all(initialized_only=True):
+        _install(connection)
+    report = QueryReport()
+    token = _recorders.set((*_recorders.get(), report))
+    try:
+        yield report
+    finally:
+        _recorders.reset(token)
+
+
+class QueryBudgetExceeded(AssertionError):
+    """A request ran more queries than its view allows, or repeated a query shape."""
+
+
+def view_query_budget(request):
+    """
+    The budget the view serving the request declares, or None.
+
+    Views declare `query_budget = n`; viewsets may also declare per-action
+    budgets as `query_budgets = {'list': n, 'export': m}`.
+    """
+    match = getattr(request, 'resolver_match', None)
+    view_class = getattr(match.func, 'cls', None) if match else None
+    if view_class is None:
+        return None
+    actions = getattr(match.func, 'actions', None) or {}
+    action = actions.get(request.method.lower())
+    return getattr(view_class, 'query_budgets', {}).get(action, getattr(view_class, 'query_budget', None))
+
+
+@contextmanager
+def assert_query_budget(budget=None, allow_repeats=False):
+    """
+    Test helper: fail if the block runs more than `budget` queries or, unless
+    allow_repeats is set, repeats a statement shape (an N+1 pattern).
+    """
+    with record_queries() as report:
+        yield report
+    if budget is not None and report.count > budget:
+        raise QueryBudgetExceeded(f"Query budget of {budget} exceeded: {report.describe()}")
+    if not allow_repeats and report.repeated_shapes():
+        raise QueryBudgetExceeded(f"Repeated queries detected: {report.describe()}")
+
+
+class QueryInspectionMiddleware:
+    """
+    Development middleware recording the SQL of each request.
+
+    Settings only install it while QUERY_INSPECTION is on. Prints the
+    statement shapes repeated QUERY_INSPECTION_REPEAT_THRESHOLD or more
+    times, with the project frame that issued them, and checks the count
+    against the view's declared budget plus AUTHENTICATION_QUERIES. With QUERY_INSPECTION_STRICT, as in
+    tests, an overrun or repeat raises QueryBudgetExceeded instead, failing
+    the request. Async-capable, so it doesn't put ASGI requests in a thread.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not settings.QUERY_INSPECTION:
+            return self.get_response(request)
+
+        with record_queries() as report:
+            response = self.get_response(request)
+        return self._inspect(request, response, report)
+
+    async def __acall__(self, request):
+        if not settings.QUERY_INSPECTION:
+            return await self.get_response(request)
+
+        # The recording follows the request into the threads its ORM calls run in
+        with record_queries() as report:
+            response = await self.get_response(request)
+        return self._inspect(request, response, report)
+
+    def _inspect(self, request, response, report):
+        response['X-Query-Count'] = str(report.count)
+        budget = view_query_budget(request)
+        problems = []
+        if budget is not None and report.count > budget + AUTHENTICATION_QUERIES:
+            problems.append(f"over its budget of {budget} (+{AUTHENTICATION_QUERIES} for authentication)")
+        if report.repeated_shapes():
+            problems.append("repeating queries")
+        if problems:
+            message = f"{request.method} {request.path} is {' and '.join(problems)}: {report.describe()}"
+            if settings.QUERY_INSPECTION_STRICT:
+                raise QueryBudgetExceeded(message)
+            print(message)
+        return response
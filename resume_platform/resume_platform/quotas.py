@@ -0,0 +1,121 @@
+import math
+import time
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.throttling import BaseThrottle
+
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+def parse_rate(rate):
+    """Turn a rate like '20/hour' into (limit, window in seconds)."""
+    count, period = rate.split('/')
+    return int(count), PERIODS[period[0]]
+
+
+class AIQuotaThrottle(BaseThrottle):
+    """
+    Per-user, per-endpoint quota on AI-backed views.
+
+    The view names its quota with `throttle_scope`; the limit comes from
+    AI_QUOTA_RATES for that scope and the user's subscription_status.
+    Usage is a sliding-window counter: one cache counter per fixed window,
+    with the previous window's count weighted by how much of it still
+    overlaps the sliding window. A check is two cache reads and one
+    increment, and never touches the database.
+
+    Views may define `get_quota_cost(request)` when one request uses more
+    than one unit, e.g. a batch upload. The remaining budget is reported in
+    X-RateLimit-* headers on every response. Views using QuotaRefundMixin
+    get the units back when the request turns out not to need the AI.
+    """
+
+    def allow_request(self, request, view):
+        scope = getattr(view, 'throttle_scope', None)
+        user = request.user
+        if scope is None or not user or not user.is_authenticated:
+            return True
+
+        rates = settings.AI_QUOTA_RATES.get(scope, {})
+        rate = rates.get(user.subscription_status, rates.get('default'))
+        if rate is None:
+            return True
+        limit, window = parse_rate(rate)
+        cost = view.get_quota_cost(request) if hasattr(view, 'get_quota_cost') else 1
+
+        now = time.time()
+        window_index, elapsed = divmod(now, window)
+        current_key = f"ai-quota:{scope}:{user.pk}:{int(window_index)}"
+        previous_key = f"ai-quota:{scope}:{user.pk}:{int(window_index) - 1}"
+
+        counts = cache.get_many([previous_key, current_key])
+        previous = counts.get(previous_key, 0)
+        current = counts.get(current_key, 0)
+        carried = previous * (1 - elapsed / window)
+
+        if carried + current + cost > limit:
+            self.wait_seconds = self._wait(limit, window, elapsed, previous, current, cost)
+            self._set_headers(view, limit, max(0, limit - carried - current), window - elapsed)
+            return False
+
+        # Counters outlive their window by one window so they can be carried
+        if cache.add(current_key, cost, timeout=2 * window):
+            current = cost
+        else:
+            try:
+                current = cache.incr(current_key, cost)
+            except ValueError:
+                # Expired between add and incr
+                cache.set(current_key, cost, timeout=2 * window)
+                current = cost
+        view.quota_charge = (current_key, cost)
+
+        self._set_headers(view, limit, max(0, limit - carried - current), window - elapsed)
+        return True
+
+    def _wait(self, limit, window, elapsed, previous, current, cost):
+        """Seconds until `cost` more units fit in the sliding window."""
+        if cost > limit:
+            return None
+        if previous and current + cost <= limit:
+            # Room opens up in this window as the previous window's weight decays
+            return max(window * (1 - (limit - current - cost) / previous) - elapsed, 1)
+        # Otherwise wait into the next window, where this window's count is carried
+        return window - elapsed + window * max(0, 1 - (limit - cost) / current)
+
+    def _set_headers(self, view, limit, remaining, reset):
+        view.headers['X-RateLimit-Limit'] = str(limit)
+        view.headers['X-RateLimit-Remaining'] = str(math.floor(remaining))
+        view.headers['X-RateLimit-Reset'] = str(math.ceil(reset))
+
+    def wait(self):
+        return getattr(self, 'wait_seconds', None)
+
+
+class QuotaRefundMixin:
+    """
+    Give back the AI quota a request was charged when it didn't use the AI.
+
+    The throttle charges before the handler runs, so a rejected upload or a
+    re-analysis served from cache would otherwise count. Units are refunded
+    to the window they were charged in for any 4xx response, and for any
+    other response `is_quota_refunded` accepts.
+    """
+
+    def is_quota_refunded(self, response):
+        return 400 <= response.status_code < 500
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        charge = getattr(self, 'quota_charge', None)
+        if charge is not None and self.is_quota_refunded(response):
+            self.quota_charge = None
+            key, cost = charge
+            try:
+                cache.decr(key, cost)
+            except ValueError:
+                # The window's counter already expired
+                pass
+            else:
+                remaining = int(self.headers.get('X-RateLimit-Remaining', 0)) + cost
+                self.headers['X-RateLimit-Remaining'] = str(remaining)
+        return super().finalize_response(request, response, *args, **kwargs)
@@ -0,0 +1,41 @@
+import re
+
+SECTION_HEADINGS = {
+    'experience': [
+        'experience', 'work experience', 'professional experience',
+        'employment', 'employment history', 'work history', 'career history',
+    ],
+    'education': ['education', 'academic background', 'education and training'],
+    'skills': ['skills', 'technical skills', 'core skills', 'key skills', 'competencies', 'core competencies'],
+    'summary': ['summary', 'professional summary', 'profile', 'about me', 'objective'],
+    'other': ['projects', 'certifications', 'awards', 'publications', 'interests', 'volunteering', 'languages'],
+}
+HEADING_LOOKUP = {alias: section for section, aliases in SECTION_HEADINGS.items() for alias in aliases}
+
+EMAIL_RE = re.compile(r"[\w.+-]+@[\w-]+(?:\.[\w-]+)+")
+# An optional country code, then digit groups joined by at most one separator each
+PHONE_RE = re.compile(r"(?<!\d)(?:\+\d{1,3}[\s.-]?)?(?:\(\d{2,4}\)|\d{2,4})[\s.-]?\d{3,4}[\s.-]?\d{3,4}(?!\d)")
+YEAR_RE = re.compile(r"\b(?:19|20)\d{2}\b")
+BULLET_RE = re.compile(r"^[-•*▪◦·]\s*")
+
+
+def find_phone(text):
+    """The first phone number in text, skipping runs of years such as '2018-2020 2021'."""
+    for match in PHONE_RE.finditer(text):
+        if len(YEAR_RE.findall(match.group(0))) < 2:
+            return match
+    return None
+
+
+def split_sections(text: str) -> dict:
+    """Split the text on known heading lines. Text before the first heading is the header."""
+    sections = {'header': []}
+    current = 'header'
+    for line in text.splitlines():
+        heading = re.sub(r"[^a-z ]", "", line.lower()).strip()
+        if heading in HEADING_LOOKUP and len(line) <= 40:
+            current = HEADING_LOOKUP[heading]
+            sections.setdefault(current, [])
+            continue
+        sections[current].append(line)
+    return {name: "\n".join(lines).strip() for name, lines in sections.items()}
@@ -10,9 +10,11 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import sys
 from pathlib import Path
 import environ
 from datetime import timedelta
+from corsheaders.defaults import default_headers as default_cors_headers
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -76,6 +78,7 @@ MIDDLEWARE = [
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'allauth.account.middleware.AccountMiddleware',
+    'resume_platform.db_routers.ReplicaStickinessMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -108,6 +111,37 @@ DATABASES = {
     'default': env.db('DATABASE_URL')
 }
 
+# Optional read replicas, e.g. DATABASE_REPLICA_URLS=postgres://replica-1/db,postgres://replica-2/db.
+# Tests mirror them to the primary.
+DATABASE_REPLICAS = []
+for index, url in enumerate(env.list('DATABASE_REPLICA_URLS', default=[]), start=1):
+    DATABASES[f'replica_{index}'] = {**env.db_url_config(url), 'TEST': {'MIRROR': 'default'}}
+    DATABASE_REPLICAS.append(f'replica_{index}')
+
+# Under the test runner, a second database that is not mirrored stands in
+# for a replica that hasn't caught up, so tests can tell which database a
+# read went to. Only tests that list it in DATABASE_REPLICAS route to it.
+TESTING = sys.argv[1:2] == ['test']
+if TESTING:
+    DATABASES['stale_replica'] = {
+        **DATABASES['default'],
+        # SQLite test databases are in memory, one per alias
+        'TEST': {} if DATABASES['default']['ENGINE'].endswith('sqlite3')
+        else {'NAME': f"test_{DATABASES['default']['NAME']}_stale_replica"},
+    }
+
+DATABASE_ROUTERS = ['resume_platform.db_routers.PrimaryReplicaRouter']
+
+# How long a user's reads stay on the primary after they write
+DATABASE_REPLICA_STICKY_SECONDS = env.int('DATABASE_REPLICA_STICKY_SECONDS', default=10)
+
+# Cache
+# Shared by all workers in production (e.g. CACHE_URL=redis://...), so replica
+# stickiness and cached analysis data are seen by every process.
+CACHES = {
+    'default': env.cache('CACHE_URL', default='locmemcache://')
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -160,7 +194,7 @@ AUTH_USER_MODEL = 'users.CustomUser'
 # Django REST Framework
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'users.authentication.ClaimsJWTAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
@@ -198,16 +232,27 @@ SIMPLE_JWT = {
     'SLIDING_TOKEN_REFRESH_EXP_CLAIM': 'refresh_exp',
     'SLIDING_TOKEN_LIFETIME': timedelta(minutes=5),
     'SLIDING_TOKEN_REFRESH_LIFETIME': timedelta(days=1),
+    'TOKEN_OBTAIN_SERIALIZER': 'users.serializers.SubscriptionTokenObtainPairSerializer',
+    'TOKEN_REFRESH_SERIALIZER': 'users.serializers.SubscriptionTokenRefreshSerializer',
 }
 
+# How long a user's auth_version is cached; bounds how long claims from a
+# token stay trusted after a queryset update that bumped auth_version
+# without going through CustomUser.save()
+AUTH_VERSION_CACHE_SECONDS = env.int('AUTH_VERSION_CACHE_SECONDS', default=60)
+
 # dj-rest-auth settings
-REST_USE_JWT = True
-JWT_AUTH_COOKIE = 'jwt-auth'
-JWT_AUTH_REFRESH_COOKIE = 'jwt-refresh'
+REST_AUTH = {
+    'USE_JWT': True,
+    'JWT_AUTH_COOKIE': 'jwt-auth',
+    'JWT_AUTH_REFRESH_COOKIE': 'jwt-refresh',
+    'JWT_TOKEN_CLAIMS_SERIALIZER': 'users.serializers.SubscriptionTokenObtainPairSerializer',
+}
 
 # CORS settings
 CORS_ALLOWED_ORIGINS = env.list('CORS_ALLOWED_ORIGINS')
 CORS_ALLOW_CREDENTIALS = True
+CORS_ALLOW_HEADERS = (*default_cors_headers, 'idempotency-key')
 
 # API Keys
 GOOGLE_API_KEY = env('GOOGLE_API_KEY', default='')
@@ -218,6 +263,69 @@ STRIPE_PUBLISHABLE_KEY = env('STRIPE_PUBLISHABLE_KEY', default='')
 FILE_UPLOAD_MAX_MEMORY_SIZE = 10 * 1024 * 1024  # 10MB
 DATA_UPLOAD_MAX_MEMORY_SIZE = 10 * 1024 * 1024  # 10MB
 
+# Development query inspection: report repeated query shapes (N+1) and
+# views over their declared query_budget; strict mode raises instead. Both
+# are on under the test runner, so a view over its budget fails its tests.
+QUERY_INSPECTION = env.bool('QUERY_INSPECTION', default=TESTING)
+QUERY_INSPECTION_STRICT = env.bool('QUERY_INSPECTION_STRICT', default=TESTING)
+QUERY_INSPECTION_REPEAT_THRESHOLD = env.int('QUERY_INSPECTION_REPEAT_THRESHOLD', default=3)
+if QUERY_INSPECTION:
+    # Only installed when on, so production requests don't pass through it
+    MIDDLEWARE.insert(
+        MIDDLEWARE.index('django.middleware.security.SecurityMiddleware') + 1,
+        'resume_platform.query_inspection.QueryInspectionMiddleware'
+    )
+
+# Resume Enhancer Settings
+RESUME_BATCH_MAX_FILES = env.int('RESUME_BATCH_MAX_FILES', default=50)
+# Longer uploads are rejected before they are stored or analyzed
+RESUME_UPLOAD_MAX_PAGES = env.int('RESUME_UPLOAD_MAX_PAGES', default=10)
+RESUME_ANALYSIS_CONCURRENCY = env.int('RESUME_ANALYSIS_CONCURRENCY', default=4)
+# Fair-share weights of the analysis queue by subscription_status
+RESUME_ANALYSIS_CLASS_WEIGHTS = {
+    'premium': env.int('RESUME_ANALYSIS_PREMIUM_WEIGHT', default=4),
+    'free': 1,
+    'expired': 1,
+}
+# Queued analyses older than this skip the fair order
+RESUME_ANALYSIS_MAX_WAIT_SECONDS = env.int('RESUME_ANALYSIS_MAX_WAIT_SECONDS', default=120)
+
+# Days uploads are kept, per subscription_status ('default' for any other);
+# failed uploads are kept for the 'failed' period when that is shorter
+UPLOAD_RETENTION_DAYS = {
+    'premium': env.int('UPLOAD_RETENTION_DAYS_PREMIUM', default=365),
+    'default': env.int('UPLOAD_RETENTION_DAYS', default=90),
+    'failed': env.int('UPLOAD_RETENTION_DAYS_FAILED', default=14),
+}
+
+# AI quotas per endpoint scope and subscription_status, as 'count/period'
+AI_QUOTA_RATES = {
+    'resume-analysis': {
+        'premium': env('AI_QUOTA_ANALYSIS_PREMIUM', default='200/day'),
+        'default': env('AI_QUOTA_ANALYSIS_FREE', default='10/day'),
+    },
+    'enhance-text': {
+        'premium': env('AI_QUOTA_ENHANCE_PREMIUM', default='120/hour'),
+        'default': env('AI_QUOTA_ENHANCE_FREE', default='20/hour'),
+    },
+}
+
+# Idempotency-Key handling: how long responses are replayed, how long a
+# claim on a key outlives a crashed request, and how long a concurrent
+# duplicate waits for the original's response
+IDEMPOTENCY_TTL_SECONDS = env.int('IDEMPOTENCY_TTL_SECONDS', default=24 * 60 * 60)
+IDEMPOTENCY_LOCK_SECONDS = env.int('IDEMPOTENCY_LOCK_SECONDS', default=120)
+IDEMPOTENCY_WAIT_SECONDS = env.int('IDEMPOTENCY_WAIT_SECONDS', default=30)
+
+# Load the AI and PDF libraries when a server worker starts instead of on its first request
+WORKER_WARM_UP = env.bool('WORKER_WARM_UP', default=True)
+
+# Resume Builder Settings
+SKILL_INDEX_REFRESH_SECONDS = env.int('SKILL_INDEX_REFRESH_SECONDS', default=300)
+RESUME_VERSION_SNAPSHOT_INTERVAL = env.int('RESUME_VERSION_SNAPSHOT_INTERVAL', default=10)
+RESUME_RENDER_WORKERS = env.int('RESUME_RENDER_WORKERS', default=2)
+RESUME_RENDER_TIMEOUT_SECONDS = env.int('RESUME_RENDER_TIMEOUT_SECONDS', default=30)
+
 # AWS S3 Settings
 AWS_ACCESS_KEY_ID = env('AWS_ACCESS_KEY_ID')
 AWS_SECRET_ACCESS_KEY = env('AWS_SECRET_ACCESS_KEY')
@@ -0,0 +1,241 @@
+import threading
+from unittest import mock
+from django.core.cache import cache
+from django.db import connection, router
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from rest_framework.exceptions import Throttled
+from rest_framework.response import Response
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from resumebuilder import views as builder_views
+from resumebuilder.models import Resume
+from resumebuilder.views import ResumeViewSet
+from users.models import CustomUser
+from . import idempotency
+from .db_routers import PRIMARY, ReplicaStickinessMiddleware, read_your_writes, use_primary
+from .query_inspection import QueryBudgetExceeded, assert_query_budget, normalize_sql, record_queries
+
+REPLICA = 'stale_replica'
+
+
+@override_settings(
+    DATABASE_REPLICAS=[REPLICA],
+    DATABASE_ROUTERS=['resume_platform.db_routers.PrimaryReplicaRouter'],
+)
+class PrimaryReplicaRouterTests(TransactionTestCase):
+    """
+    Runs against two real databases. Nothing replicates to the replica, so a
+    row written to the primary is only seen by reads that went there.
+    """
+
+    databases = {PRIMARY, REPLICA}
+
+    def setUp(self):
+        cache.clear()
+
+    def sees(self, username):
+        return CustomUser.objects.filter(username=username).exists()
+
+    def test_safe_reads_go_to_the_replica(self):
+        CustomUser.objects.create(username='written')
+
+        self.assertEqual(router.db_for_read(CustomUser), REPLICA)
+        self.assertEqual(router.db_for_write(CustomUser), PRIMARY)
+        self.assertFalse(self.sees('written'))
+
+    def test_reads_after_a_write_in_scope_go_to_the_primary(self):
+        with read_your_writes():
+            self.assertEqual(router.db_for_read(CustomUser), REPLICA)
+            CustomUser.objects.create(username='written')
+            self.assertTrue(self.sees('written'))
+
+        # The write pinned only its own scope
+        self.assertFalse(self.sees('written'))
+
+    def test_use_primary(self):
+        CustomUser.objects.create(username='written')
+
+        with use_primary():
+            self.assertTrue(self.sees('written'))
+        self.assertFalse(self.sees('written'))
+
+    def request_through_middleware(self, method, user, status=200):
+        reads = []
+
+        def view(request):
+            reads.append(router.db_for_read(CustomUser))
+            return HttpResponse(status=status)
+
+        factory = RequestFactory(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}')
+        ReplicaStickinessMiddleware(view)(getattr(factory, method)('/api/builder/resumes/'))
+        return reads[0]
+
+    def test_middleware_pins_the_user_after_a_successful_write(self):
+        user = CustomUser.objects.create(username='writer')
+        other = CustomUser.objects.create(username='reader')
+
+        self.assertEqual(self.request_through_middleware('post', user, status=201), REPLICA)
+        self.assertEqual(self.request_through_middleware('get', user), PRIMARY)
+        self.assertEqual(self.request_through_middleware('get', other), REPLICA)
+
+    def test_middleware_does_not_pin_after_a_failed_write(self):
+        user = CustomUser.objects.create(username='writer')
+
+        self.request_through_middleware('post', user, status=400)
+        self.assertEqual(self.request_through_middleware('get', user), REPLICA)
+
+
+class NormalizeSqlTests(SimpleTestCase):
+    def test_literals_and_placeholder_lists_collapse(self):
+        self.assertEqual(
+            normalize_sql("SELECT * FROM t WHERE id IN (%s, %s, %s) AND name = 'it''s'  AND n > 10"),
+            "SELECT * FROM t WHERE id IN (...) AND name = ? AND n > ?",
+        )
+        self.assertEqual(
+            normalize_sql('SELECT * FROM t WHERE id IN (%s, %s)'),
+            normalize_sql('SELECT * FROM t WHERE id IN (%s,%s,%s,%s)'),
+        )
+
+    def test_identifiers_with_digits_are_kept(self):
+        self.assertEqual(normalize_sql('SELECT "t1"."id" FROM "t1"'), 'SELECT "t1"."id" FROM "t1"')
+
+
+class QueryInspectionTests(TestCase):
+    def setUp(self):
+        self.users = [CustomUser.objects.create(username=f'user{index}') for index in range(4)]
+
+    def test_repeated_shapes_are_detected(self):
+        with self.assertRaises(QueryBudgetExceeded) as caught:
+            with assert_query_budget():
+                for user in self.users:
+                    CustomUser.objects.filter(pk=user.pk).exists()
+
+        self.assertIn('N+1: 4x', str(caught.exception))
+        self.assertIn('test_repeated_shapes_are_detected', str(caught.exception))
+
+    def test_repeats_below_the_threshold_pass(self):
+        with assert_query_budget() as report:
+            for user in self.users[:2]:
+                CustomUser.objects.filter(pk=user.pk).exists()
+        self.assertEqual(report.repeated_shapes(), [])
+
+    def test_one_query_for_many_rows_passes(self):
+        with assert_query_budget(1):
+            list(CustomUser.objects.filter(pk__in=[user.pk for user in self.users]))
+
+    def test_budget_overrun_fails(self):
+        with self.assertRaises(QueryBudgetExceeded):
+            with assert_query_budget(1, allow_repeats=True):
+                CustomUser.objects.count()
+                CustomUser.objects.exists()
+
+    def test_nested_recordings_each_count(self):
+        with record_queries() as outer:
+            CustomUser.objects.count()
+            with record_queries() as inner:
+                CustomUser.objects.exists()
+        self.assertEqual((outer.count, inner.count), (2, 1))
+
+
+class IdempotencyTests(TransactionTestCase):
+    """Idempotency-Key handling, through resume creation."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = CustomUser.objects.create(username='retrier', subscription_status='premium')
+
+    def post(self, title='CV', key='create-cv-1'):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        return client.post('/api/builder/resumes/', {'title': title}, format='json', HTTP_IDEMPOTENCY_KEY=key)
+
+    def test_repeats_are_replayed(self):
+        first = self.post()
+        second = self.post()
+
+        self.assertEqual(first.status_code, 201)
+        self.assertEqual((second.status_code, second.data), (201, first.data))
+        self.assertEqual(second['Idempotent-Replayed'], 'true')
+        self.assertFalse(first.has_header('Idempotent-Replayed'))
+        self.assertEqual(Resume.objects.count(), 1)
+
+    def test_other_keys_run_again(self):
+        self.post()
+        self.post(key='create-cv-2')
+        self.assertEqual(Resume.objects.count(), 2)
+
+    def test_a_key_reused_for_another_request_is_a_422(self):
+        self.post()
+        response = self.post(title='Another CV')
+
+        self.assertEqual(response.status_code, 422)
+        self.assertEqual(Resume.objects.count(), 1)
+
+    def test_a_concurrent_duplicate_waits_for_the_original(self):
+        running, waiting, finish = threading.Event(), threading.Event(), threading.Event()
+        responses = {}
+        record_version, sleep = builder_views.record_version, idempotency.time.sleep
+
+        def slow_record_version(resume_id):
+            running.set()
+            finish.wait(5)
+            return record_version(resume_id)
+
+        def waiting_sleep(seconds):
+            waiting.set()
+            sleep(seconds)
+
+        def post(name):
+            try:
+                responses[name] = self.post()
+            finally:
+                connection.close()
+
+        with mock.patch.object(builder_views, 'record_version', slow_record_version), \
+                mock.patch.object(idempotency.time, 'sleep', waiting_sleep):
+            original = threading.Thread(target=post, args=('original',))
+            original.start()
+            self.assertTrue(running.wait(5))
+            duplicate = threading.Thread(target=post, args=('duplicate',))
+            duplicate.start()
+            # The duplicate found the key claimed and is polling for the response
+            self.assertTrue(waiting.wait(5))
+            finish.set()
+            original.join(5)
+            duplicate.join(5)
+
+        self.assertEqual(responses['original'].status_code, 201)
+        self.assertEqual(responses['duplicate'].data, responses['original'].data)
+        self.assertEqual(responses['duplicate']['Idempotent-Replayed'], 'true')
+        self.assertEqual(Resume.objects.count(), 1)
+
+    def test_server_errors_release_the_key(self):
+        with mock.patch.object(ResumeViewSet, 'create', side_effect=RuntimeError('database went away')):
+            with self.assertRaises(RuntimeError):
+                self.post()
+
+        response = self.post()
+        self.assertEqual(response.status_code, 201)
+        self.assertFalse(response.has_header('Idempotent-Replayed'))
+
+    def test_error_responses_release_the_key(self):
+        with mock.patch.object(ResumeViewSet, 'create', return_value=Response(status=503)):
+            self.assertEqual(self.post().status_code, 503)
+        self.assertEqual(self.post().status_code, 201)
+
+    def test_throttled_requests_release_the_key(self):
+        with mock.patch.object(ResumeViewSet, 'create', side_effect=Throttled(wait=1)):
+            self.assertEqual(self.post().status_code, 429)
+
+        response = self.post()
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(Resume.objects.count(), 1)
+
+    def test_client_errors_are_replayed(self):
+        self.assertEqual(self.post(title='').status_code, 400)
+
+        response = self.post(title='')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response['Idempotent-Replayed'], 'true')
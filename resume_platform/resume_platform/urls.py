@@ -19,10 +19,13 @@ from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
 
+from users.views import SubscriptionTokenRefreshView
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     
-    # Authentication endpoints (dj-rest-auth)
+    # Authentication endpoints (dj-rest-auth); refresh re-stamps the token claims
+    path('api/auth/token/refresh/', SubscriptionTokenRefreshView.as_view(), name='token_refresh'),
     path('api/auth/', include('dj_rest_auth.urls')),
     path('api/auth/registration/', include('dj_rest_auth.registration.urls')),
     
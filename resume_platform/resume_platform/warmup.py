@@ -0,0 +1,43 @@
+import os
+import time
+import logging
+
+# Modules too slow to import on every process start. Services reach the AI
+# and PDF libraries through the loaders below; scipy comes in with
+# resumebuilder.matching, which JobMatchView imports when it first runs.
+DEFERRED_MODULES = ('google.generativeai', 'PyPDF2', 'scipy')
+
+logger = logging.getLogger(__name__)
+
+
+def gemini():
+    """Return the Gemini SDK module, importing it on first use (about a second)."""
+    import google.generativeai as genai
+    return genai
+
+
+def pdf_reader():
+    """Return PyPDF2's PdfReader class, importing it on first use."""
+    from PyPDF2 import PdfReader
+    return PdfReader
+
+
+def warm_up():
+    """
+    Load deferred dependencies, shared state and the render pool so a new
+    worker's first requests don't pay for them. Called by the ASGI/WSGI
+    entry points when WORKER_WARM_UP is on; safe to call more than once.
+    """
+    started = time.perf_counter()
+    from resumebuilder import matching  # noqa: F401
+    from resumebuilder.skill_extraction import get_skill_extractor
+    from resumebuilder.exports import start_render_pool
+
+    genai = gemini()
+    api_key = os.environ.get('GOOGLE_API_KEY')
+    if api_key:
+        genai.configure(api_key=api_key)
+    pdf_reader()
+    get_skill_extractor()
+    start_render_pool()
+    logger.info("Worker warm-up finished in %.0f ms", (time.perf_counter() - started) * 1000)
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class ResumebuilderConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'resumebuilder'
+
+    def ready(self):
+        # Connect the search index signal handlers
+        from . import signals  # noqa: F401
@@ -0,0 +1,139 @@
+import bisect
+import threading
+from collections import Counter
+from django.conf import settings
+from django.db import close_old_connections
+from django.db.models import Count
+
+from .models import Skill
+from .skill_dictionary import CANONICAL_SKILLS, canonicalize, skill_category
+
+
+class SkillPrefixIndex:
+    """
+    Prefix index over skill names, built from the canonical
+    dictionary and the popularity of existing Skill rows.
+
+    Keys (canonical names and synonyms, lowercased) are kept in a sorted
+    list so a prefix lookup is a bisect plus a scan of the matching range.
+    """
+
+    def __init__(self, popularity, min_popularity=3):
+        self.popularity = Counter(popularity)
+        entries = {}
+        for canonical, (_, synonyms) in CANONICAL_SKILLS.items():
+            for key in [canonical, *synonyms]:
+                entries.setdefault(key.lower(), canonical)
+
+        # Free-text skills outside the dictionary are suggested once enough
+        # resumes use them; one-off typos never reach the index.
+        for name, count in self.popularity.items():
+            if name not in CANONICAL_SKILLS and count >= min_popularity:
+                entries.setdefault(name.lower(), name)
+
+        self.keys = sorted(entries)
+        self.names = [entries[key] for key in self.keys]
+
+    def suggest(self, prefix, limit=10):
+        """Return up to `limit` skills whose name or synonym starts with `prefix`, most used first."""
+        prefix = prefix.strip().lower()
+        if not prefix:
+            return []
+
+        start = bisect.bisect_left(self.keys, prefix)
+        end = bisect.bisect_right(self.keys, prefix + '\uffff', lo=start)
+        matches = {self.names[i] for i in range(start, end)}
+
+        ranked = sorted(
+            matches,
+            key=lambda name: (
+                -self.popularity[name],
+                not name.lower().startswith(prefix),
+                name.lower()
+            )
+        )
+        return [
+            {
+                'name': name,
+                'category': skill_category(name),
+                'popularity': self.popularity[name],
+            }
+            for name in ranked[:limit]
+        ]
+
+
+def load_skill_popularity():
+    """Count how many resumes use each skill, merged by canonical name."""
+    popularity = Counter()
+    rows = Skill.objects.order_by().values('name').annotate(count=Count('id'))
+    for row in rows:
+        popularity[canonicalize(row['name'])] += row['count']
+    return popularity
+
+
+class SkillIndexManager:
+    """
+    Holds the process-wide SkillPrefixIndex and keeps it fresh.
+
+    The index is built on first use and then rebuilt by a daemon thread
+    every SKILL_INDEX_REFRESH_SECONDS until stop() is called. New Skill
+    rows bump the in-memory popularity between rebuilds, so requests never
+    query the database.
+    """
+
+    def __init__(self):
+        self._index = None
+        self._lock = threading.Lock()
+        self._refresher = None
+        self._stop = threading.Event()
+
+    def get_index(self):
+        """Return the current index, building it on first use."""
+        if self._index is None:
+            with self._lock:
+                if self._index is None:
+                    self._index = SkillPrefixIndex(load_skill_popularity())
+                    self._start_refresher()
+        return self._index
+
+    def rebuild(self):
+        """Rebuild the index from the database and swap it in."""
+        index = SkillPrefixIndex(load_skill_popularity())
+        self._index = index
+        return index
+
+    def record_usage(self, name):
+        """Count a newly created Skill row until the next rebuild picks it up."""
+        index = self._index
+        if index is not None:
+            index.popularity[canonicalize(name)] += 1
+
+    def _start_refresher(self):
+        interval = getattr(settings, 'SKILL_INDEX_REFRESH_SECONDS', 300)
+        if self._refresher is not None or interval <= 0:
+            return
+
+        def refresh():
+            while not self._stop.wait(interval):
+                try:
+                    self.rebuild()
+                except Exception as e:
+                    print(f"Skill index rebuild failed: {e}")
+                finally:
+                    close_old_connections()
+
+        self._stop.clear()
+        self._refresher = threading.Thread(target=refresh, name='skill-index-refresh', daemon=True)
+        self._refresher.start()
+
+    def stop(self, timeout=None):
+        """Stop the refresher thread, waiting up to `timeout` seconds for it to exit."""
+        refresher = self._refresher
+        if refresher is None:
+            return
+        self._stop.set()
+        refresher.join(timeout)
+        self._refresher = None
+
+
+skill_index = SkillIndexManager()
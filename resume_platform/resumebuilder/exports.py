@@ -0,0 +1,249 @@
+import os
+import json
+import zipfile
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, TimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+from django.utils.text import slugify
+
+from resumeenhancer.models import UploadedResume
+from .models import Resume, ResumeVersion
+from .rendering import render, warm
+from .serializers import ResumeSerializer
+from .versioning import build_document, get_document
+
+CONTENT_TYPES = {
+    'pdf': 'application/pdf',
+    'docx': 'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
+}
+ARTIFACT_PREFIX = 'resume-exports'
+ARTIFACT_CACHE_TIMEOUT = 24 * 60 * 60
+
+BULK_EXPORT_FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'zip': 'application/zip',
+}
+# Rows fetched per round trip from the server-side cursors
+BULK_EXPORT_CHUNK_SIZE = 100
+# Bytes read per hop to the sync thread when an export is streamed over ASGI
+ASYNC_STREAM_BUFFER = 64 * 1024
+UPLOAD_FIELDS = ['id', 'original_file', 'status', 'analysis_results', 'prompt_version', 'created_at', 'updated_at']
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_render_pool():
+    """The process pool renders run in, created on first use."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # Spawned workers only import the Django-free rendering module
+            _pool = ProcessPoolExecutor(
+                max_workers=settings.RESUME_RENDER_WORKERS,
+                mp_context=multiprocessing.get_context('spawn')
+            )
+        return _pool
+
+
+def _discard_render_pool(pool):
+    """Shut a failed pool down and let the next render start a fresh one."""
+    global _pool
+    with _pool_lock:
+        # Another thread may already have replaced it
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def start_render_pool():
+    """Start the pool's workers and compile the templates in each of them."""
+    pool = get_render_pool()
+    for future in [pool.submit(warm) for _ in range(settings.RESUME_RENDER_WORKERS)]:
+        future.result()
+
+
+def artifact_name(resume, template, file_format):
+    """Storage name of a rendered artifact; a new version gets a new name."""
+    return f"{ARTIFACT_PREFIX}/{resume.user_id}/{resume.pk}/v{resume.version}-{template}.{file_format}"
+
+
+def get_artifact(resume, template, file_format):
+    """
+    Return the storage name of the resume rendered at its current version,
+    rendering and storing it only if it isn't stored yet.
+    """
+    name = artifact_name(resume, template, file_format)
+    cache_key = f"resume-artifact:{name}"
+    stored = cache.get(cache_key)
+    if stored is not None:
+        return stored
+
+    if default_storage.exists(name):
+        stored = name
+    else:
+        try:
+            document = get_document(resume, resume.version)
+        except ResumeVersion.DoesNotExist:
+            # Resumes without recorded history are rendered from their rows
+            document = build_document(resume.pk, resume.title)
+        stored = default_storage.save(name, ContentFile(_render(document, template, file_format)))
+
+    cache.set(cache_key, stored, ARTIFACT_CACHE_TIMEOUT)
+    return stored
+
+
+def _render(document, template, file_format):
+    pool = get_render_pool()
+    try:
+        future = pool.submit(render, document, template, file_format)
+        return future.result(timeout=settings.RESUME_RENDER_TIMEOUT_SECONDS)
+    except (BrokenProcessPool, TimeoutError):
+        # A worker died or is stuck; queued renders are cancelled and the
+        # stuck worker exits once its render ends
+        _discard_render_pool(pool)
+        raise
+
+
+def _account_record(user):
+    # One query, whichever fields the authenticated user has loaded
+    record = type(user).objects.filter(pk=user.pk).values(
+        'username', 'email', 'subscription_status', 'date_joined'
+    ).get()
+    return {**record, 'exported_at': timezone.now()}
+
+
+def _iter_resumes(user):
+    """
+    Yield each of the user's resumes serialized with its sections.
+
+    Resumes come from a server-side cursor in chunks, and each chunk's
+    sections are prefetched together, so memory is bounded by the chunk.
+    """
+    resumes = Resume.objects.filter(user=user).order_by('id').prefetch_related(
+        'contact_info', 'work_experiences', 'education_entries', 'skills'
+    )
+    for resume in resumes.iterator(chunk_size=BULK_EXPORT_CHUNK_SIZE):
+        yield ResumeSerializer(resume).data
+
+
+def _iter_uploads(user):
+    """Yield the user's uploads as plain rows, oldest first."""
+    uploads = UploadedResume.objects.filter(user=user).order_by('id').values(*UPLOAD_FIELDS)
+    yield from uploads.iterator(chunk_size=BULK_EXPORT_CHUNK_SIZE)
+
+
+def _dumps(record):
+    return json.dumps(record, cls=DjangoJSONEncoder, ensure_ascii=False)
+
+
+def stream_ndjson(user):
+    """Yield the account, its resumes and its uploads as one JSON object per line."""
+    yield (_dumps({'type': 'account', **_account_record(user)}) + '\n').encode()
+    for resume in _iter_resumes(user):
+        yield (_dumps({'type': 'resume', **resume}) + '\n').encode()
+    for upload in _iter_uploads(user):
+        yield (_dumps({'type': 'upload', **upload}) + '\n').encode()
+
+
+class _ZipStream:
+    """Write-only file object that hands back whatever zipfile wrote since the last drain."""
+
+    def __init__(self):
+        self._chunks = []
+        self._offset = 0
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._offset += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._offset
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def stream_zip(user):
+    """
+    Yield a ZIP archive of the account as it is built: account.json, one
+    JSON file per resume, and each upload's metadata next to its original
+    file. The stream has no seek, so zipfile writes data descriptors and
+    nothing is held beyond the entry being written.
+    """
+    stream = _ZipStream()
+    with zipfile.ZipFile(stream, 'w', zipfile.ZIP_DEFLATED) as archive:
+        def write(name, chunks):
+            entry = zipfile.ZipInfo(name, date_time=timezone.now().timetuple()[:6])
+            entry.compress_type = zipfile.ZIP_DEFLATED
+            with archive.open(entry, 'w', force_zip64=True) as target:
+                for chunk in chunks:
+                    target.write(chunk)
+                    yield stream.drain()
+            yield stream.drain()
+
+        yield from write('account.json', [_dumps(_account_record(user)).encode()])
+        for resume in _iter_resumes(user):
+            name = f"resumes/{resume['id']}-{slugify(resume['title']) or 'resume'}.json"
+            yield from write(name, [_dumps(resume).encode()])
+        for upload in _iter_uploads(user):
+            yield from write(f"uploads/{upload['id']}.json", [_dumps(upload).encode()])
+            if upload['original_file']:
+                yield from write(
+                    f"uploads/{upload['id']}-{os.path.basename(upload['original_file'])}",
+                    _iter_file(upload['original_file'])
+                )
+    yield stream.drain()
+
+
+def _iter_file(name):
+    """Yield a stored file in chunks; a missing file is skipped."""
+    try:
+        file = default_storage.open(name, 'rb')
+    except (FileNotFoundError, OSError) as e:
+        print(f"Bulk export could not read {name}: {e}")
+        return
+    with file:
+        yield from file.chunks()
+
+
+def _read_ahead(stream):
+    """The stream's next chunks, up to about ASYNC_STREAM_BUFFER bytes; b'' once it ends."""
+    chunks = []
+    size = 0
+    for chunk in stream:
+        chunks.append(chunk)
+        size += len(chunk)
+        if size >= ASYNC_STREAM_BUFFER:
+            break
+    return b''.join(chunks)
+
+
+async def aiter_stream(stream):
+    """
+    Serve an export stream to an ASGI server. Given a sync iterator,
+    StreamingHttpResponse would collect the whole export into a list in a
+    thread before sending any of it; instead the stream is read a buffer at
+    a time, each read in the request's sync thread where its cursor lives.
+    """
+    read = sync_to_async(_read_ahead)
+    try:
+        while chunk := await read(stream):
+            yield chunk
+    finally:
+        # Closes the cursor when the client goes away mid-export
+        await sync_to_async(stream.close)()
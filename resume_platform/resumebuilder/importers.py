@@ -0,0 +1,322 @@
+import re
+import time
+import asyncio
+import logging
+from contextlib import contextmanager
+from datetime import date
+from asgiref.sync import async_to_sync
+from django.db import transaction
+
+from resume_platform.resume_text import BULLET_RE, EMAIL_RE, find_phone, split_sections
+from resumeenhancer.services import ResumeTextExtractionService
+from .autocomplete import skill_index
+from .models import Resume, ContactInfo, WorkExperience, Education, Skill
+from .skill_dictionary import canonicalize, skill_category
+from .skill_extraction import get_skill_extractor
+from .versioning import record_version
+
+logger = logging.getLogger(__name__)
+
+MONTHS = {
+    'jan': 1, 'feb': 2, 'mar': 3, 'apr': 4, 'may': 5, 'jun': 6,
+    'jul': 7, 'aug': 8, 'sep': 9, 'oct': 10, 'nov': 11, 'dec': 12,
+}
+
+_DATE = r"(?:(?:jan|feb|mar|apr|may|jun|jul|aug|sep|sept|oct|nov|dec)[a-z]*\.?\s+\d{4}|\d{1,2}/\d{4}|\d{4})"
+DATE_RANGE_RE = re.compile(
+    rf"(?P<start>{_DATE})\s*(?:-|–|—|to)\s*(?P<end>{_DATE}|present|current|now)",
+    re.IGNORECASE
+)
+SINGLE_DATE_RE = re.compile(_DATE, re.IGNORECASE)
+LOCATION_RE = re.compile(r"\b[A-Z][a-zA-Z .]+,\s*[A-Z]{2}\b")
+ROLE_COMPANY_SEPARATORS = [' at ', ' @ ', ' | ', ', ', ' - ', ' – ']
+DEGREE_RE = re.compile(
+    r"\b(?:b\.?s|b\.?a|m\.?s|m\.?a|mba|ph\.?d)\b|\b(?:bachelor|master|associate|doctor|diploma)",
+    re.IGNORECASE
+)
+INSTITUTION_RE = re.compile(r"\b(?:university|college|institute|school|academy)\b", re.IGNORECASE)
+SKILL_SPLIT_RE = re.compile(r"[,;|•·\n]")
+# A group label leading a line of skills, as in "Languages: Python, Go"
+SKILL_LABEL_RE = re.compile(r"^[A-Za-z][A-Za-z &/-]{0,40}:\s*")
+
+
+def parse_date(value):
+    """Parse 'Jan 2020', '01/2020' or '2020' into a date; None for present/unknown."""
+    value = value.strip().lower().rstrip('.')
+    if not value or value in ('present', 'current', 'now'):
+        return None
+
+    match = re.match(r"^([a-z]+)\.?\s+(\d{4})$", value)
+    if match and match.group(1)[:3] in MONTHS:
+        return date(int(match.group(2)), MONTHS[match.group(1)[:3]], 1)
+
+    match = re.match(r"^(\d{1,2})/(\d{4})$", value)
+    if match and 1 <= int(match.group(1)) <= 12:
+        return date(int(match.group(2)), int(match.group(1)), 1)
+
+    match = re.match(r"^(\d{4})$", value)
+    if match:
+        return date(int(match.group(1)), 1, 1)
+
+    return None
+
+
+class ResumeSectionParser:
+    """
+    Cheap rule-based parser that splits extracted resume text into sections
+    and turns each one into rows for the builder models.
+
+    Sections it can't read confidently are reported as ambiguous so only
+    those are sent to the LLM.
+    """
+
+    def parse(self, text: str) -> dict:
+        """Parse the whole text into contact info, sections and ambiguous section names."""
+        sections = self.split_sections(text)
+        parsed = {
+            'contact_info': self.parse_contact_info(sections.get('header', '')),
+            'work_experiences': [],
+            'education_entries': [],
+            'skills': [],
+            'ambiguous': {},
+        }
+
+        if sections.get('experience'):
+            entries, ambiguous = self.parse_experience(sections['experience'])
+            parsed['work_experiences'] = entries
+            if ambiguous:
+                parsed['ambiguous']['work_experiences'] = sections['experience']
+
+        if sections.get('education'):
+            entries, ambiguous = self.parse_education(sections['education'])
+            parsed['education_entries'] = entries
+            if ambiguous:
+                parsed['ambiguous']['education_entries'] = sections['education']
+
+        if sections.get('skills'):
+            parsed['skills'] = self.parse_skills(sections['skills'])
+
+        return parsed
+
+    def split_sections(self, text: str) -> dict:
+        """Split the text on known heading lines. Text before the first heading is the header."""
+        return split_sections(text)
+
+    def parse_contact_info(self, header: str) -> dict:
+        """Pull the name, email, phone and location out of the header block."""
+        lines = [line.strip() for line in header.splitlines() if line.strip()]
+        email = EMAIL_RE.search(header)
+        phone = find_phone(header)
+        location = LOCATION_RE.search(header)
+        full_name = next(
+            (line for line in lines if not EMAIL_RE.search(line) and not any(c.isdigit() for c in line)),
+            ''
+        )
+        return {
+            'full_name': full_name[:200],
+            'email': email.group(0) if email else '',
+            'phone': phone.group(0).strip()[:20] if phone else '',
+            'location': location.group(0).strip()[:200] if location else '',
+        }
+
+    def parse_experience(self, text: str):
+        """Parse work experience entries. Returns (entries, is_ambiguous)."""
+        lines = [line for line in text.splitlines() if line.strip()]
+        date_lines = [i for i, line in enumerate(lines) if DATE_RANGE_RE.search(line)]
+        if not date_lines:
+            return [], True
+
+        entries = []
+        ambiguous = False
+        # Each entry starts at its title line: the date line itself when the
+        # title shares it, otherwise the line right above.
+        starts = []
+        for i in date_lines:
+            remainder = DATE_RANGE_RE.sub('', lines[i]).strip(' ,|-–')
+            starts.append(i if remainder or i == 0 else i - 1)
+
+        for n, (start, date_line) in enumerate(zip(starts, date_lines)):
+            end = starts[n + 1] if n + 1 < len(starts) else len(lines)
+            match = DATE_RANGE_RE.search(lines[date_line])
+            title = DATE_RANGE_RE.sub('', lines[start]).strip(' ,|-–') if start == date_line else lines[start]
+            role, company = self._split_role_company(title)
+            description = "\n".join(
+                BULLET_RE.sub('- ', line.strip()) for line in lines[date_line + 1:end]
+            )
+            start_date = parse_date(match.group('start'))
+            if not (role and company and start_date):
+                ambiguous = True
+                continue
+            entries.append({
+                'role': role[:200],
+                'company': company[:200],
+                'start_date': start_date,
+                'end_date': parse_date(match.group('end')),
+                'description': description,
+            })
+
+        return entries, ambiguous
+
+    def _split_role_company(self, title: str):
+        """Split 'Role at Company' style titles into (role, company)."""
+        for separator in ROLE_COMPANY_SEPARATORS:
+            if separator in title:
+                role, company = title.split(separator, 1)
+                return role.strip(), company.strip()
+        return '', ''
+
+    def parse_education(self, text: str):
+        """Parse education entries. Returns (entries, is_ambiguous)."""
+        lines = [line.strip() for line in text.splitlines() if line.strip()]
+        entries = []
+        ambiguous = False
+        for i, line in enumerate(lines):
+            if not (DEGREE_RE.search(line) or INSTITUTION_RE.search(line)):
+                continue
+            # The date may share the line or follow on the next one
+            date_source = line if SINGLE_DATE_RE.search(line) else (lines[i + 1] if i + 1 < len(lines) else '')
+            dates = SINGLE_DATE_RE.findall(date_source)
+            graduation_date = parse_date(dates[-1]) if dates else None
+            line = SINGLE_DATE_RE.sub('', line).strip(' ,|-–')
+
+            degree, institution = line, ''
+            for separator in (', ', ' | ', ' - ', ' at ', ' from '):
+                if separator in line:
+                    left, right = line.split(separator, 1)
+                    degree, institution = (right, left) if INSTITUTION_RE.search(left) else (left, right)
+                    break
+
+            if not (degree and institution and graduation_date):
+                ambiguous = True
+                continue
+            entries.append({
+                'degree': degree.strip()[:200],
+                'institution': institution.strip()[:200],
+                'graduation_date': graduation_date,
+            })
+
+        return entries, ambiguous or not entries
+
+    def parse_skills(self, text: str) -> list:
+        """
+        Split a skills block into unique, canonically spelled skill names with
+        a category. Group labels leading a line, like "Languages:", are dropped.
+        """
+        skills = []
+        seen = set()
+        items = []
+        for line in text.splitlines():
+            items.extend(SKILL_SPLIT_RE.split(SKILL_LABEL_RE.sub('', BULLET_RE.sub('', line.strip()))))
+        for raw in items:
+            name = canonicalize(BULLET_RE.sub('', raw).strip(' .'))
+            if not name or len(name) > 100 or name.lower() in seen:
+                continue
+            seen.add(name.lower())
+            skills.append({'name': name, 'category': skill_category(name)})
+        return skills
+
+    def merge_skills(self, skills: list, found: list) -> list:
+        """Add dictionary skills found anywhere in the text to those listed in the skills section."""
+        seen = {skill['name'].lower() for skill in skills}
+        merged = list(skills)
+        for skill in found:
+            if skill['name'].lower() not in seen:
+                seen.add(skill['name'].lower())
+                merged.append({'name': skill['name'], 'category': skill['category']})
+        return merged
+
+
+class ResumeImporter:
+    """
+    Turns an UploadedResume's extracted text into a builder Resume.
+
+    Stages are timed individually: loading the stored text, rule-based
+    parsing, the LLM pass over ambiguous sections, and the database write.
+    """
+
+    def __init__(self, parser=None):
+        self.parser = parser or ResumeSectionParser()
+        self.timings = {}
+        self.llm_sections = []
+
+    def import_upload(self, uploaded_resume, user, title=None) -> Resume:
+        """Run the full import and return the new Resume."""
+        with self._stage('load_text'):
+            extracted = async_to_sync(ResumeTextExtractionService().get_or_extract)(uploaded_resume)
+
+        with self._stage('parse'):
+            parsed = self.parser.parse(extracted.text)
+            found_skills = extracted.skills or get_skill_extractor().extract(extracted.text)
+            parsed['skills'] = self.parser.merge_skills(parsed['skills'], found_skills)
+
+        with self._stage('llm'):
+            llm_rows = {}
+            if parsed['ambiguous']:
+                llm_rows = async_to_sync(self._parse_ambiguous_sections)(parsed['ambiguous'])
+                parsed.update(llm_rows)
+
+        with self._stage('write'):
+            resume = self._write(user, parsed, title or self._default_title(parsed))
+
+        # Only the sections the LLM actually returned rows for
+        self.llm_sections = sorted(llm_rows)
+        logger.info(
+            "Imported upload %s into resume %s (llm sections: %s, timings ms: %s)",
+            uploaded_resume.id, resume.id, self.llm_sections, self.timings
+        )
+        return resume
+
+    async def _parse_ambiguous_sections(self, ambiguous: dict) -> dict:
+        """Ask the LLM to parse the ambiguous sections concurrently. Failed sections keep the rule-based rows."""
+        from .services import GeminiSectionParsingService
+
+        try:
+            service = GeminiSectionParsingService()
+        except ValueError as e:
+            print(f"Skipping AI section parsing: {e}")
+            return {}
+
+        names = list(ambiguous)
+        results = await asyncio.gather(
+            *(service.parse_section(name, ambiguous[name]) for name in names)
+        )
+        return {name: rows for name, rows in zip(names, results) if rows}
+
+    @transaction.atomic
+    def _write(self, user, parsed, title) -> Resume:
+        """Write the resume and all of its sections in one transaction."""
+        resume = Resume.objects.create(user=user, title=title[:200])
+
+        contact_info = parsed['contact_info']
+        if contact_info.get('full_name') or contact_info.get('email'):
+            ContactInfo.objects.create(resume=resume, **contact_info)
+
+        WorkExperience.objects.bulk_create(
+            WorkExperience(resume=resume, **entry) for entry in parsed['work_experiences']
+        )
+        Education.objects.bulk_create(
+            Education(resume=resume, **entry) for entry in parsed['education_entries']
+        )
+        Skill.objects.bulk_create(
+            [Skill(resume=resume, **entry) for entry in parsed['skills']],
+            ignore_conflicts=True
+        )
+        # bulk_create sends no post_save, so count the skills for autocomplete here
+        for entry in parsed['skills']:
+            skill_index.record_usage(entry['name'])
+        record_version(resume.pk)
+        return resume
+
+    def _default_title(self, parsed) -> str:
+        """Name the imported resume after its owner when no title is given."""
+        full_name = parsed['contact_info'].get('full_name')
+        return f"{full_name} (imported)" if full_name else "Imported resume"
+
+    @contextmanager
+    def _stage(self, name):
+        """Record how long a stage takes, in milliseconds."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[name] = round((time.perf_counter() - started) * 1000, 2)
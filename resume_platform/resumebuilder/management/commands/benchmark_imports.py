@@ -0,0 +1,81 @@
+import os
+import sys
+import time
+import statistics
+import subprocess
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from resume_platform.warmup import DEFERRED_MODULES
+
+# What a fresh process does before it can serve its first request
+STARTUP_SCRIPT = (
+    "import django; django.setup(); "
+    "from django.urls import get_resolver; get_resolver().url_patterns"
+)
+
+
+class Command(BaseCommand):
+    """Measure how long a fresh process takes to load the project and its URLconf."""
+
+    help = "Benchmark startup import time and fail if deferred dependencies are imported eagerly."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--runs', type=int, default=5,
+            help="Number of fresh processes to time (default: 5)."
+        )
+        parser.add_argument(
+            '--budget-ms', type=float, default=None,
+            help="Fail if the median startup time exceeds this many milliseconds."
+        )
+        parser.add_argument(
+            '--top', type=int, default=10,
+            help="Number of slowest top-level imports to list (default: 10)."
+        )
+
+    def handle(self, *args, **options):
+        if options['runs'] < 1:
+            raise CommandError("--runs must be at least 1.")
+
+        env = {**os.environ, 'DJANGO_SETTINGS_MODULE': os.environ.get('DJANGO_SETTINGS_MODULE', 'resume_platform.settings')}
+        timings = []
+        for _ in range(options['runs']):
+            started = time.perf_counter()
+            result = subprocess.run(
+                [sys.executable, '-X', 'importtime', '-c', STARTUP_SCRIPT],
+                cwd=settings.BASE_DIR, env=env, capture_output=True, text=True
+            )
+            timings.append((time.perf_counter() - started) * 1000)
+            if result.returncode != 0:
+                raise CommandError(f"Startup failed:\n{result.stderr[-2000:]}")
+
+        imports = self._parse_importtime(result.stderr)
+        median = statistics.median(timings)
+        self.stdout.write(f"startup: median {median:.0f} ms, min {min(timings):.0f} ms over {len(timings)} runs")
+
+        top_level = sorted(
+            ((name, cumulative) for name, cumulative, depth in imports if depth == 0),
+            key=lambda item: item[1], reverse=True
+        )
+        for name, cumulative in top_level[:options['top']]:
+            self.stdout.write(f"  {cumulative / 1000:8.1f} ms  {name}")
+
+        loaded = {name for name, _, _ in imports}
+        eager = [module for module in DEFERRED_MODULES if module in loaded]
+        if eager:
+            raise CommandError(f"Deferred modules imported at startup: {', '.join(eager)}")
+        if options['budget_ms'] is not None and median > options['budget_ms']:
+            raise CommandError(f"Median startup {median:.0f} ms exceeds the {options['budget_ms']:.0f} ms budget.")
+        self.stdout.write(self.style.SUCCESS("No deferred modules were imported at startup."))
+
+    def _parse_importtime(self, stderr):
+        """Return (module, cumulative microseconds, nesting depth) for each -X importtime line."""
+        imports = []
+        for line in stderr.splitlines():
+            if not line.startswith('import time:') or 'cumulative' in line:
+                continue
+            _, cumulative, name = line[len('import time:'):].split('|')
+            stripped = name.lstrip()
+            imports.append((stripped, int(cumulative), (len(name) - len(stripped) - 1) // 2))
+        return imports
@@ -0,0 +1,85 @@
+import re
+import time
+import random
+from django.core.management.base import BaseCommand
+
+from resumebuilder.skill_dictionary import CANONICAL_SKILLS
+from resumebuilder.skill_extraction import SkillExtractor
+
+FILLER = (
+    "Led a cross-functional team delivering customer-facing features on schedule. "
+    "Improved reliability of the platform and reduced incident volume by 35%. "
+    "Worked closely with product and design to plan quarterly roadmaps. "
+)
+
+
+class Command(BaseCommand):
+    """Measure skill extraction throughput in documents per second."""
+
+    help = "Benchmark the Aho-Corasick skill extractor against a regex-per-skill baseline."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--documents', type=int, default=1000,
+            help="Number of documents to scan (default: 1000)."
+        )
+        parser.add_argument(
+            '--from-db', action='store_true',
+            help="Scan stored ExtractedResumeText rows instead of synthetic documents."
+        )
+        parser.add_argument(
+            '--skip-baseline', action='store_true',
+            help="Only time the automaton."
+        )
+
+    def handle(self, *args, **options):
+        documents = self._load_documents(options['documents'], options['from_db'])
+        if not documents:
+            self.stdout.write("No documents to scan.")
+            return
+        total_chars = sum(len(document) for document in documents)
+
+        started = time.perf_counter()
+        extractor = SkillExtractor()
+        build_ms = (time.perf_counter() - started) * 1000
+
+        started = time.perf_counter()
+        for document in documents:
+            extractor.extract(document)
+        elapsed = time.perf_counter() - started
+        self._report('automaton', len(documents), total_chars, elapsed)
+        self.stdout.write(f"  automaton build: {build_ms:.1f} ms, {len(extractor.goto)} states")
+
+        if not options['skip_baseline']:
+            patterns = [
+                re.compile(rf"(?<!\w){re.escape(name)}(?!\w)", re.IGNORECASE)
+                for canonical, (_, synonyms) in CANONICAL_SKILLS.items()
+                for name in [canonical, *synonyms]
+            ]
+            started = time.perf_counter()
+            for document in documents:
+                [pattern.findall(document) for pattern in patterns]
+            elapsed = time.perf_counter() - started
+            self._report(f'regex baseline ({len(patterns)} patterns)', len(documents), total_chars, elapsed)
+
+    def _load_documents(self, count, from_db):
+        if from_db:
+            from resumeenhancer.models import ExtractedResumeText
+
+            return list(ExtractedResumeText.objects.values_list('text', flat=True)[:count])
+
+        random.seed(0)
+        names = list(CANONICAL_SKILLS)
+        return [
+            " ".join(
+                FILLER + "Skills: " + ", ".join(random.sample(names, 12)) + "."
+                for _ in range(8)
+            )
+            for _ in range(count)
+        ]
+
+    def _report(self, label, documents, chars, elapsed):
+        self.stdout.write(
+            f"{label}: {documents / elapsed:,.0f} docs/s, "
+            f"{chars / elapsed / 1_000_000:.2f} MB/s ({elapsed * 1000:.1f} ms total)"
+        )
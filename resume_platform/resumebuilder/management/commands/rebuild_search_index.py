@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+
+from resumebuilder.models import Resume
+from resumebuilder.search import reindex_resume
+
+
+class Command(BaseCommand):
+    """Rebuild the resume search index from scratch."""
+
+    help = "Rebuild the search document of every resume, or of one user's resumes."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user', type=int, default=None,
+            help="Only rebuild resumes belonging to this user id."
+        )
+
+    def handle(self, *args, **options):
+        queryset = Resume.objects.order_by('id')
+        if options['user'] is not None:
+            queryset = queryset.filter(user_id=options['user'])
+
+        count = 0
+        for resume_id in queryset.values_list('id', flat=True).iterator():
+            reindex_resume(resume_id)
+            count += 1
+
+        self.stdout.write(self.style.SUCCESS(f"Reindexed {count} resumes."))
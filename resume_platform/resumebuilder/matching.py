@@ -0,0 +1,146 @@
+import numpy as np
+from collections import Counter
+from scipy import sparse
+from django.core.cache import cache
+from django.db.models import Count, Max
+
+from .models import ResumeSearchDocument
+from .search import FIELD_WEIGHTS, tokenize
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+
+# Words that are common in job postings but say nothing about the role
+JOB_POSTING_STOPWORDS = {
+    'ability', 'about', 'across', 'all', 'also', 'any', 'our', 'we', 'you',
+    'your', 'will', 'work', 'working', 'team', 'teams', 'role', 'job', 'company',
+    'candidate', 'candidates', 'experience', 'years', 'year', 'strong', 'plus',
+    'including', 'must', 'have', 'has', 'who', 'what', 'this', 'that', 'their',
+    'they', 'them', 'using', 'use', 'new', 'other', 'skills', 'required',
+    'preferred', 'responsibilities', 'requirements', 'qualifications', 'etc',
+    'help', 'join', 'looking', 'opportunity', 'well', 'can', 'more', 'such',
+    'not', 'but', 'into', 'per', 'each', 'while', 'within', 'based', 'bonus',
+}
+
+CORPUS_CACHE_TIMEOUT = 60 * 60
+
+
+class ResumeCorpus:
+    """
+    BM25 model over all of a user's resumes.
+
+    `matrix` is a CSR matrix (resumes x terms) of length-normalized,
+    saturated term frequencies; `idf` holds the inverse document frequency
+    of each term. Scoring a job description is a single sparse
+    matrix-vector product.
+    """
+
+    def __init__(self, documents):
+        self.resume_ids = [document['resume_id'] for document in documents]
+        self.titles = [document['resume__title'] for document in documents]
+        self.vocabulary = {}
+
+        rows, cols, values = [], [], []
+        lengths = np.zeros(len(documents))
+        for row, document in enumerate(documents):
+            frequencies = Counter()
+            for field, weight in FIELD_WEIGHTS.items():
+                for token in tokenize(document[field]):
+                    frequencies[token] += weight
+            lengths[row] = sum(frequencies.values())
+            for term, frequency in frequencies.items():
+                rows.append(row)
+                cols.append(self.vocabulary.setdefault(term, len(self.vocabulary)))
+                values.append(frequency)
+
+        shape = (len(documents), len(self.vocabulary))
+        tf = sparse.csr_matrix((values, (rows, cols)), shape=shape, dtype=np.float64)
+
+        n_documents = max(len(documents), 1)
+        document_frequency = np.bincount(tf.indices, minlength=shape[1])
+        self.idf = np.log(1 + (n_documents - document_frequency + 0.5) / (document_frequency + 0.5))
+        # Terms the user never wrote get the idf of a term seen in no resume
+        self.unseen_idf = np.log(1 + (n_documents + 0.5) / 0.5)
+
+        # Saturate each stored frequency in place: tf * (k1 + 1) / (tf + k1 * norm)
+        average_length = lengths.mean() if len(documents) else 1.0
+        norms = K1 * (1 - B + B * lengths / (average_length or 1.0))
+        row_norms = np.repeat(norms, np.diff(tf.indptr))
+        tf.data = tf.data * (K1 + 1) / (tf.data + row_norms)
+        self.matrix = tf
+
+    def extract_keywords(self, text, limit=25):
+        """Return the job description's most distinctive terms, highest weight first."""
+        frequencies = Counter(
+            token for token in tokenize(text)
+            if token not in JOB_POSTING_STOPWORDS and not token.isdigit() and len(token) > 1
+        )
+        weighted = {
+            term: frequency * (self.idf[self.vocabulary[term]] if term in self.vocabulary else self.unseen_idf)
+            for term, frequency in frequencies.items()
+        }
+        return sorted(weighted, key=lambda term: (-weighted[term], term))[:limit]
+
+    def rank(self, job_description, limit=None, keyword_limit=25):
+        """Score every resume against the job description in one pass."""
+        keywords = self.extract_keywords(job_description, limit=keyword_limit)
+        if not self.resume_ids:
+            return keywords, []
+
+        known = [term for term in keywords if term in self.vocabulary]
+        columns = np.array([self.vocabulary[term] for term in known], dtype=np.int64)
+
+        # BM25: sum over query terms of idf * saturated tf
+        query = np.zeros(len(self.vocabulary))
+        query[columns] = self.idf[columns]
+        scores = self.matrix @ query
+
+        # Which keywords each resume contains (resumes x keywords)
+        if len(columns):
+            present = (self.matrix[:, columns] > 0).toarray()
+        else:
+            present = np.zeros((len(self.resume_ids), 0), dtype=bool)
+        max_score = float(self.idf[columns].sum() * (K1 + 1)) if len(columns) else 0.0
+
+        order = np.argsort(-scores, kind='stable')
+        if limit is not None:
+            order = order[:limit]
+
+        results = []
+        for row in order:
+            matched = [term for term, hit in zip(known, present[row]) if hit]
+            matched_set = set(matched)
+            results.append({
+                'id': self.resume_ids[row],
+                'title': self.titles[row],
+                'score': round(100 * float(scores[row]) / max_score, 2) if max_score else 0.0,
+                'coverage': round(len(matched) / len(keywords), 4) if keywords else 0.0,
+                'matched_keywords': matched,
+                'missing_keywords': [term for term in keywords if term not in matched_set],
+            })
+        return keywords, results
+
+
+def get_corpus(user):
+    """
+    Return the user's ResumeCorpus, rebuilding it only when their search
+    documents changed since it was cached.
+    """
+    fingerprint = ResumeSearchDocument.objects.filter(user=user).aggregate(
+        count=Count('resume_id'),
+        last_updated=Max('updated_at')
+    )
+    last_updated = fingerprint['last_updated'].timestamp() if fingerprint['last_updated'] else 0
+    cache_key = f"resume-corpus:{user.pk}:{fingerprint['count']}:{last_updated}"
+
+    corpus = cache.get(cache_key)
+    if corpus is None:
+        documents = list(
+            ResumeSearchDocument.objects.filter(user=user)
+            .order_by('resume_id')
+            .values('resume_id', 'resume__title', *FIELD_WEIGHTS)
+        )
+        corpus = ResumeCorpus(documents)
+        cache.set(cache_key, corpus, CORPUS_CACHE_TIMEOUT)
+    return corpus
@@ -0,0 +1,65 @@
+# Generated by Django 5.2.3 on 2026-10-19 16:49
+
+import django.contrib.postgres.search
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def create_gin_index(apps, schema_editor):
+    # The tsvector column is only used on PostgreSQL; other databases use
+    # the ResumeSearchTerm inverted index instead.
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(
+            'CREATE INDEX resumebuild_search_vector_gin ON resumebuilder_resumesearchdocument '
+            'USING gin (search_vector)'
+        )
+
+
+def drop_gin_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute('DROP INDEX IF EXISTS resumebuild_search_vector_gin')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('resumebuilder', '0002_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResumeSearchDocument',
+            fields=[
+                ('resume', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='search_document', serialize=False, to='resumebuilder.resume')),
+                ('title_text', models.TextField(blank=True, help_text='Resume title')),
+                ('heading_text', models.TextField(blank=True, help_text='Roles, companies, degrees, institutions and skill names')),
+                ('body_text', models.TextField(blank=True, help_text='Work experience descriptions')),
+                ('search_vector', django.contrib.postgres.search.SearchVectorField(help_text='Weighted tsvector, only maintained on PostgreSQL', null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Resume Search Document',
+                'verbose_name_plural': 'Resume Search Documents',
+            },
+        ),
+        migrations.CreateModel(
+            name='ResumeSearchTerm',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('term', models.CharField(help_text='Normalized search term', max_length=100)),
+                ('weight', models.FloatField(help_text='Field-weighted, saturated term frequency')),
+                ('resume', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_terms', to='resumebuilder.resume')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Resume Search Term',
+                'verbose_name_plural': 'Resume Search Terms',
+                'indexes': [models.Index(fields=['user', 'term'], name='resumebuild_user_id_e4e004_idx')],
+                'unique_together': {('resume', 'term')},
+            },
+        ),
+        migrations.RunPython(create_gin_index, drop_gin_index),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.3 on 2026-10-19 16:57
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('resumebuilder', '0003_resumesearchdocument_resumesearchterm'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='resume',
+            name='version',
+            field=models.PositiveIntegerField(default=0, help_text='Number of the latest recorded ResumeVersion (0 before the first save)'),
+        ),
+        migrations.CreateModel(
+            name='ResumeVersion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('version', models.PositiveIntegerField(help_text='Version number, starting at 1')),
+                ('is_snapshot', models.BooleanField(default=False, help_text='Whether data holds the full document rather than a delta')),
+                ('data', models.JSONField(help_text='Full resume document for snapshots, otherwise the changes since the previous version')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('resume', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='versions', to='resumebuilder.resume')),
+            ],
+            options={
+                'verbose_name': 'Resume Version',
+                'verbose_name_plural': 'Resume Versions',
+                'ordering': ['-version'],
+                'constraints': [models.UniqueConstraint(fields=('resume', 'version'), name='unique_resume_version')],
+            },
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.3 on 2026-10-19 16:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('resumebuilder', '0004_resume_version'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='education',
+            options={'ordering': ['position', '-graduation_date'], 'verbose_name': 'Education', 'verbose_name_plural': 'Education Entries'},
+        ),
+        migrations.AlterModelOptions(
+            name='skill',
+            options={'ordering': ['position', 'category', 'name'], 'verbose_name': 'Skill', 'verbose_name_plural': 'Skills'},
+        ),
+        migrations.AlterModelOptions(
+            name='workexperience',
+            options={'ordering': ['position', '-start_date'], 'verbose_name': 'Work Experience', 'verbose_name_plural': 'Work Experiences'},
+        ),
+        migrations.AddField(
+            model_name='education',
+            name='position',
+            field=models.PositiveIntegerField(default=0, help_text='Display order within the resume section'),
+        ),
+        migrations.AddField(
+            model_name='skill',
+            name='position',
+            field=models.PositiveIntegerField(default=0, help_text='Display order within the resume section'),
+        ),
+        migrations.AddField(
+            model_name='workexperience',
+            name='position',
+            field=models.PositiveIntegerField(default=0, help_text='Display order within the resume section'),
+        ),
+    ]
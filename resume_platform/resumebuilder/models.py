@@ -1,5 +1,6 @@
 from django.db import models
 from django.conf import settings
+from django.contrib.postgres.search import SearchVectorField
 
 
 class Resume(models.Model):
@@ -16,6 +17,11 @@ class Resume(models.Model):
         help_text="Title or name for this resume"
     )
     
+    version = models.PositiveIntegerField(
+        default=0,
+        help_text="Number of the latest recorded ResumeVersion (0 before the first save)"
+    )
+    
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
@@ -98,11 +104,16 @@ class WorkExperience(models.Model):
         help_text="Job description and achievements"
     )
     
+    position = models.PositiveIntegerField(
+        default=0,
+        help_text="Display order within the resume section"
+    )
+    
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
-        ordering = ['-start_date']
+        ordering = ['position', '-start_date']
         verbose_name = 'Work Experience'
         verbose_name_plural = 'Work Experiences'
     
@@ -138,11 +149,16 @@ class Education(models.Model):
         help_text="Graduation date"
     )
     
+    position = models.PositiveIntegerField(
+        default=0,
+        help_text="Display order within the resume section"
+    )
+    
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
-        ordering = ['-graduation_date']
+        ordering = ['position', '-graduation_date']
         verbose_name = 'Education'
         verbose_name_plural = 'Education Entries'
     
@@ -178,14 +194,138 @@ class Skill(models.Model):
         help_text="Skill category"
     )
     
+    position = models.PositiveIntegerField(
+        default=0,
+        help_text="Display order within the resume section"
+    )
+    
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
-        ordering = ['category', 'name']
+        ordering = ['position', 'category', 'name']
         unique_together = ['resume', 'name']
         verbose_name = 'Skill'
         verbose_name_plural = 'Skills'
     
     def __str__(self):
         return f"{self.name} ({self.get_category_display()})"
+
+
+class ResumeVersion(models.Model):
+    """One entry in a resume's history: a full snapshot or a delta against the previous version."""
+    
+    resume = models.ForeignKey(
+        Resume,
+        on_delete=models.CASCADE,
+        related_name='versions'
+    )
+    
+    version = models.PositiveIntegerField(
+        help_text="Version number, starting at 1"
+    )
+    
+    is_snapshot = models.BooleanField(
+        default=False,
+        help_text="Whether data holds the full document rather than a delta"
+    )
+    
+    data = models.JSONField(
+        help_text="Full resume document for snapshots, otherwise the changes since the previous version"
+    )
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['-version']
+        constraints = [
+            models.UniqueConstraint(fields=['resume', 'version'], name='unique_resume_version'),
+        ]
+        verbose_name = 'Resume Version'
+        verbose_name_plural = 'Resume Versions'
+    
+    def __str__(self):
+        kind = 'snapshot' if self.is_snapshot else 'delta'
+        return f"{self.resume_id} v{self.version} ({kind})"
+
+
+class ResumeSearchDocument(models.Model):
+    """Denormalized search text for a resume, rebuilt whenever the resume or its sections change."""
+    
+    resume = models.OneToOneField(
+        Resume,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='search_document'
+    )
+    
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='+'
+    )
+    
+    title_text = models.TextField(
+        blank=True,
+        help_text="Resume title"
+    )
+    
+    heading_text = models.TextField(
+        blank=True,
+        help_text="Roles, companies, degrees, institutions and skill names"
+    )
+    
+    body_text = models.TextField(
+        blank=True,
+        help_text="Work experience descriptions"
+    )
+    
+    search_vector = SearchVectorField(
+        null=True,
+        help_text="Weighted tsvector, only maintained on PostgreSQL"
+    )
+    
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        verbose_name = 'Resume Search Document'
+        verbose_name_plural = 'Resume Search Documents'
+    
+    def __str__(self):
+        return f"Search document for resume {self.resume_id}"
+
+
+class ResumeSearchTerm(models.Model):
+    """Inverted index entry used to search resumes on databases without full-text support."""
+    
+    resume = models.ForeignKey(
+        Resume,
+        on_delete=models.CASCADE,
+        related_name='search_terms'
+    )
+    
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='+'
+    )
+    
+    term = models.CharField(
+        max_length=100,
+        help_text="Normalized search term"
+    )
+    
+    weight = models.FloatField(
+        help_text="Field-weighted, saturated term frequency"
+    )
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'term']),
+        ]
+        unique_together = ['resume', 'term']
+        verbose_name = 'Resume Search Term'
+        verbose_name_plural = 'Resume Search Terms'
+    
+    def __str__(self):
+        return f"{self.term} ({self.weight:.2f}) - resume {self.resume_id}"
@@ -0,0 +1,245 @@
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from .models import Resume, ContactInfo, WorkExperience, Education, Skill
+from .serializers import ContactInfoSerializer, WorkExperienceSerializer, EducationSerializer, SkillSerializer
+from .search import schedule_reindex
+from .versioning import record_version
+
+# List sections addressable as /<section>/<id>[/<field>] or /<section>/-
+LIST_SECTIONS = {
+    'work_experiences': (WorkExperience, WorkExperienceSerializer),
+    'education_entries': (Education, EducationSerializer),
+    'skills': (Skill, SkillSerializer),
+}
+SUPPORTED_OPS = {'add', 'replace', 'remove'}
+TITLE_MAX_LENGTH = Resume._meta.get_field('title').max_length
+
+
+class PatchError(Exception):
+    """An operation in a patch batch is malformed or cannot be applied."""
+
+    def __init__(self, message, index=None):
+        super().__init__(message)
+        self.message = message
+        self.index = index
+
+
+class VersionConflict(Exception):
+    """The resume changed after the version the batch was based on."""
+
+    def __init__(self, current_version):
+        super().__init__(f"Resume is at version {current_version}")
+        self.current_version = current_version
+
+
+def _parse_pointer(path):
+    """Split a JSON pointer into its unescaped segments."""
+    if not isinstance(path, str) or not path.startswith('/'):
+        raise ValueError("path must be a JSON pointer starting with '/'")
+    return [segment.replace('~1', '/').replace('~0', '~') for segment in path[1:].split('/')]
+
+
+def _validation_message(errors):
+    return '; '.join(
+        f"{field}: {' '.join(str(message) for message in messages)}" if isinstance(messages, list) else f"{field}: {messages}"
+        for field, messages in errors.items()
+    )
+
+
+class ResumePatch:
+    """
+    Applies an ordered batch of JSON-Patch style operations to a resume.
+
+    Supported paths (list entries are addressed by id, `-` appends):
+        /title                               replace
+        /contact_info                        add, replace, remove
+        /contact_info/<field>                replace
+        /<section>/-                         add
+        /<section>/<id>                      replace, remove
+        /<section>/<id>/<field>              replace
+
+    The batch is applied in one transaction with a fixed number of queries
+    per touched section: one read of the referenced rows, then at most one
+    bulk_create, bulk_update and delete each. The base version is checked
+    by a conditional update, so a stale batch is rejected without holding
+    a lock while the operations are validated.
+    """
+
+    def __init__(self, operations):
+        self.operations = [self._parse(index, operation) for index, operation in enumerate(operations)]
+
+    def _parse(self, index, operation):
+        if not isinstance(operation, dict):
+            raise PatchError("Each operation must be an object.", index)
+        op = operation.get('op')
+        if op not in SUPPORTED_OPS:
+            raise PatchError(f"Unsupported op {op!r}; use one of {sorted(SUPPORTED_OPS)}.", index)
+        try:
+            segments = _parse_pointer(operation.get('path'))
+        except ValueError as e:
+            raise PatchError(str(e), index)
+        if op != 'remove' and 'value' not in operation:
+            raise PatchError(f"'{op}' requires a value.", index)
+
+        target, rest = segments[0], segments[1:]
+        if target == 'title':
+            if op != 'replace' or rest:
+                raise PatchError("The title only supports 'replace' at /title.", index)
+            value = operation['value']
+            if not isinstance(value, str) or not value.strip() or len(value) > TITLE_MAX_LENGTH:
+                raise PatchError(f"title must be a non-empty string of at most {TITLE_MAX_LENGTH} characters.", index)
+        elif target == 'contact_info':
+            if len(rest) > 1 or (rest and op != 'replace'):
+                raise PatchError("Contact info fields only support 'replace'.", index)
+        elif target in LIST_SECTIONS:
+            if not rest or len(rest) > 2:
+                raise PatchError(f"Address entries as /{target}/<id> or /{target}/-.", index)
+            if rest[0] == '-':
+                if op != 'add' or len(rest) > 1:
+                    raise PatchError(f"/{target}/- only supports 'add'.", index)
+            elif not rest[0].isdigit():
+                raise PatchError(f"Entry ids must be integers, got {rest[0]!r}.", index)
+            elif op == 'add':
+                raise PatchError(f"Use /{target}/- to add an entry.", index)
+            elif len(rest) == 2 and op != 'replace':
+                raise PatchError("Entry fields only support 'replace'.", index)
+            else:
+                rest[0] = int(rest[0])
+        else:
+            raise PatchError(f"Unknown path {operation.get('path')!r}.", index)
+
+        return {'index': index, 'op': op, 'target': target, 'rest': rest, 'value': operation.get('value')}
+
+    def apply(self, resume_id, user, base_version):
+        """Apply the batch; returns (new version, ids of added entries per section)."""
+        try:
+            with transaction.atomic():
+                return self._apply(resume_id, user, base_version)
+        except IntegrityError:
+            raise PatchError("The batch would create a duplicate entry.")
+
+    def _apply(self, resume_id, user, base_version):
+        titles = [operation['value'] for operation in self.operations if operation['target'] == 'title']
+        changes = {'updated_at': timezone.now()}
+        if titles:
+            changes['title'] = titles[-1]
+
+        # Optimistic precondition: only a resume still at base_version is touched
+        if not Resume.objects.filter(pk=resume_id, user=user, version=base_version).update(**changes):
+            current = Resume.objects.filter(pk=resume_id, user=user).values_list('version', flat=True).first()
+            if current is None:
+                raise Resume.DoesNotExist
+            raise VersionConflict(current)
+
+        self._apply_contact_info(resume_id)
+        created = {}
+        for section, (model, serializer_class) in LIST_SECTIONS.items():
+            operations = [operation for operation in self.operations if operation['target'] == section]
+            if operations:
+                created[section] = self._apply_section(resume_id, model, serializer_class, operations)
+
+        schedule_reindex(resume_id)
+        return record_version(resume_id), created
+
+    def _apply_contact_info(self, resume_id):
+        operations = [operation for operation in self.operations if operation['target'] == 'contact_info']
+        if not operations:
+            return
+
+        contact_info = ContactInfo.objects.filter(resume_id=resume_id).first()
+        present = contact_info is not None
+        for operation in operations:
+            if operation['op'] == 'remove':
+                present = False
+                continue
+            if operation['rest'] and not present:
+                raise PatchError("The resume has no contact info to update.", operation['index'])
+
+            data, partial = self._operation_data(operation, 1)
+            serializer = ContactInfoSerializer(contact_info if present else None, data=data, partial=partial)
+            if not serializer.is_valid():
+                raise PatchError(_validation_message(serializer.errors), operation['index'])
+            if contact_info is None:
+                contact_info = ContactInfo(resume_id=resume_id)
+            self._assign(contact_info, serializer, partial)
+            present = True
+
+        if present:
+            contact_info.save()
+        elif contact_info is not None and contact_info.pk:
+            contact_info.delete()
+
+    def _apply_section(self, resume_id, model, serializer_class, operations):
+        ids = {operation['rest'][0] for operation in operations if operation['rest'][0] != '-'}
+        entries = model.objects.filter(resume_id=resume_id).in_bulk(ids) if ids else {}
+
+        added, removed, dirty_fields = [], set(), set()
+        next_position = None
+        for operation in operations:
+            index, entry_id = operation['index'], operation['rest'][0]
+
+            if entry_id == '-':
+                serializer = serializer_class(data=operation['value'])
+                if not serializer.is_valid():
+                    raise PatchError(_validation_message(serializer.errors), index)
+                data = serializer.validated_data
+                if 'position' not in data:
+                    if next_position is None:
+                        next_position = self._next_position(model, resume_id)
+                    data['position'] = next_position
+                    next_position += 1
+                added.append(model(resume_id=resume_id, **data))
+                continue
+
+            entry = entries.get(entry_id)
+            if entry is None or entry_id in removed:
+                raise PatchError(f"Entry {entry_id} was not found in this section.", index)
+
+            if operation['op'] == 'remove':
+                removed.add(entry_id)
+                continue
+
+            data, partial = self._operation_data(operation, 2)
+            serializer = serializer_class(entry, data=data, partial=partial)
+            if not serializer.is_valid():
+                raise PatchError(_validation_message(serializer.errors), index)
+            dirty_fields.update(self._assign(entry, serializer, partial))
+            if partial and not serializer.validated_data:
+                raise PatchError(f"{operation['rest'][-1]!r} is not an editable field.", index)
+
+        if removed:
+            model.objects.filter(pk__in=removed).delete()
+        updated = [entry for pk, entry in entries.items() if pk not in removed]
+        if dirty_fields and updated:
+            now = timezone.now()
+            for entry in updated:
+                entry.updated_at = now
+            model.objects.bulk_update(updated, [*dirty_fields, 'updated_at'])
+        if added:
+            model.objects.bulk_create(added)
+        return [entry.pk for entry in added]
+
+    def _operation_data(self, operation, field_depth):
+        """Return (data, partial) for a whole-object or single-field operation."""
+        if len(operation['rest']) == field_depth:
+            return {operation['rest'][-1]: operation['value']}, True
+        return operation['value'], False
+
+    def _assign(self, instance, serializer, partial):
+        """Copy validated values onto the instance; a whole-object replace clears omitted optional fields."""
+        values = dict(serializer.validated_data)
+        if not partial:
+            for field in serializer.fields.values():
+                if field.read_only or field.source in values:
+                    continue
+                model_field = instance._meta.get_field(field.source)
+                if model_field.blank:
+                    values[field.source] = model_field.get_default()
+        for field, value in values.items():
+            setattr(instance, field, value)
+        return values.keys()
+
+    def _next_position(self, model, resume_id):
+        last = model.objects.filter(resume_id=resume_id).order_by('-position').values_list('position', flat=True).first()
+        return 0 if last is None else last + 1
@@ -1,6 +1,21 @@
 from rest_framework import permissions
 
 
+def _owns(request, obj):
+    """
+    Whether the request's user owns obj, or None for objects without an owner.
+    Compares ids so neither the owner nor the parent resume is loaded.
+    """
+    if hasattr(obj, 'user_id'):
+        return obj.user_id == request.user.pk
+    elif hasattr(obj, 'resume_user_id'):
+        # Annotated by querysets that already join the parent resume
+        return obj.resume_user_id == request.user.pk
+    elif hasattr(obj, 'resume'):
+        return obj.resume.user_id == request.user.pk
+    return None
+
+
 class IsPremiumUser(permissions.BasePermission):
     """Permission class to check if user has premium subscription."""
     
@@ -21,12 +36,7 @@ class IsPremiumUser(permissions.BasePermission):
             return False
         
         # For resume-related objects, ensure user owns the resume
-        if hasattr(obj, 'user'):
-            return obj.user == request.user
-        elif hasattr(obj, 'resume'):
-            return obj.resume.user == request.user
-        
-        return True
+        return _owns(request, obj) is not False
 
 
 class IsOwnerOrReadOnly(permissions.BasePermission):
@@ -39,12 +49,7 @@ class IsOwnerOrReadOnly(permissions.BasePermission):
             return True
         
         # Write permissions only for the owner
-        if hasattr(obj, 'user'):
-            return obj.user == request.user
-        elif hasattr(obj, 'resume'):
-            return obj.resume.user == request.user
-        
-        return False
+        return _owns(request, obj) is True
 
 
 class IsPremiumOrReadOnly(permissions.BasePermission):
@@ -66,19 +71,10 @@ class IsPremiumOrReadOnly(permissions.BasePermission):
         """Check object-level permissions."""
         # Read permissions for any authenticated user who owns the object
         if request.method in permissions.SAFE_METHODS:
-            if hasattr(obj, 'user'):
-                return obj.user == request.user
-            elif hasattr(obj, 'resume'):
-                return obj.resume.user == request.user
-            return True
+            return _owns(request, obj) is not False
         
         # Write permissions only for premium users who own the object
         if request.user.subscription_status != 'premium':
             return False
         
-        if hasattr(obj, 'user'):
-            return obj.user == request.user
-        elif hasattr(obj, 'resume'):
-            return obj.resume.user == request.user
-        
-        return False
\ No newline at end of file
+        return _owns(request, obj) is True
\ No newline at end of file
@@ -0,0 +1,494 @@
+import os
+import re
+import io
+import zlib
+import zipfile
+import unicodedata
+from datetime import date
+from xml.sax.saxutils import escape
+
+from .truetype import TrueTypeFont
+
+# Renders the plain documents built by versioning without touching Django,
+# so render() can run in a separate worker process.
+RENDER_FORMATS = ('pdf', 'docx')
+
+# DejaVu Sans covers Latin, Greek and Cyrillic; it is embedded, subset to
+# the glyphs each PDF draws, so text is never re-encoded into a legacy charset
+FONT_DIR = os.path.join(os.path.dirname(__file__), 'fonts')
+PDF_FONT_FILES = {'regular': 'DejaVuSans.ttf', 'bold': 'DejaVuSans-Bold.ttf'}
+# Right-to-left scripts would need shaping and reordering the renderer doesn't do
+RTL_CLASSES = ('R', 'AL')
+
+BULLET_PATTERN = re.compile(r'^\s*[-*•]\s+')
+INVALID_XML_CHARS = re.compile(r'[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+
+class UnsupportedCharacters(ValueError):
+    """The resume has characters the PDF fonts can't draw; nothing is substituted for them."""
+
+    def __init__(self, characters):
+        super().__init__(characters)
+        self.characters = characters
+
+    def __str__(self):
+        return f"The PDF font can't draw these characters: {' '.join(self.characters)}"
+
+
+_fonts = {}
+
+
+def pdf_fonts():
+    """The PDF fonts by weight, parsed once per process."""
+    if not _fonts:
+        for weight, file_name in PDF_FONT_FILES.items():
+            _fonts[weight] = TrueTypeFont(os.path.join(FONT_DIR, file_name))
+    return _fonts
+
+
+class ResumeTemplate:
+    """
+    Page geometry and typography of one export template, in points.
+
+    The parts that don't depend on the resume (DOCX styles and package
+    files) are compiled once per process and reused.
+    """
+
+    def __init__(self, name, body_size, heading_size, name_size, margin, leading, accent,
+                 page_width=612, page_height=792, uppercase_headings=True):
+        self.name = name
+        self.body_size = body_size
+        self.heading_size = heading_size
+        self.name_size = name_size
+        self.margin = margin
+        self.leading = leading
+        self.accent = accent
+        self.page_width = page_width
+        self.page_height = page_height
+        self.uppercase_headings = uppercase_headings
+        self._docx_parts = None
+
+    @property
+    def text_width(self):
+        return self.page_width - 2 * self.margin
+
+    @property
+    def accent_hex(self):
+        return ''.join(f"{round(channel * 255):02X}" for channel in self.accent)
+
+    def docx_parts(self):
+        """The package files that don't depend on the resume, compiled on first use."""
+        if self._docx_parts is None:
+            self._docx_parts = {
+                '[Content_Types].xml': DOCX_CONTENT_TYPES,
+                '_rels/.rels': DOCX_RELS,
+                'word/_rels/document.xml.rels': DOCX_DOCUMENT_RELS,
+                'word/styles.xml': self._docx_styles(),
+            }
+        return self._docx_parts
+
+    def _docx_styles(self):
+        # Sizes are in half-points, distances in twentieths of a point
+        right_tab = round(self.text_width * 20)
+        spacing = round((self.leading - 1) * self.body_size * 20)
+        return DOCX_STYLES.format(
+            body=round(self.body_size * 2),
+            heading=round(self.heading_size * 2),
+            name=round(self.name_size * 2),
+            accent=self.accent_hex,
+            caps='<w:caps/>' if self.uppercase_headings else '',
+            right_tab=right_tab,
+            spacing=spacing,
+        )
+
+
+TEMPLATES = {
+    'classic': ResumeTemplate(
+        'classic', body_size=10.5, heading_size=12, name_size=22, margin=54, leading=1.35,
+        accent=(0.12, 0.29, 0.49)
+    ),
+    'compact': ResumeTemplate(
+        'compact', body_size=9.5, heading_size=10.5, name_size=18, margin=40, leading=1.25,
+        accent=(0.2, 0.2, 0.2), uppercase_headings=False
+    ),
+}
+DEFAULT_TEMPLATE = 'classic'
+
+
+def _format_date(value):
+    """'2020-01-15' -> 'Jan 2020'; None -> 'Present'."""
+    if not value:
+        return 'Present'
+    return date.fromisoformat(value[:10]).strftime('%b %Y')
+
+
+def layout(document):
+    """
+    Turn a resume document into a flat list of blocks shared by both formats:
+    ('name' | 'contact' | 'heading' | 'text' | 'bullet', text) and
+    ('entry', left, right).
+    """
+    contact = document.get('contact_info') or {}
+    blocks = [('name', contact.get('full_name') or document['title'])]
+    details = [contact.get(field) for field in ('email', 'phone', 'location')]
+    if any(details):
+        blocks.append(('contact', '  |  '.join(detail for detail in details if detail)))
+
+    if document['work_experiences']:
+        blocks.append(('heading', 'Experience'))
+        for entry in document['work_experiences']:
+            dates = f"{_format_date(entry['start_date'])} - {_format_date(entry['end_date'])}"
+            blocks.append(('entry', f"{entry['role']}, {entry['company']}", dates))
+            for line in (entry['description'] or '').splitlines():
+                if not line.strip():
+                    continue
+                if BULLET_PATTERN.match(line):
+                    blocks.append(('bullet', BULLET_PATTERN.sub('', line)))
+                else:
+                    blocks.append(('text', line.strip()))
+
+    if document['education_entries']:
+        blocks.append(('heading', 'Education'))
+        for entry in document['education_entries']:
+            blocks.append(('entry', entry['degree'], _format_date(entry['graduation_date'])))
+            blocks.append(('text', entry['institution']))
+
+    if document['skills']:
+        blocks.append(('heading', 'Skills'))
+        categories = {}
+        for skill in document['skills']:
+            categories.setdefault(skill['category'], []).append(skill['name'])
+        for category, names in categories.items():
+            blocks.append(('text', f"{category.capitalize()}: {', '.join(names)}"))
+    return blocks
+
+
+def text_width(text, size, bold=False):
+    """Width of a line of text in points."""
+    return pdf_fonts()['bold' if bold else 'regular'].width(text) * size / 1000
+
+
+def wrap(text, size, max_width, bold=False):
+    """Greedy word wrap; words longer than a line are split."""
+    lines, current = [], ''
+    for word in text.split():
+        candidate = f"{current} {word}" if current else word
+        if text_width(candidate, size, bold) <= max_width:
+            current = candidate
+            continue
+        if current:
+            lines.append(current)
+        while text_width(word, size, bold) > max_width:
+            cut = len(word) - 1
+            while cut > 1 and text_width(word[:cut], size, bold) > max_width:
+                cut -= 1
+            lines.append(word[:cut])
+            word = word[cut:]
+        current = word
+    if current:
+        lines.append(current)
+    return lines or ['']
+
+
+class _PdfFont:
+    """One font as used by one document: the glyphs drawn and the text they stand for."""
+
+    def __init__(self, font):
+        self.font = font
+        self.used = {}
+
+    def encode(self, text, missing):
+        """The text as a hex string of glyph ids; characters without a glyph go to `missing`."""
+        glyphs = []
+        for char in text:
+            glyph = self.font.glyph(char)
+            if glyph is None or unicodedata.bidirectional(char) in RTL_CLASSES:
+                missing.add(char)
+                continue
+            self.used.setdefault(glyph, char)
+            glyphs.append(b'%04X' % glyph)
+        return b'<' + b''.join(glyphs) + b'>'
+
+    def objects(self, first_id):
+        """
+        The Type0 font, its CIDFontType2 descendant, descriptor, subset font
+        file and ToUnicode CMap, numbered from first_id.
+        """
+        font = self.font
+        glyphs = sorted(self.used)
+        base_font = f"{font.subset_tag(glyphs)}+{font.name}".encode()
+        file_data = font.subset(glyphs)
+        font_file = zlib.compress(file_data)
+        to_unicode = zlib.compress(_to_unicode_cmap(self.used))
+        widths = b' '.join(b'%d [%d]' % (glyph, font.widths[glyph]) for glyph in glyphs)
+        return [
+            b'<< /Type /Font /Subtype /Type0 /BaseFont /%s /Encoding /Identity-H '
+            b'/DescendantFonts [%d 0 R] /ToUnicode %d 0 R >>' % (base_font, first_id + 1, first_id + 4),
+            b'<< /Type /Font /Subtype /CIDFontType2 /BaseFont /%s '
+            b'/CIDSystemInfo << /Registry (Adobe) /Ordering (Identity) /Supplement 0 >> '
+            b'/FontDescriptor %d 0 R /CIDToGIDMap /Identity /W [%s] >>' % (base_font, first_id + 2, widths),
+            b'<< /Type /FontDescriptor /FontName /%s /Flags 32 /FontBBox [%d %d %d %d] /ItalicAngle %d '
+            b'/Ascent %d /Descent %d /CapHeight %d /StemV 80 /FontFile2 %d 0 R >>' % (
+                base_font, *font.bbox, font.italic_angle, font.ascent, font.descent, font.cap_height, first_id + 3
+            ),
+            b'<< /Length %d /Length1 %d /Filter /FlateDecode >>\nstream\n%s\nendstream' % (
+                len(font_file), len(file_data), font_file
+            ),
+            b'<< /Length %d /Filter /FlateDecode >>\nstream\n%s\nendstream' % (len(to_unicode), to_unicode),
+        ]
+
+
+def _to_unicode_cmap(used):
+    """CMap mapping glyph ids back to text, so the PDF's text can be copied and searched."""
+    entries = [
+        b'<%04X> <%s>' % (glyph, char.encode('utf-16-be').hex().upper().encode())
+        for glyph, char in sorted(used.items())
+    ]
+    chunks = [
+        b'%d beginbfchar\n%s\nendbfchar' % (len(entries[start:start + 100]), b'\n'.join(entries[start:start + 100]))
+        for start in range(0, len(entries), 100)
+    ]
+    return (
+        b'/CIDInit /ProcSet findresource begin\n12 dict begin\nbegincmap\n'
+        b'/CIDSystemInfo << /Registry (Adobe) /Ordering (UCS) /Supplement 0 >> def\n'
+        b'/CMapName /Adobe-Identity-UCS def\n/CMapType 2 def\n'
+        b'1 begincodespacerange\n<0000> <FFFF>\nendcodespacerange\n'
+        + b'\n'.join(chunks) +
+        b'\nendcmap\nCMapName currentdict /CMap defineresource pop\nend\nend'
+    )
+
+
+class _PdfPages:
+    """Lays out blocks top to bottom, starting a new page when one fills up."""
+
+    def __init__(self, template):
+        self.template = template
+        self.pages = []
+        fonts = pdf_fonts()
+        self.fonts = {b'/F1': _PdfFont(fonts['regular']), b'/F2': _PdfFont(fonts['bold'])}
+        # Characters no font could draw; the render fails rather than drop them
+        self.missing = set()
+        self._new_page()
+
+    def _new_page(self):
+        self.ops = []
+        self.pages.append(self.ops)
+        self.y = self.template.page_height - self.template.margin
+
+    def advance(self, height):
+        if self.y - height < self.template.margin:
+            self._new_page()
+        self.y -= height
+
+    def text(self, text, size, x, bold=False, color=None):
+        font = b'/F2' if bold else b'/F1'
+        if color:
+            self.ops.append(b'%.3f %.3f %.3f rg' % color)
+        encoded = self.fonts[font].encode(text, self.missing)
+        self.ops.append(b'BT %s %.2f Tf %.2f %.2f Td %s Tj ET' % (font, size, x, self.y, encoded))
+        if color:
+            self.ops.append(b'0 g')
+
+    def rule(self, y, color):
+        template = self.template
+        self.ops.append(
+            b'%.3f %.3f %.3f RG 0.75 w %.2f %.2f m %.2f %.2f l S' %
+            (*color, template.margin, y, template.page_width - template.margin, y)
+        )
+
+    def paragraph(self, text, size, indent=0, bold=False, color=None, first_prefix=None):
+        template = self.template
+        for index, line in enumerate(wrap(text, size, template.text_width - indent, bold)):
+            self.advance(size * template.leading)
+            if index == 0 and first_prefix:
+                self.text(first_prefix, size, template.margin + indent - size)
+            self.text(line, size, template.margin + indent, bold, color)
+
+
+def render_pdf(document, template):
+    pages = _PdfPages(template)
+    size = template.body_size
+    for block in layout(document):
+        # Composed forms, so an accent typed as a combining mark uses the accented glyph
+        block = (block[0], *(unicodedata.normalize('NFC', part) for part in block[1:]))
+        kind = block[0]
+        if kind == 'name':
+            pages.paragraph(block[1], template.name_size, bold=True, color=template.accent)
+        elif kind == 'contact':
+            pages.paragraph(block[1], size)
+        elif kind == 'heading':
+            heading = block[1].upper() if template.uppercase_headings else block[1]
+            pages.advance(size * 0.6)
+            pages.paragraph(heading, template.heading_size, bold=True, color=template.accent)
+            pages.rule(pages.y - 3, template.accent)
+            pages.advance(4)
+        elif kind == 'entry':
+            _, left, right = block
+            right_width = text_width(right, size)
+            lines = wrap(left, size, template.text_width - right_width - size, bold=True)
+            pages.advance(size * template.leading + 2)
+            pages.text(lines[0], size, template.margin, bold=True)
+            pages.text(right, size, template.page_width - template.margin - right_width)
+            for line in lines[1:]:
+                pages.paragraph(line, size, bold=True)
+        elif kind == 'bullet':
+            pages.paragraph(block[1], size, indent=size * 1.2, first_prefix='•')
+        else:
+            pages.paragraph(block[1], size)
+
+    if pages.missing:
+        raise UnsupportedCharacters(sorted(pages.missing))
+
+    # Objects: catalog, page tree, the objects of each font, then a page and
+    # its content per page
+    fonts = list(pages.fonts.items())
+    font_ids = [3 + 5 * index for index in range(len(fonts))]
+    first_page = 3 + 5 * len(fonts)
+    page_ids = [first_page + 2 * index for index in range(len(pages.pages))]
+    objects = [
+        b'<< /Type /Catalog /Pages 2 0 R >>',
+        b'<< /Type /Pages /Kids [%s] /Count %d >>' % (b' '.join(b'%d 0 R' % pid for pid in page_ids), len(page_ids)),
+    ]
+    for font_id, (_, font) in zip(font_ids, fonts):
+        objects.extend(font.objects(font_id))
+    font_resources = b' '.join(b'%s %d 0 R' % (name, font_id) for font_id, (name, _) in zip(font_ids, fonts))
+    for page_id, ops in zip(page_ids, pages.pages):
+        stream = zlib.compress(b'\n'.join(ops))
+        objects.append(
+            b'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %d %d] /Contents %d 0 R '
+            b'/Resources << /Font << %s >> >> >>' %
+            (template.page_width, template.page_height, page_id + 1, font_resources)
+        )
+        objects.append(b'<< /Length %d /Filter /FlateDecode >>\nstream\n%s\nendstream' % (len(stream), stream))
+
+    out = io.BytesIO()
+    out.write(b'%PDF-1.4\n%\xe2\xe3\xcf\xd3\n')
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(out.tell())
+        out.write(b'%d 0 obj\n%s\nendobj\n' % (number, body))
+    xref = out.tell()
+    out.write(b'xref\n0 %d\n0000000000 65535 f \n' % (len(objects) + 1))
+    out.write(b''.join(b'%010d 00000 n \n' % offset for offset in offsets))
+    out.write(b'trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (len(objects) + 1, xref))
+    return out.getvalue()
+
+
+def _docx_run(text, bold=False):
+    text = escape(INVALID_XML_CHARS.sub('', text))
+    properties = '<w:rPr><w:b/></w:rPr>' if bold else ''
+    return f'<w:r>{properties}<w:t xml:space="preserve">{text}</w:t></w:r>'
+
+
+def _docx_paragraph(style, runs):
+    return f'<w:p><w:pPr><w:pStyle w:val="{style}"/></w:pPr>{runs}</w:p>'
+
+
+def render_docx(document, template):
+    styles = {'name': 'Title', 'contact': 'Contact', 'heading': 'Heading1', 'bullet': 'Bullet', 'text': 'Normal'}
+    paragraphs = []
+    for block in layout(document):
+        kind = block[0]
+        if kind == 'entry':
+            runs = _docx_run(block[1], bold=True) + '<w:r><w:tab/></w:r>' + _docx_run(block[2])
+            paragraphs.append(_docx_paragraph('Entry', runs))
+        elif kind == 'bullet':
+            paragraphs.append(_docx_paragraph('Bullet', _docx_run(f"•\t{block[1]}")))
+        else:
+            paragraphs.append(_docx_paragraph(styles[kind], _docx_run(block[1])))
+
+    margin = round(template.margin * 20)
+    body = DOCX_DOCUMENT.format(
+        paragraphs=''.join(paragraphs),
+        width=template.page_width * 20,
+        height=template.page_height * 20,
+        margin=margin,
+    )
+
+    out = io.BytesIO()
+    with zipfile.ZipFile(out, 'w', zipfile.ZIP_DEFLATED) as package:
+        # A fixed timestamp keeps the output identical for identical input
+        for name, content in [*template.docx_parts().items(), ('word/document.xml', body)]:
+            package.writestr(zipfile.ZipInfo(name, date_time=(1980, 1, 1, 0, 0, 0)), content, zipfile.ZIP_DEFLATED)
+    return out.getvalue()
+
+
+def render(document, template_name, file_format):
+    """Render a resume document; the entry point run in the render pool."""
+    template = TEMPLATES[template_name]
+    if file_format == 'pdf':
+        return render_pdf(document, template)
+    if file_format == 'docx':
+        return render_docx(document, template)
+    raise ValueError(f"Unsupported export format {file_format!r}")
+
+
+def warm(template_names=None):
+    """Load the fonts and compile the templates in this process; used to start pool workers early."""
+    pdf_fonts()
+    for name in template_names or TEMPLATES:
+        TEMPLATES[name].docx_parts()
+
+
+DOCX_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/word/document.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+    '<Override PartName="/word/styles.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.styles+xml"/>'
+    '</Types>'
+)
+
+DOCX_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="word/document.xml"/>'
+    '</Relationships>'
+)
+
+DOCX_DOCUMENT_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" '
+    'Target="styles.xml"/>'
+    '</Relationships>'
+)
+
+DOCX_STYLES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<w:styles xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+    '<w:docDefaults><w:rPrDefault><w:rPr>'
+    '<w:rFonts w:ascii="Helvetica" w:hAnsi="Helvetica" w:cs="Arial"/>'
+    '<w:sz w:val="{body}"/></w:rPr></w:rPrDefault>'
+    '<w:pPrDefault><w:pPr><w:spacing w:after="{spacing}"/></w:pPr></w:pPrDefault></w:docDefaults>'
+    '<w:style w:type="paragraph" w:default="1" w:styleId="Normal"><w:name w:val="Normal"/></w:style>'
+    '<w:style w:type="paragraph" w:styleId="Title"><w:name w:val="Title"/><w:basedOn w:val="Normal"/>'
+    '<w:rPr><w:b/><w:color w:val="{accent}"/><w:sz w:val="{name}"/></w:rPr></w:style>'
+    '<w:style w:type="paragraph" w:styleId="Contact"><w:name w:val="Contact"/><w:basedOn w:val="Normal"/></w:style>'
+    '<w:style w:type="paragraph" w:styleId="Heading1"><w:name w:val="heading 1"/><w:basedOn w:val="Normal"/>'
+    '<w:pPr><w:keepNext/><w:spacing w:before="240" w:after="80"/>'
+    '<w:pBdr><w:bottom w:val="single" w:sz="6" w:space="1" w:color="{accent}"/></w:pBdr></w:pPr>'
+    '<w:rPr><w:b/>{caps}<w:color w:val="{accent}"/><w:sz w:val="{heading}"/></w:rPr></w:style>'
+    '<w:style w:type="paragraph" w:styleId="Entry"><w:name w:val="Entry"/><w:basedOn w:val="Normal"/>'
+    '<w:pPr><w:keepNext/><w:tabs><w:tab w:val="right" w:pos="{right_tab}"/></w:tabs>'
+    '<w:spacing w:before="80" w:after="0"/></w:pPr></w:style>'
+    '<w:style w:type="paragraph" w:styleId="Bullet"><w:name w:val="Bullet"/><w:basedOn w:val="Normal"/>'
+    '<w:pPr><w:tabs><w:tab w:val="left" w:pos="360"/></w:tabs><w:ind w:left="360" w:hanging="240"/></w:pPr></w:style>'
+    '</w:styles>'
+)
+
+DOCX_DOCUMENT = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"><w:body>'
+    '{paragraphs}'
+    '<w:sectPr><w:pgSz w:w="{width}" w:h="{height}"/>'
+    '<w:pgMar w:top="{margin}" w:right="{margin}" w:bottom="{margin}" w:left="{margin}" '
+    'w:header="0" w:footer="0" w:gutter="0"/></w:sectPr>'
+    '</w:body></w:document>'
+)
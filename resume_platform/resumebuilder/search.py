@@ -0,0 +1,214 @@
+import re
+import math
+import threading
+from collections import Counter, defaultdict
+from django.db import connection, transaction
+from django.db.models import F
+
+from .models import Resume, ResumeSearchDocument, ResumeSearchTerm
+
+# Weight of each document field in ranking (PostgreSQL weights A, B, C)
+FIELD_WEIGHTS = {
+    'title_text': 3.0,
+    'heading_text': 2.0,
+    'body_text': 1.0,
+}
+POSTGRES_WEIGHTS = {
+    'title_text': 'A',
+    'heading_text': 'B',
+    'body_text': 'C',
+}
+SEARCH_CONFIG = 'english'
+
+# BM25 term-frequency saturation
+K1 = 1.2
+
+TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#.]*")
+STOPWORDS = {
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'for', 'from', 'in',
+    'is', 'it', 'of', 'on', 'or', 'the', 'to', 'with', 'was', 'were',
+}
+
+_pending = threading.local()
+
+
+def tokenize(text):
+    """Split text into lowercase terms, keeping names like c++, c# and node.js intact."""
+    tokens = []
+    for token in TOKEN_RE.findall(text.lower()):
+        token = token.rstrip('.')
+        if token and token not in STOPWORDS and len(token) <= 100:
+            tokens.append(token)
+    return tokens
+
+
+def use_postgres_search():
+    """Whether the native tsvector/GIN search can be used."""
+    return connection.vendor == 'postgresql'
+
+
+def build_document_fields(resume):
+    """Collect the searchable text of a resume into weighted fields."""
+    headings = []
+    bodies = []
+    for experience in resume.work_experiences.all():
+        headings.extend([experience.role, experience.company])
+        bodies.append(experience.description)
+    for education in resume.education_entries.all():
+        headings.extend([education.degree, education.institution])
+    for skill in resume.skills.all():
+        headings.append(skill.name)
+
+    return {
+        'title_text': resume.title,
+        'heading_text': "\n".join(headings),
+        'body_text': "\n".join(bodies),
+    }
+
+
+def compute_term_weights(fields):
+    """Return {term: weight} with field-weighted, saturated term frequencies."""
+    frequencies = Counter()
+    for field, text in fields.items():
+        for token in tokenize(text):
+            frequencies[token] += FIELD_WEIGHTS[field]
+    return {
+        term: tf * (K1 + 1) / (tf + K1)
+        for term, tf in frequencies.items()
+    }
+
+
+def reindex_resume(resume_id):
+    """Rebuild the search document for one resume, or drop it if the resume is gone."""
+    resume = (
+        Resume.objects.filter(pk=resume_id)
+        .prefetch_related('work_experiences', 'education_entries', 'skills')
+        .first()
+    )
+    if resume is None:
+        ResumeSearchDocument.objects.filter(resume_id=resume_id).delete()
+        ResumeSearchTerm.objects.filter(resume_id=resume_id).delete()
+        return
+
+    fields = build_document_fields(resume)
+    with transaction.atomic():
+        ResumeSearchDocument.objects.update_or_create(
+            resume=resume,
+            defaults={'user_id': resume.user_id, **fields}
+        )
+
+        if use_postgres_search():
+            from django.contrib.postgres.search import SearchVector
+
+            vector = None
+            for field, weight in POSTGRES_WEIGHTS.items():
+                part = SearchVector(field, weight=weight, config=SEARCH_CONFIG)
+                vector = part if vector is None else vector + part
+            ResumeSearchDocument.objects.filter(resume=resume).update(search_vector=vector)
+            return
+
+        ResumeSearchTerm.objects.filter(resume=resume).delete()
+        ResumeSearchTerm.objects.bulk_create([
+            ResumeSearchTerm(resume=resume, user_id=resume.user_id, term=term, weight=weight)
+            for term, weight in compute_term_weights(fields).items()
+        ])
+
+
+def schedule_reindex(resume_id):
+    """
+    Reindex a resume once the current transaction commits.
+
+    Nested serializer writes fire a signal per child row, so ids are
+    collected per thread and flushed by a single on_commit callback.
+    """
+    if not connection.in_atomic_block:
+        reindex_resume(resume_id)
+        return
+
+    # A rolled-back savepoint discards its callbacks, so check the queue
+    # instead of remembering whether one was registered. Without one, any
+    # ids still collected belong to work that was rolled back.
+    if not any(func is _flush_pending for _, func, _ in connection.run_on_commit):
+        _pending.resume_ids = set()
+        transaction.on_commit(_flush_pending)
+    _pending.resume_ids.add(resume_id)
+
+
+def _flush_pending():
+    """Reindex every resume collected since the last flush."""
+    resume_ids = getattr(_pending, 'resume_ids', set())
+    _pending.resume_ids = set()
+    for resume_id in resume_ids:
+        reindex_resume(resume_id)
+
+
+def search_resumes(user, query, limit=20):
+    """Return the user's resumes matching the query, best first."""
+    if use_postgres_search():
+        return _search_postgres(user, query, limit)
+    return _search_inverted_index(user, query, limit)
+
+
+def _search_postgres(user, query, limit):
+    """Rank with ts_rank over the GIN-indexed tsvector column."""
+    from django.contrib.postgres.search import SearchQuery, SearchRank
+
+    search_query = SearchQuery(query, search_type='websearch', config=SEARCH_CONFIG)
+    documents = (
+        ResumeSearchDocument.objects
+        .filter(user=user, search_vector=search_query)
+        .annotate(rank=SearchRank(F('search_vector'), search_query))
+        .order_by('-rank')
+        .values('resume_id', 'resume__title', 'resume__updated_at', 'rank')[:limit]
+    )
+    return [
+        {
+            'id': document['resume_id'],
+            'title': document['resume__title'],
+            'updated_at': document['resume__updated_at'],
+            'rank': round(document['rank'], 4),
+        }
+        for document in documents
+    ]
+
+
+def _search_inverted_index(user, query, limit):
+    """Rank with BM25-style idf over the user's inverted index. Every query term must match."""
+    terms = set(tokenize(query))
+    if not terms:
+        return []
+
+    postings = defaultdict(dict)
+    rows = ResumeSearchTerm.objects.filter(user=user, term__in=terms).values_list('resume_id', 'term', 'weight')
+    for resume_id, term, weight in rows:
+        postings[term][resume_id] = weight
+
+    if len(postings) < len(terms):
+        return []
+
+    total_documents = ResumeSearchDocument.objects.filter(user=user).count()
+    scores = None
+    for term, documents in postings.items():
+        idf = math.log(1 + (total_documents - len(documents) + 0.5) / (len(documents) + 0.5))
+        term_scores = {resume_id: weight * idf for resume_id, weight in documents.items()}
+        if scores is None:
+            scores = term_scores
+        else:
+            scores = {
+                resume_id: score + term_scores[resume_id]
+                for resume_id, score in scores.items()
+                if resume_id in term_scores
+            }
+
+    ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:limit]
+    resumes = Resume.objects.in_bulk([resume_id for resume_id, _ in ranked])
+    return [
+        {
+            'id': resume_id,
+            'title': resumes[resume_id].title,
+            'updated_at': resumes[resume_id].updated_at,
+            'rank': round(score, 4),
+        }
+        for resume_id, score in ranked
+        if resume_id in resumes
+    ]
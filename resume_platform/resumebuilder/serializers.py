@@ -1,5 +1,24 @@
 from rest_framework import serializers
-from .models import Resume, ContactInfo, WorkExperience, Education, Skill
+from .models import Resume, ResumeVersion, ContactInfo, WorkExperience, Education, Skill
+from .search import schedule_reindex
+from .autocomplete import skill_index
+
+
+def _create_sections(resume, work_experiences_data, education_entries_data, skills_data):
+    """Insert each section's rows in one statement rather than one per row."""
+    WorkExperience.objects.bulk_create(
+        WorkExperience(resume=resume, **data) for data in work_experiences_data
+    )
+    Education.objects.bulk_create(
+        Education(resume=resume, **data) for data in education_entries_data
+    )
+    skills = Skill.objects.bulk_create(Skill(resume=resume, **data) for data in skills_data)
+    
+    # bulk_create sends no post_save, so do what the signal handlers would
+    for skill in skills:
+        skill_index.record_usage(skill.name)
+    if work_experiences_data or education_entries_data or skills_data:
+        schedule_reindex(resume.pk)
 
 
 class ContactInfoSerializer(serializers.ModelSerializer):
@@ -19,7 +38,7 @@ class WorkExperienceSerializer(serializers.ModelSerializer):
         model = WorkExperience
         fields = [
             'id', 'company', 'role', 'start_date', 'end_date', 
-            'description', 'is_current', 'created_at', 'updated_at'
+            'description', 'is_current', 'position', 'created_at', 'updated_at'
         ]
         read_only_fields = ['created_at', 'updated_at']
 
@@ -31,7 +50,7 @@ class EducationSerializer(serializers.ModelSerializer):
         model = Education
         fields = [
             'id', 'institution', 'degree', 'graduation_date', 
-            'created_at', 'updated_at'
+            'position', 'created_at', 'updated_at'
         ]
         read_only_fields = ['created_at', 'updated_at']
 
@@ -45,7 +64,7 @@ class SkillSerializer(serializers.ModelSerializer):
         model = Skill
         fields = [
             'id', 'name', 'category', 'category_display', 
-            'created_at', 'updated_at'
+            'position', 'created_at', 'updated_at'
         ]
         read_only_fields = ['created_at', 'updated_at']
 
@@ -61,10 +80,10 @@ class ResumeSerializer(serializers.ModelSerializer):
     class Meta:
         model = Resume
         fields = [
-            'id', 'title', 'contact_info', 'work_experiences', 
+            'id', 'title', 'version', 'contact_info', 'work_experiences', 
             'education_entries', 'skills', 'created_at', 'updated_at'
         ]
-        read_only_fields = ['created_at', 'updated_at']
+        read_only_fields = ['version', 'created_at', 'updated_at']
     
     def create(self, validated_data):
         """Create resume with nested related objects."""
@@ -83,17 +102,8 @@ class ResumeSerializer(serializers.ModelSerializer):
         if contact_info_data:
             ContactInfo.objects.create(resume=resume, **contact_info_data)
         
-        # Create work experiences
-        for work_exp_data in work_experiences_data:
-            WorkExperience.objects.create(resume=resume, **work_exp_data)
-        
-        # Create education entries
-        for edu_data in education_entries_data:
-            Education.objects.create(resume=resume, **edu_data)
-        
-        # Create skills
-        for skill_data in skills_data:
-            Skill.objects.create(resume=resume, **skill_data)
+        # Create work experiences, education entries and skills
+        _create_sections(resume, work_experiences_data, education_entries_data, skills_data)
         
         return resume
     
@@ -107,7 +117,8 @@ class ResumeSerializer(serializers.ModelSerializer):
         # Update resume fields
         for attr, value in validated_data.items():
             setattr(instance, attr, value)
-        instance.save()
+        # Never write back `version`; it is owned by the version history
+        instance.save(update_fields=[*validated_data, 'updated_at'])
         
         # Update or create contact info
         if contact_info_data:
@@ -120,27 +131,43 @@ class ResumeSerializer(serializers.ModelSerializer):
                     setattr(contact_info, attr, value)
                 contact_info.save()
         
-        # Handle work experiences (replace all)
+        # Handle work experiences, education entries and skills (replace all)
         if work_experiences_data:
             instance.work_experiences.all().delete()
-            for work_exp_data in work_experiences_data:
-                WorkExperience.objects.create(resume=instance, **work_exp_data)
-        
-        # Handle education entries (replace all)
         if education_entries_data:
             instance.education_entries.all().delete()
-            for edu_data in education_entries_data:
-                Education.objects.create(resume=instance, **edu_data)
-        
-        # Handle skills (replace all)
         if skills_data:
             instance.skills.all().delete()
-            for skill_data in skills_data:
-                Skill.objects.create(resume=instance, **skill_data)
+        _create_sections(instance, work_experiences_data, education_entries_data, skills_data)
         
         return instance
 
 
+class SectionReorderSerializer(serializers.Serializer):
+    """Serializer for reordering the entries of a resume section."""
+    
+    order = serializers.ListField(
+        child=serializers.IntegerField(),
+        allow_empty=False,
+        help_text="IDs of every entry in the section, in their new order"
+    )
+    
+    def validate_order(self, value):
+        """Validate that no entry is listed twice."""
+        if len(set(value)) != len(value):
+            raise serializers.ValidationError("Each entry may only appear once.")
+        return value
+
+
+class ResumeVersionSerializer(serializers.ModelSerializer):
+    """Serializer for entries in a resume's version history."""
+    
+    class Meta:
+        model = ResumeVersion
+        fields = ['version', 'is_snapshot', 'created_at']
+        read_only_fields = fields
+
+
 class TextEnhancementSerializer(serializers.Serializer):
     """Serializer for text enhancement requests."""
     
@@ -158,4 +185,66 @@ class TextEnhancementSerializer(serializers.Serializer):
         """Validate that text is not empty."""
         if not value.strip():
             raise serializers.ValidationError("Text cannot be empty.")
-        return value.strip()
\ No newline at end of file
+        return value.strip()
+
+
+class ResumeImportSerializer(serializers.Serializer):
+    """Serializer for importing an uploaded resume into the builder."""
+    
+    upload_id = serializers.IntegerField(
+        help_text="ID of the UploadedResume to import"
+    )
+    title = serializers.CharField(
+        max_length=200,
+        required=False,
+        allow_blank=True,
+        help_text="Optional title for the new resume"
+    )
+
+
+class ResumeCloneSerializer(serializers.Serializer):
+    """Serializer for cloning a resume."""
+    
+    title = serializers.CharField(
+        max_length=200,
+        required=False,
+        allow_blank=True,
+        help_text="Optional title for the copy (defaults to the original title with \"(copy)\")"
+    )
+
+
+class ResumePatchSerializer(serializers.Serializer):
+    """Serializer for a batch of JSON-Patch style operations on a resume."""
+    
+    base_version = serializers.IntegerField(
+        min_value=0,
+        help_text="Resume version the operations were made against"
+    )
+    operations = serializers.ListField(
+        child=serializers.DictField(),
+        allow_empty=False,
+        max_length=500,
+        help_text="Ordered operations, each with op, path and (except for remove) value"
+    )
+
+
+class JobMatchSerializer(serializers.Serializer):
+    """Serializer for matching a job description against the user's resumes."""
+    
+    job_description = serializers.CharField(
+        max_length=20000,
+        help_text="Full text of the job posting"
+    )
+    limit = serializers.IntegerField(
+        required=False,
+        min_value=1,
+        max_value=100,
+        default=20,
+        help_text="Maximum number of resumes to return"
+    )
+    
+    def validate_job_description(self, value):
+        """Validate that the job description is not empty."""
+        if not value.strip():
+            raise serializers.ValidationError("Job description cannot be empty.")
+        return value.strip()
@@ -1,7 +1,9 @@
 import os
 import asyncio
-import google.generativeai as genai
 import json
+from datetime import date
+
+from resume_platform.warmup import gemini
 
 class GeminiTextEnhancementService:
     """
@@ -13,7 +15,7 @@ class GeminiTextEnhancementService:
         api_key = os.environ.get('GOOGLE_API_KEY')
         if not api_key:
             raise ValueError("GOOGLE_API_KEY environment variable not set.")
-        genai.configure(api_key=api_key)
+        gemini().configure(api_key=api_key)
 
     def _get_enhancement_prompt(self, text: str, context: str) -> str:
         """
@@ -45,7 +47,7 @@ class GeminiTextEnhancementService:
         """
         The main public method to perform text enhancement.
         """
-        model = genai.GenerativeModel('gemini-1.5-flash')
+        model = gemini().GenerativeModel('gemini-1.5-flash')
         prompt = self._get_enhancement_prompt(text_to_enhance, context)
 
         try:
@@ -55,4 +57,103 @@ class GeminiTextEnhancementService:
         except Exception as e:
             print(f"Error calling Gemini API for text enhancement: {e}")
             # Return original text if AI enhancement fails
-            return text_to_enhance
\ No newline at end of file
+            return text_to_enhance
+
+
+class GeminiSectionParsingService:
+    """
+    Uses the Google Gemini API to turn a resume section the rule-based
+    parser couldn't read into structured rows.
+    """
+
+    SECTION_FIELDS = {
+        'work_experiences': {
+            'company': 'company name',
+            'role': 'job title',
+            'start_date': 'start date as YYYY-MM-DD',
+            'end_date': 'end date as YYYY-MM-DD, or null if current',
+            'description': 'the responsibilities and achievements, one per line',
+        },
+        'education_entries': {
+            'institution': 'school or university name',
+            'degree': 'degree type and field of study',
+            'graduation_date': 'graduation date as YYYY-MM-DD',
+        },
+    }
+    REQUIRED_FIELDS = {
+        'work_experiences': ['company', 'role', 'start_date'],
+        'education_entries': ['institution', 'degree', 'graduation_date'],
+    }
+    DATE_FIELDS = ['start_date', 'end_date', 'graduation_date']
+
+    def __init__(self):
+        api_key = os.environ.get('GOOGLE_API_KEY')
+        if not api_key:
+            raise ValueError("GOOGLE_API_KEY environment variable not set.")
+        gemini().configure(api_key=api_key)
+
+    def _get_parsing_prompt(self, section: str, text: str) -> str:
+        """
+        Creates the prompt asking for a JSON list of entries for one section.
+        """
+        fields = "\n".join(
+            f"        - {name}: {description}"
+            for name, description in self.SECTION_FIELDS[section].items()
+        )
+        return f"""
+        You are a precise resume parser.
+        Convert the following resume section into a JSON list of objects.
+
+        The output must be a valid JSON list. Do not include any text or formatting before or after it.
+        Each object must have exactly these keys:
+{fields}
+
+        Section text:
+        ---
+        {text}
+        ---
+        """
+
+    async def parse_section(self, section: str, text: str) -> list:
+        """
+        Returns the parsed rows for a section, or an empty list on failure.
+        """
+        if section not in self.SECTION_FIELDS:
+            return []
+
+        model = gemini().GenerativeModel('gemini-1.5-flash')
+        prompt = self._get_parsing_prompt(section, text)
+
+        try:
+            response = await model.generate_content_async(prompt)
+            cleaned_json_string = response.text.strip().replace("```json", "").replace("```", "")
+            rows = json.loads(cleaned_json_string)
+        except Exception as e:
+            print(f"Error calling Gemini API for section parsing: {e}")
+            return []
+
+        if not isinstance(rows, list):
+            return []
+        cleaned_rows = (self._clean_row(section, row) for row in rows)
+        return [row for row in cleaned_rows if row]
+
+    def _clean_row(self, section: str, row) -> dict:
+        """Keep only known fields, parse dates, and drop rows missing required values."""
+        if not isinstance(row, dict):
+            return None
+
+        cleaned = {}
+        for field in self.SECTION_FIELDS[section]:
+            value = row.get(field)
+            if field in self.DATE_FIELDS:
+                try:
+                    value = date.fromisoformat(str(value)[:10]) if value else None
+                except ValueError:
+                    value = None
+            elif value is None:
+                value = ''
+            cleaned[field] = value[:200] if isinstance(value, str) and field != 'description' else value
+
+        if not all(cleaned.get(field) for field in self.REQUIRED_FIELDS[section]):
+            return None
+        return cleaned
@@ -0,0 +1,27 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .models import Resume, WorkExperience, Education, Skill
+from .search import schedule_reindex
+from .autocomplete import skill_index
+
+
+@receiver([post_save, post_delete], sender=Resume)
+def reindex_resume_on_change(sender, instance, **kwargs):
+    """Keep the search index in sync with the resume title."""
+    schedule_reindex(instance.pk)
+
+
+@receiver([post_save, post_delete], sender=WorkExperience)
+@receiver([post_save, post_delete], sender=Education)
+@receiver([post_save, post_delete], sender=Skill)
+def reindex_resume_on_section_change(sender, instance, **kwargs):
+    """Keep the search index in sync with the resume sections."""
+    schedule_reindex(instance.resume_id)
+
+
+@receiver(post_save, sender=Skill)
+def record_skill_usage(sender, instance, created, **kwargs):
+    """Count new skills towards autocomplete popularity."""
+    if created:
+        skill_index.record_usage(instance.name)
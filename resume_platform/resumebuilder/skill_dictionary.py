@@ -0,0 +1,190 @@
+"""
+Canonical skill dictionary.
+
+Each entry maps the canonical skill name to its category and the synonyms,
+abbreviations and common misspellings that should resolve to it.
+"""
+
+CANONICAL_SKILLS = {
+    # Programming languages
+    'Python': ('technical', ['python3', 'python 3', 'py', 'pyhton']),
+    'JavaScript': ('technical', ['javascript', 'js', 'ecmascript', 'es6', 'java script']),
+    'TypeScript': ('technical', ['ts', 'typescript']),
+    'Java': ('technical', ['java 8', 'java 11', 'java 17']),
+    'C': ('technical', ['c language', 'ansi c']),
+    'C++': ('technical', ['cpp', 'c plus plus']),
+    'C#': ('technical', ['c sharp', 'csharp']),
+    'Go': ('technical', ['golang']),
+    'Rust': ('technical', ['rustlang']),
+    'Ruby': ('technical', []),
+    'PHP': ('technical', []),
+    'Kotlin': ('technical', []),
+    'Swift': ('technical', []),
+    'Objective-C': ('technical', ['objective c', 'objc']),
+    'Scala': ('technical', []),
+    'R': ('technical', ['r language', 'rstats']),
+    'MATLAB': ('technical', []),
+    'Perl': ('technical', []),
+    'Elixir': ('technical', []),
+    'Haskell': ('technical', []),
+    'Dart': ('technical', []),
+    'Lua': ('technical', []),
+    'Bash': ('technical', ['shell scripting', 'shell', 'bash scripting']),
+    'PowerShell': ('technical', ['power shell']),
+    'SQL': ('technical', ['structured query language']),
+    'HTML': ('technical', ['html5']),
+    'CSS': ('technical', ['css3']),
+    'Sass': ('technical', ['scss']),
+
+    # Frameworks and libraries
+    'Django': ('technical', ['django rest framework', 'drf']),
+    'Flask': ('technical', []),
+    'FastAPI': ('technical', ['fast api']),
+    'React': ('technical', ['react.js', 'reactjs', 'react js']),
+    'React Native': ('technical', ['react-native']),
+    'Redux': ('technical', []),
+    'Next.js': ('technical', ['nextjs', 'next js']),
+    'Vue.js': ('technical', ['vue', 'vuejs', 'vue js']),
+    'Angular': ('technical', ['angularjs', 'angular.js']),
+    'Svelte': ('technical', []),
+    'Node.js': ('technical', ['node', 'nodejs', 'node js']),
+    'Express': ('technical', ['express.js', 'expressjs']),
+    'Spring': ('technical', ['spring boot', 'springboot', 'spring framework']),
+    'Ruby on Rails': ('technical', ['rails', 'ror']),
+    'Laravel': ('technical', []),
+    '.NET': ('technical', ['dotnet', 'asp.net', '.net core']),
+    'Tailwind CSS': ('technical', ['tailwind', 'tailwindcss']),
+    'Bootstrap': ('technical', []),
+    'jQuery': ('technical', ['jquery']),
+    'GraphQL': ('technical', []),
+    'REST APIs': ('technical', ['rest', 'restful', 'rest api', 'restful apis']),
+    'gRPC': ('technical', []),
+    'Celery': ('technical', []),
+    'Pandas': ('technical', []),
+    'NumPy': ('technical', ['numpy']),
+    'SciPy': ('technical', ['scipy']),
+    'scikit-learn': ('technical', ['sklearn', 'scikit learn']),
+    'TensorFlow': ('technical', ['tensor flow']),
+    'PyTorch': ('technical', ['torch']),
+    'Keras': ('technical', []),
+    'Spark': ('technical', ['apache spark', 'pyspark']),
+    'Hadoop': ('technical', []),
+    'Airflow': ('technical', ['apache airflow']),
+    'Kafka': ('technical', ['apache kafka']),
+    'RabbitMQ': ('technical', ['rabbit mq']),
+
+    # Data stores
+    'PostgreSQL': ('technical', ['postgres', 'postgresql', 'psql']),
+    'MySQL': ('technical', ['my sql']),
+    'SQLite': ('technical', []),
+    'Oracle Database': ('technical', ['oracle', 'oracle db']),
+    'SQL Server': ('technical', ['mssql', 'ms sql', 'microsoft sql server']),
+    'MongoDB': ('technical', ['mongo']),
+    'Redis': ('technical', []),
+    'Elasticsearch': ('technical', ['elastic search', 'elk']),
+    'Cassandra': ('technical', ['apache cassandra']),
+    'DynamoDB': ('technical', ['dynamo db']),
+    'Snowflake': ('technical', []),
+    'BigQuery': ('technical', ['big query']),
+
+    # Cloud and infrastructure
+    'AWS': ('technical', ['amazon web services']),
+    'Azure': ('technical', ['microsoft azure']),
+    'Google Cloud': ('technical', ['gcp', 'google cloud platform']),
+    'Docker': ('technical', []),
+    'Kubernetes': ('technical', ['k8s']),
+    'Terraform': ('technical', []),
+    'Ansible': ('technical', []),
+    'Jenkins': ('technical', []),
+    'GitHub Actions': ('technical', []),
+    'GitLab CI': ('technical', ['gitlab ci/cd']),
+    'CI/CD': ('technical', ['continuous integration', 'continuous delivery', 'ci cd']),
+    'Linux': ('technical', ['unix']),
+    'Nginx': ('technical', []),
+    'Git': ('technical', ['github', 'gitlab', 'version control']),
+    'Serverless': ('technical', ['aws lambda', 'lambda']),
+    'Microservices': ('technical', ['micro services', 'microservice architecture']),
+
+    # Practices and domains
+    'Machine Learning': ('technical', ['ml']),
+    'Deep Learning': ('technical', ['dl']),
+    'Natural Language Processing': ('technical', ['nlp']),
+    'Computer Vision': ('technical', ['cv']),
+    'Data Analysis': ('technical', ['data analytics']),
+    'Data Engineering': ('technical', []),
+    'Data Visualization': ('technical', ['data viz']),
+    'Statistics': ('technical', []),
+    'Tableau': ('technical', []),
+    'Power BI': ('technical', ['powerbi']),
+    'Excel': ('technical', ['microsoft excel', 'ms excel']),
+    'Unit Testing': ('technical', ['tdd', 'test driven development']),
+    'pytest': ('technical', []),
+    'Jest': ('technical', []),
+    'Selenium': ('technical', []),
+    'Playwright': ('technical', []),
+    'Agile': ('technical', ['agile methodologies']),
+    'Scrum': ('technical', []),
+    'Kanban': ('technical', []),
+    'Jira': ('technical', []),
+    'Figma': ('technical', []),
+    'UI/UX Design': ('technical', ['ux', 'ui design', 'ux design', 'user experience']),
+    'System Design': ('technical', []),
+    'Object-Oriented Programming': ('technical', ['oop']),
+    'Cybersecurity': ('technical', ['information security', 'infosec']),
+    'SEO': ('technical', ['search engine optimization']),
+
+    # Soft skills
+    'Leadership': ('soft', ['team leadership']),
+    'Communication': ('soft', ['communication skills']),
+    'Teamwork': ('soft', ['team player', 'collaboration']),
+    'Problem Solving': ('soft', ['problem-solving']),
+    'Critical Thinking': ('soft', []),
+    'Time Management': ('soft', []),
+    'Project Management': ('soft', []),
+    'Mentoring': ('soft', ['coaching']),
+    'Public Speaking': ('soft', ['presentation skills']),
+    'Negotiation': ('soft', []),
+    'Stakeholder Management': ('soft', []),
+    'Adaptability': ('soft', []),
+    'Attention to Detail': ('soft', []),
+    'Customer Service': ('soft', []),
+
+    # Languages
+    'English': ('language', []),
+    'Spanish': ('language', []),
+    'French': ('language', []),
+    'German': ('language', []),
+    'Portuguese': ('language', []),
+    'Italian': ('language', []),
+    'Mandarin': ('language', ['chinese', 'mandarin chinese']),
+    'Japanese': ('language', []),
+    'Korean': ('language', []),
+    'Arabic': ('language', []),
+    'Hindi': ('language', []),
+    'Russian': ('language', []),
+}
+
+
+def build_alias_map():
+    """Return {lowercased name or synonym: canonical name}."""
+    aliases = {}
+    for canonical, (_, synonyms) in CANONICAL_SKILLS.items():
+        aliases[canonical.lower()] = canonical
+        for synonym in synonyms:
+            aliases.setdefault(synonym.lower(), canonical)
+    return aliases
+
+
+ALIASES = build_alias_map()
+
+
+def canonicalize(name):
+    """Return the canonical spelling of a skill name, or the stripped name if unknown."""
+    name = name.strip()
+    return ALIASES.get(name.lower(), name)
+
+
+def skill_category(name):
+    """Return the category of a canonical skill, 'technical' if unknown."""
+    entry = CANONICAL_SKILLS.get(name)
+    return entry[0] if entry else 'technical'
@@ -0,0 +1,126 @@
+from collections import Counter, deque
+
+from .skill_dictionary import CANONICAL_SKILLS, skill_category
+
+# Synonyms that are ordinary words or abbreviations in running text
+SKIPPED_ALIASES = {
+    'py', 'ts', 'cv', 'dl', 'shell', 'lambda', 'rest', 'node', 'oracle',
+    'rails', 'ror', 'collaboration', 'coaching', 'unix', 'torch', 'ml',
+}
+
+# Canonical names that are also common words only match with this exact case
+CASE_SENSITIVE_SKILLS = {
+    'C', 'R', 'Go', 'Swift', 'Spring', 'Express', 'Rust', 'Ruby', 'Dart',
+    'Lua', 'Scala', 'Serverless', 'Statistics',
+}
+
+
+class SkillExtractor:
+    """
+    Finds dictionary skills in free text with an Aho-Corasick automaton.
+
+    Every canonical name and synonym is compiled once into a trie with
+    failure links, so a document is scanned in a single linear pass no
+    matter how many patterns the dictionary holds. Overlapping hits are
+    resolved leftmost-longest and only whole-word matches count.
+    """
+
+    def __init__(self, dictionary=None):
+        dictionary = dictionary if dictionary is not None else CANONICAL_SKILLS
+        self.goto = [{}]
+        self.fail = [0]
+        self.outputs = [[]]
+
+        for canonical, (_, synonyms) in dictionary.items():
+            self._add(canonical, canonical)
+            for synonym in synonyms:
+                if synonym not in SKIPPED_ALIASES:
+                    self._add(synonym, canonical)
+        self._build_failure_links()
+
+    def _add(self, pattern, canonical):
+        node = 0
+        for char in pattern.lower():
+            if char not in self.goto[node]:
+                self.goto.append({})
+                self.fail.append(0)
+                self.outputs.append([])
+                self.goto[node][char] = len(self.goto) - 1
+            node = self.goto[node][char]
+        self.outputs[node].append((len(pattern), pattern, canonical))
+
+    def _build_failure_links(self):
+        """Breadth-first pass linking each node to its longest proper suffix in the trie."""
+        queue = deque(self.goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self.goto[node].items():
+                queue.append(child)
+                fallback = self.fail[node]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[child] = self.goto[fallback].get(char, 0)
+                # Merge the suffix's outputs so matching never walks the chain
+                self.outputs[child] = self.outputs[child] + self.outputs[self.fail[child]]
+
+    def find(self, text):
+        """Return (start, end, canonical) for every accepted, non-overlapping match."""
+        lowered = text.lower()
+        if len(lowered) != len(text):
+            # A few characters change length when lowercased; keep offsets aligned
+            lowered = ''.join(c.lower() if len(c.lower()) == 1 else c for c in text)
+
+        candidates = []
+        node = 0
+        goto, fail, outputs = self.goto, self.fail, self.outputs
+        for position, char in enumerate(lowered):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            for length, pattern, canonical in outputs[node]:
+                start = position - length + 1
+                if self._accept(text, start, position + 1, pattern, canonical):
+                    candidates.append((start, position + 1, canonical))
+
+        # Leftmost-longest: "React Native" wins over the "React" inside it
+        candidates.sort(key=lambda match: (match[0], -(match[1] - match[0])))
+        matches = []
+        last_end = -1
+        for start, end, canonical in candidates:
+            if start >= last_end:
+                matches.append((start, end, canonical))
+                last_end = end
+        return matches
+
+    def _accept(self, text, start, end, pattern, canonical):
+        """Whole words only; short or ambiguous names must also match their case."""
+        if start > 0 and text[start - 1].isalnum():
+            return False
+        if end < len(text) and text[end].isalnum():
+            return False
+
+        matched = text[start:end]
+        if canonical in CASE_SENSITIVE_SKILLS and pattern == canonical:
+            return matched == canonical
+        if len(pattern) <= 3 and pattern.isalpha():
+            return matched in (pattern, canonical) or matched.isupper()
+        return True
+
+    def extract(self, text):
+        """Return the skills found in the text, most mentioned first."""
+        counts = Counter(canonical for _, _, canonical in self.find(text))
+        return [
+            {'name': name, 'category': skill_category(name), 'count': count}
+            for name, count in sorted(counts.items(), key=lambda item: (-item[1], item[0].lower()))
+        ]
+
+
+_extractor = None
+
+
+def get_skill_extractor():
+    """Return the shared extractor, compiling the automaton on first use."""
+    global _extractor
+    if _extractor is None:
+        _extractor = SkillExtractor()
+    return _extractor
@@ -1,3 +1,245 @@
-from django.test import TestCase
+import io
+import zipfile
+from unittest import mock
+from PyPDF2 import PdfReader
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+from rest_framework.test import APIClient
 
-# Create your tests here.
+from resume_platform.query_inspection import QueryBudgetExceeded, assert_query_budget
+from users.models import CustomUser
+from .importers import ResumeSectionParser
+from .models import ContactInfo, Education, Resume, ResumeVersion, Skill, WorkExperience
+from .rendering import UnsupportedCharacters, render
+from .versioning import apply_delta, build_document, compute_delta, get_document, record_version, restore_version
+from .views import ResumeAnalyticsView, ResumeViewSet
+
+
+def resume_document(full_name, company, location='Kraków'):
+    return {
+        'title': 'CV',
+        'contact_info': {'full_name': full_name, 'email': 'cv@example.com', 'phone': None, 'location': location},
+        'work_experiences': [{
+            'company': company, 'role': 'Engineer', 'start_date': '2020-01-01', 'end_date': None,
+            'description': '- Ελληνικά, русский and café', 'position': 0,
+        }],
+        'education_entries': [],
+        'skills': [{'name': 'Python', 'category': 'technical', 'position': 0}],
+    }
+
+
+class RenderingTests(SimpleTestCase):
+    def pdf_text(self, document):
+        pdf = render(document, 'classic', 'pdf')
+        return ''.join(page.extract_text() for page in PdfReader(io.BytesIO(pdf)).pages)
+
+    def test_pdf_keeps_non_latin_text(self):
+        text = self.pdf_text(resume_document('Łukasz Żółć', 'Яндекс'))
+
+        for expected in ('Łukasz Żółć', 'Kraków', 'Яндекс', 'Ελληνικά, русский and café'):
+            self.assertIn(expected, text)
+        self.assertNotIn('?', text)
+
+    def test_pdf_embeds_a_unicode_font(self):
+        pdf = render(resume_document('Łukasz Żółć', 'Яндекс'), 'classic', 'pdf')
+
+        self.assertIn(b'/Encoding /Identity-H', pdf)
+        self.assertIn(b'/FontFile2', pdf)
+        self.assertIn(b'/ToUnicode', pdf)
+
+    def test_combining_marks_use_the_composed_glyph(self):
+        # o and c followed by a combining acute accent
+        text = self.pdf_text(resume_document('Zo\u0301\u0142c\u0301', 'Acme'))
+
+        self.assertIn('Z\u00f3\u0142\u0107', text)
+
+    def test_characters_without_a_glyph_are_rejected(self):
+        with self.assertRaises(UnsupportedCharacters) as caught:
+            render(resume_document('王小明', 'Acme'), 'classic', 'pdf')
+
+        self.assertEqual(caught.exception.characters, ['小', '明', '王'])
+
+    def test_docx_keeps_non_latin_text(self):
+        docx = render(resume_document('Łukasz Żółć', 'Яндекс'), 'classic', 'docx')
+
+        body = zipfile.ZipFile(io.BytesIO(docx)).read('word/document.xml').decode()
+        self.assertIn('Łukasz Żółć', body)
+        self.assertIn('Яндекс', body)
+
+
+class SkillParsingTests(SimpleTestCase):
+    def skill_names(self, text):
+        return [skill['name'] for skill in ResumeSectionParser().parse_skills(text)]
+
+    def test_group_labels_are_not_skills(self):
+        text = 'Languages: python, Go\n- Frameworks: Django; React\nSoft: Communication'
+
+        self.assertEqual(self.skill_names(text), ['Python', 'Go', 'Django', 'React', 'Communication'])
+
+    def test_rendered_category_lines_parse_back(self):
+        # The PDF and DOCX templates list skills as "Technical: Python, Django"
+        self.assertEqual(self.skill_names('Technical: Python, Django\nSoft: Leadership'), ['Python', 'Django', 'Leadership'])
+
+    def test_unlabelled_skills_are_kept(self):
+        self.assertEqual(self.skill_names('C++ | Node.js • SQL'), ['C++', 'Node.js', 'SQL'])
+
+
+class DeltaTests(SimpleTestCase):
+    def skills(self, *names):
+        return [{'name': name, 'category': 'technical', 'position': index} for index, name in enumerate(names)]
+
+    def document(self, title='CV', skills=(), contact_info=None):
+        return {
+            'title': title,
+            'contact_info': contact_info,
+            'work_experiences': [],
+            'education_entries': [],
+            'skills': self.skills(*skills),
+        }
+
+    def test_equal_documents_have_an_empty_delta(self):
+        document = self.document(skills=['Python', 'Go'])
+        self.assertEqual(compute_delta(document, dict(document)), {})
+
+    def test_deltas_round_trip(self):
+        old = self.document(skills=['Python', 'Go', 'SQL', 'Rust', 'Bash'])
+        changes = [
+            self.document(title='Resume', skills=['Python', 'Go', 'SQL', 'Rust', 'Bash']),
+            self.document(skills=['Django', 'Python', 'Go', 'SQL', 'Rust', 'Bash']),
+            self.document(skills=['Python', 'Rust']),
+            self.document(skills=['Bash', 'Rust', 'SQL', 'Go', 'Python']),
+            self.document(skills=[]),
+            self.document(contact_info={'full_name': 'Jane Doe', 'email': 'jane@example.com', 'phone': None, 'location': None}),
+        ]
+        for new in changes:
+            delta = compute_delta(old, new)
+            self.assertEqual(apply_delta(old, delta), new)
+            # The old document is left as it was
+            self.assertEqual(apply_delta(new, compute_delta(new, old)), old)
+
+    def test_deltas_hold_only_the_changed_items(self):
+        old = self.document(skills=['Python', 'Go', 'SQL'])
+        new = dict(old, skills=old['skills'][:2] + [dict(old['skills'][2], name='PostgreSQL')])
+
+        self.assertEqual(compute_delta(old, new), {'skills': [[2, 3, [new['skills'][2]]]]})
+
+
+@override_settings(RESUME_VERSION_SNAPSHOT_INTERVAL=4)
+class VersionHistoryTests(TestCase):
+    """Snapshots every fourth version: 1, 5 and 9 are full documents, the rest deltas."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = CustomUser.objects.create(username='historian')
+        self.resume = Resume.objects.create(user=self.user, title='CV')
+        self.documents = {}
+        edits = [
+            lambda: None,
+            lambda: ContactInfo.objects.create(resume=self.resume, full_name='Jane Doe', email='jane@example.com'),
+            lambda: Skill.objects.create(resume=self.resume, name='Python', position=0),
+            lambda: Skill.objects.create(resume=self.resume, name='Go', position=1),
+            lambda: WorkExperience.objects.create(resume=self.resume, company='Acme', role='Engineer', start_date='2020-01-01'),
+            lambda: Resume.objects.filter(pk=self.resume.pk).update(title='Backend CV'),
+            lambda: Skill.objects.filter(resume=self.resume, name='Python').update(position=2),
+            lambda: Skill.objects.filter(resume=self.resume, name='Go').delete(),
+            lambda: ContactInfo.objects.filter(resume=self.resume).update(location='Austin, TX'),
+            lambda: WorkExperience.objects.filter(resume=self.resume).update(description='- Shipped the API'),
+        ]
+        for edit in edits:
+            edit()
+            version = record_version(self.resume.pk)
+            self.documents[version] = build_document(self.resume.pk, Resume.objects.get(pk=self.resume.pk).title)
+        self.resume.refresh_from_db()
+
+    def test_snapshot_interval(self):
+        snapshots = ResumeVersion.objects.filter(resume=self.resume, is_snapshot=True).values_list('version', flat=True)
+        self.assertEqual(sorted(snapshots), [1, 5, 9])
+        self.assertEqual(self.resume.version, 10)
+
+    def test_every_version_reconstructs(self):
+        cache.clear()
+        for version, document in self.documents.items():
+            self.assertEqual(get_document(self.resume, version), document, f'version {version}')
+
+    def test_unchanged_resume_records_no_version(self):
+        self.assertEqual(record_version(self.resume.pk), 10)
+
+    def test_restore_a_delta_several_steps_after_a_snapshot(self):
+        cache.clear()
+        version = restore_version(self.resume, 8)
+
+        self.assertEqual(version, 11)
+        self.assertEqual(build_document(self.resume.pk, 'Backend CV'), self.documents[8])
+        self.assertFalse(ResumeVersion.objects.get(resume=self.resume, version=11).is_snapshot)
+        cache.clear()
+        self.assertEqual(get_document(self.resume, 11), self.documents[8])
+
+    def test_restore_across_a_snapshot(self):
+        cache.clear()
+        restore_version(self.resume, 3)
+
+        self.resume.refresh_from_db()
+        self.assertEqual(self.resume.title, 'CV')
+        self.assertEqual(build_document(self.resume.pk, 'CV'), self.documents[3])
+        self.assertFalse(WorkExperience.objects.filter(resume=self.resume).exists())
+
+
+class ResumeExportTests(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create(username='exporter')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.resume = Resume.objects.create(user=self.user, title='CV')
+
+    def test_unrenderable_text_is_a_422(self):
+        with mock.patch('resumebuilder.views.get_artifact', side_effect=UnsupportedCharacters(['王'])):
+            response = self.client.get(f'/api/builder/resumes/{self.resume.pk}/export/?type=pdf')
+
+        self.assertEqual(response.status_code, 422)
+        self.assertIn('王', response.data['error'])
+
+
+class QueryBudgetTests(TestCase):
+    """
+    Views stay within their declared query budgets however many resumes
+    there are. Query inspection also runs strict on every test request.
+    """
+
+    def setUp(self):
+        self.user = CustomUser.objects.create(username='budgeted')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        for index in range(4):
+            resume = Resume.objects.create(user=self.user, title=f'Resume {index}')
+            ContactInfo.objects.create(resume=resume, full_name='Jane Doe', email='jane@example.com')
+            for company in ('Acme', 'Initech'):
+                WorkExperience.objects.create(resume=resume, company=company, role='Engineer', start_date='2020-01-01')
+            Education.objects.create(resume=resume, institution='UT', degree='BS', graduation_date='2016-05-01')
+            for name in ('Python', 'Django'):
+                Skill.objects.create(resume=resume, name=name)
+        self.resume = resume
+
+    def get_within(self, budget, path):
+        with assert_query_budget(budget):
+            response = self.client.get(path)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_resume_list(self):
+        response = self.get_within(ResumeViewSet.query_budgets['list'], '/api/builder/resumes/')
+        self.assertEqual(response.data['count'], 4)
+
+    def test_resume_retrieve(self):
+        self.get_within(ResumeViewSet.query_budgets['retrieve'], f'/api/builder/resumes/{self.resume.pk}/')
+
+    def test_resume_json_export(self):
+        self.get_within(ResumeViewSet.query_budgets['export'], f'/api/builder/resumes/{self.resume.pk}/export/')
+
+    def test_analytics(self):
+        response = self.get_within(ResumeAnalyticsView.query_budget, '/api/builder/analytics/')
+        self.assertEqual(response.data['total_work_experiences'], 8)
+
+    def test_requests_over_budget_fail_under_the_test_runner(self):
+        with mock.patch.object(ResumeViewSet, 'query_budgets', {'list': 1}):
+            with self.assertRaises(QueryBudgetExceeded):
+                self.client.get('/api/builder/resumes/')
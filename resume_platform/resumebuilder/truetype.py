@@ -0,0 +1,215 @@
+import struct
+import hashlib
+
+# Reads TrueType fonts for the PDF renderer: metrics for layout, and subsets
+# holding only the glyphs a document draws. Django-free, like rendering.
+
+# Tables a PDF viewer needs from an embedded TrueType font (PDF 1.7, 9.9)
+EMBEDDED_TABLES = (b'cvt ', b'fpgm', b'glyf', b'head', b'hhea', b'hmtx', b'loca', b'maxp', b'prep')
+
+# Composite glyph component flags
+ARG_1_AND_2_ARE_WORDS = 0x0001
+WE_HAVE_A_SCALE = 0x0008
+MORE_COMPONENTS = 0x0020
+WE_HAVE_AN_X_AND_Y_SCALE = 0x0040
+WE_HAVE_A_TWO_BY_TWO = 0x0080
+
+
+def _checksum(data):
+    data += b'\0' * (-len(data) % 4)
+    return sum(struct.unpack(f'>{len(data) // 4}I', data)) & 0xFFFFFFFF
+
+
+class TrueTypeFont:
+    """
+    A TrueType font file, parsed once per process.
+
+    Widths are in PDF glyph space, 1/1000 of the font size. Glyph ids are
+    used as CIDs with an Identity-H encoding, so a subset keeps every id and
+    only drops the outlines of glyphs the document doesn't draw.
+    """
+
+    def __init__(self, path):
+        with open(path, 'rb') as file:
+            self.data = file.read()
+        table_count = struct.unpack_from('>H', self.data, 4)[0]
+        self.tables = {}
+        for index in range(table_count):
+            tag, _, offset, length = struct.unpack_from('>4sIII', self.data, 12 + 16 * index)
+            self.tables[tag] = (offset, length)
+
+        head = self._table(b'head')
+        self.units_per_em = struct.unpack_from('>H', head, 18)[0]
+        self.bbox = [self._scale(value) for value in struct.unpack_from('>4h', head, 36)]
+        self.long_loca = struct.unpack_from('>h', head, 50)[0] == 1
+        hhea = self._table(b'hhea')
+        self.ascent, self.descent = (self._scale(value) for value in struct.unpack_from('>2h', hhea, 4))
+        metric_count = struct.unpack_from('>H', hhea, 34)[0]
+        self.glyph_count = struct.unpack_from('>H', self._table(b'maxp'), 4)[0]
+        italic_angle = struct.unpack_from('>hH', self._table(b'post'), 4)
+        self.italic_angle = italic_angle[0] + italic_angle[1] / 65536
+
+        advances = struct.unpack_from('>' + 'Hxx' * metric_count, self._table(b'hmtx'))
+        # Glyphs past the last metric share its advance
+        self.widths = [self._scale(advance) for advance in advances]
+        self.widths += [self.widths[-1]] * (self.glyph_count - metric_count)
+
+        loca = self._table(b'loca')
+        if self.long_loca:
+            self.loca = struct.unpack_from(f'>{self.glyph_count + 1}I', loca)
+        else:
+            self.loca = [offset * 2 for offset in struct.unpack_from(f'>{self.glyph_count + 1}H', loca)]
+
+        self.cmap = self._read_cmap()
+        self.name = self._read_postscript_name()
+        capital = self._glyph_data(self.cmap.get(ord('H'), 0))
+        self.cap_height = self._scale(struct.unpack_from('>h', capital, 8)[0]) if capital else self.ascent
+
+    def _table(self, tag):
+        offset, length = self.tables[tag]
+        return self.data[offset:offset + length]
+
+    def _scale(self, value):
+        return round(value * 1000 / self.units_per_em)
+
+    def _read_cmap(self):
+        """{code point: glyph id} from the Unicode cmap subtable, full repertoire first."""
+        cmap = self._table(b'cmap')
+        subtables = {}
+        for index in range(struct.unpack_from('>H', cmap, 2)[0]):
+            platform, encoding, offset = struct.unpack_from('>HHI', cmap, 4 + 8 * index)
+            subtables[(platform, encoding)] = offset
+
+        if (3, 10) in subtables:
+            offset = subtables[(3, 10)]
+            mapping = {}
+            group_count = struct.unpack_from('>I', cmap, offset + 12)[0]
+            for group in range(group_count):
+                start, end, glyph = struct.unpack_from('>III', cmap, offset + 16 + 12 * group)
+                for code in range(start, end + 1):
+                    mapping[code] = glyph + code - start
+            return mapping
+
+        offset = subtables[(3, 1)]
+        segments = struct.unpack_from('>H', cmap, offset + 6)[0] // 2
+        ends = struct.unpack_from(f'>{segments}H', cmap, offset + 14)
+        starts = struct.unpack_from(f'>{segments}H', cmap, offset + 16 + 2 * segments)
+        deltas = struct.unpack_from(f'>{segments}h', cmap, offset + 16 + 4 * segments)
+        range_offsets_at = offset + 16 + 6 * segments
+        range_offsets = struct.unpack_from(f'>{segments}H', cmap, range_offsets_at)
+        mapping = {}
+        for index in range(segments):
+            for code in range(starts[index], ends[index] + 1):
+                if code == 0xFFFF:
+                    continue
+                if range_offsets[index] == 0:
+                    glyph = (code + deltas[index]) & 0xFFFF
+                else:
+                    # The offset is relative to where it is stored
+                    at = range_offsets_at + 2 * index + range_offsets[index] + 2 * (code - starts[index])
+                    glyph = struct.unpack_from('>H', cmap, at)[0]
+                    if glyph:
+                        glyph = (glyph + deltas[index]) & 0xFFFF
+                if glyph:
+                    mapping[code] = glyph
+        return mapping
+
+    def _read_postscript_name(self):
+        name = self._table(b'name')
+        count, strings = struct.unpack_from('>2xHH', name)
+        for index in range(count):
+            platform, _, _, name_id, length, offset = struct.unpack_from('>6H', name, 6 + 12 * index)
+            if name_id == 6:
+                value = name[strings + offset:strings + offset + length]
+                return value.decode('utf-16-be' if platform in (0, 3) else 'latin-1')
+        return 'Font'
+
+    def _glyph_data(self, glyph):
+        offset, length = self.tables[b'glyf']
+        return self.data[offset + self.loca[glyph]:offset + self.loca[glyph + 1]]
+
+    def glyph(self, char):
+        """The glyph id drawing a character, or None when the font has no glyph for it."""
+        return self.cmap.get(ord(char))
+
+    def width(self, text):
+        """Advance width of a string, in 1/1000 of the font size."""
+        widths = self.widths
+        return sum(widths[self.cmap.get(ord(char), 0)] for char in text)
+
+    def _components(self, glyph):
+        """Glyph ids a composite glyph is built from."""
+        data = self._glyph_data(glyph)
+        if len(data) < 10 or struct.unpack_from('>h', data)[0] >= 0:
+            return []
+        components, at = [], 10
+        while True:
+            flags, component = struct.unpack_from('>HH', data, at)
+            components.append(component)
+            at += 4 + (4 if flags & ARG_1_AND_2_ARE_WORDS else 2)
+            if flags & WE_HAVE_A_SCALE:
+                at += 2
+            elif flags & WE_HAVE_AN_X_AND_Y_SCALE:
+                at += 4
+            elif flags & WE_HAVE_A_TWO_BY_TWO:
+                at += 8
+            if not flags & MORE_COMPONENTS:
+                return components
+
+    def subset(self, glyphs):
+        """
+        The font file with outlines only for these glyphs, the glyphs they
+        are composed of, and .notdef. Glyph ids are unchanged.
+        """
+        keep, pending = {0}, list(glyphs)
+        while pending:
+            glyph = pending.pop()
+            if glyph not in keep:
+                keep.add(glyph)
+                pending.extend(self._components(glyph))
+
+        outlines, offsets = [], [0]
+        for glyph in range(self.glyph_count):
+            data = self._glyph_data(glyph) if glyph in keep else b''
+            data += b'\0' * (-len(data) % 4)
+            outlines.append(data)
+            offsets.append(offsets[-1] + len(data))
+
+        head = bytearray(self._table(b'head'))
+        struct.pack_into('>I', head, 8, 0)
+        struct.pack_into('>h', head, 50, 1)
+        tables = {tag: self._table(tag) for tag in EMBEDDED_TABLES if tag in self.tables}
+        tables.update({
+            b'glyf': b''.join(outlines),
+            b'loca': struct.pack(f'>{len(offsets)}I', *offsets),
+            b'head': bytes(head),
+        })
+        font, offsets = self._assemble(tables)
+        # checkSumAdjustment makes the whole file sum to a fixed value
+        head_offset = offsets[b'head']
+        adjustment = (0xB1B0AFBA - _checksum(font)) & 0xFFFFFFFF
+        return font[:head_offset + 8] + struct.pack('>I', adjustment) + font[head_offset + 12:]
+
+    @staticmethod
+    def _assemble(tables):
+        tags = sorted(tables)
+        search_range = 1
+        while search_range * 2 <= len(tags):
+            search_range *= 2
+        selector = search_range.bit_length() - 1
+        header = struct.pack('>IHHHH', 0x00010000, len(tags), search_range * 16, selector, (len(tags) - search_range) * 16)
+        directory, body, offsets = [], [], {}
+        offset = 12 + 16 * len(tags)
+        for tag in tags:
+            data = tables[tag]
+            directory.append(struct.pack('>4sIII', tag, _checksum(data), offset, len(data)))
+            offsets[tag] = offset
+            padded = data + b'\0' * (-len(data) % 4)
+            body.append(padded)
+            offset += len(padded)
+        return header + b''.join(directory) + b''.join(body), offsets
+
+    def subset_tag(self, glyphs):
+        """Six capital letters naming a subset, derived from its glyphs so output is reproducible."""
+        digest = hashlib.sha1(','.join(map(str, sorted(glyphs))).encode()).digest()
+        return ''.join(chr(ord('A') + byte % 26) for byte in digest[:6])
@@ -1,18 +1,29 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import ResumeViewSet, TextEnhancementView, ResumeAnalyticsView
+from .views import (
+    ResumeViewSet, WorkExperienceViewSet, EducationViewSet, SkillViewSet, ResumeContactInfoView,
+    TextEnhancementView, ResumeAnalyticsView, ResumeSearchView, SkillAutocompleteView, JobMatchView
+)
 
 app_name = 'resumebuilder'
 
 # Create router for ViewSet
 router = DefaultRouter()
 router.register(r'resumes', ResumeViewSet, basename='resume')
+router.register(r'resumes/(?P<resume_pk>[0-9]+)/work-experiences', WorkExperienceViewSet, basename='resume-work-experience')
+router.register(r'resumes/(?P<resume_pk>[0-9]+)/education', EducationViewSet, basename='resume-education')
+router.register(r'resumes/(?P<resume_pk>[0-9]+)/skills', SkillViewSet, basename='resume-skill')
 
 urlpatterns = [
     # Include router URLs
     path('', include(router.urls)),
     
+    path('resumes/<int:resume_pk>/contact-info/', ResumeContactInfoView.as_view(), name='resume-contact-info'),
+    
     # Additional API endpoints
     path('enhance-text/', TextEnhancementView.as_view(), name='enhance-text'),
     path('analytics/', ResumeAnalyticsView.as_view(), name='analytics'),
+    path('search/', ResumeSearchView.as_view(), name='search'),
+    path('match/', JobMatchView.as_view(), name='job-match'),
+    path('skills/autocomplete/', SkillAutocompleteView.as_view(), name='skill-autocomplete'),
 ]
\ No newline at end of file
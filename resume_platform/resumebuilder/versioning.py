@@ -0,0 +1,203 @@
+import json
+from difflib import SequenceMatcher
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F, Subquery
+from django.utils import timezone
+
+from .models import Resume, ResumeVersion, ContactInfo, WorkExperience, Education, Skill
+from .search import schedule_reindex
+
+CONTACT_FIELDS = ['full_name', 'phone', 'email', 'location']
+
+# Ordered fields of each list section, as stored in a version document
+SECTION_FIELDS = {
+    'work_experiences': (WorkExperience, ['company', 'role', 'start_date', 'end_date', 'description', 'position']),
+    'education_entries': (Education, ['institution', 'degree', 'graduation_date', 'position']),
+    'skills': (Skill, ['name', 'category', 'position']),
+}
+
+DOCUMENT_CACHE_TIMEOUT = 60 * 60
+
+
+def _serialize_row(row):
+    """Make a values() row JSON-friendly."""
+    return {
+        field: value.isoformat() if hasattr(value, 'isoformat') else value
+        for field, value in row.items()
+    }
+
+
+def build_document(resume_id, title):
+    """Return the resume and its sections as a plain, JSON-serializable document."""
+    contact_info = ContactInfo.objects.filter(resume_id=resume_id).values(*CONTACT_FIELDS).first()
+    document = {
+        'title': title,
+        'contact_info': contact_info,
+    }
+    for section, (model, fields) in SECTION_FIELDS.items():
+        # The model ordering can tie, so end on id to keep the row order stable between calls
+        rows = model.objects.filter(resume_id=resume_id).order_by(*model._meta.ordering, 'id')
+        document[section] = [_serialize_row(row) for row in rows.values(*fields)]
+    return document
+
+
+def _item_key(item):
+    return json.dumps(item, sort_keys=True)
+
+
+def compute_delta(old, new):
+    """
+    Return the changes turning `old` into `new`, or {} if they are equal.
+
+    List sections are diffed item by item, so a delta holds only the
+    replaced ranges as [start, end, new_items] rather than the whole list.
+    """
+    delta = {}
+    if old['title'] != new['title']:
+        delta['title'] = new['title']
+    if old['contact_info'] != new['contact_info']:
+        delta['contact_info'] = new['contact_info']
+
+    for section in SECTION_FIELDS:
+        old_items, new_items = old[section], new[section]
+        if old_items == new_items:
+            continue
+        matcher = SequenceMatcher(
+            None,
+            [_item_key(item) for item in old_items],
+            [_item_key(item) for item in new_items],
+            autojunk=False
+        )
+        delta[section] = [
+            [i1, i2, new_items[j1:j2]]
+            for tag, i1, i2, j1, j2 in matcher.get_opcodes()
+            if tag != 'equal'
+        ]
+    return delta
+
+
+def apply_delta(document, delta):
+    """Return a new document with the delta applied."""
+    document = {**document, **{key: delta[key] for key in ('title', 'contact_info') if key in delta}}
+    for section in SECTION_FIELDS:
+        if section not in delta:
+            continue
+        items = list(document[section])
+        # Apply from the end so earlier offsets stay valid
+        for start, end, replacement in reversed(delta[section]):
+            items[start:end] = replacement
+        document[section] = items
+    return document
+
+
+def _cache_key(resume_id, version):
+    return f"resume-document:{resume_id}:{version}"
+
+
+def get_document(resume, version):
+    """
+    Reconstruct the resume as it was at `version`.
+
+    Loads the nearest snapshot at or before the version together with the
+    deltas after it in one query, so the work is bounded by the snapshot
+    interval. Raises ResumeVersion.DoesNotExist if there is no such version.
+    """
+    document, _ = _load_document(resume.pk, version)
+    return document
+
+
+def _load_document(resume_id, version):
+    """Return (document, number of deltas applied since the last snapshot)."""
+    cached = cache.get(_cache_key(resume_id, version))
+    if cached is not None:
+        return cached
+
+    last_snapshot = ResumeVersion.objects.filter(
+        resume_id=resume_id,
+        is_snapshot=True,
+        version__lte=version
+    ).order_by('-version').values('version')[:1]
+    chain = list(
+        ResumeVersion.objects.filter(
+            resume_id=resume_id,
+            version__lte=version,
+            version__gte=Subquery(last_snapshot)
+        ).order_by('version').values('version', 'is_snapshot', 'data')
+    )
+    if not chain or chain[-1]['version'] != version:
+        raise ResumeVersion.DoesNotExist(f"Resume {resume_id} has no version {version}")
+
+    document = chain[0]['data']
+    for entry in chain[1:]:
+        document = apply_delta(document, entry['data'])
+
+    result = (document, len(chain) - 1)
+    cache.set(_cache_key(resume_id, version), result, DOCUMENT_CACHE_TIMEOUT)
+    return result
+
+
+@transaction.atomic
+def record_version(resume_id):
+    """
+    Record the resume's current state as a new version.
+
+    Stores a delta against the previous version, or a full snapshot when
+    the resume has no history yet or the last snapshot is
+    RESUME_VERSION_SNAPSHOT_INTERVAL deltas back. Does nothing if nothing
+    changed. Returns the resume's current version number.
+    """
+    # Lock the resume row so concurrent saves get consecutive versions
+    latest, title = Resume.objects.select_for_update().filter(pk=resume_id).values_list('version', 'title').get()
+    document = build_document(resume_id, title)
+
+    previous, depth = None, 0
+    if latest:
+        try:
+            previous, depth = _load_document(resume_id, latest)
+        except ResumeVersion.DoesNotExist:
+            previous = None
+
+    if previous is not None:
+        delta = compute_delta(previous, document)
+        if not delta:
+            return latest
+        depth += 1
+
+    version = latest + 1
+    is_snapshot = previous is None or depth >= settings.RESUME_VERSION_SNAPSHOT_INTERVAL
+    ResumeVersion.objects.create(
+        resume_id=resume_id,
+        version=version,
+        is_snapshot=is_snapshot,
+        data=document if is_snapshot else delta
+    )
+    Resume.objects.filter(pk=resume_id).update(version=F('version') + 1, updated_at=timezone.now())
+
+    transaction.on_commit(lambda: cache.set(
+        _cache_key(resume_id, version), (document, 0 if is_snapshot else depth), DOCUMENT_CACHE_TIMEOUT
+    ))
+    return version
+
+
+@transaction.atomic
+def restore_version(resume, version):
+    """Rewrite the resume to match an earlier version and record that as a new version."""
+    document = get_document(resume, version)
+
+    resume.title = document['title']
+    resume.save(update_fields=['title', 'updated_at'])
+
+    if document['contact_info']:
+        ContactInfo.objects.update_or_create(resume=resume, defaults=document['contact_info'])
+    else:
+        ContactInfo.objects.filter(resume=resume).delete()
+
+    for section, (model, fields) in SECTION_FIELDS.items():
+        model.objects.filter(resume=resume).delete()
+        model.objects.bulk_create(model(resume=resume, **item) for item in document[section])
+
+    # bulk_create sends no signals
+    schedule_reindex(resume.pk)
+    return record_version(resume.pk)
@@ -2,22 +2,56 @@ import asyncio
 from django.utils import timezone
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound, ValidationError
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.views import APIView
-from django.db import transaction
+from django.db import IntegrityError, transaction
+from django.db.models import F, Max
+from django.core.files.storage import default_storage
+from django.core.handlers.asgi import ASGIRequest
+from django.http import FileResponse, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from django.utils.text import slugify
 
-from .models import Resume
-from .serializers import ResumeSerializer, TextEnhancementSerializer
+from resume_platform.async_views import AsyncAPIView
+from resume_platform.idempotency import IdempotencyMixin
+from resume_platform.quotas import AIQuotaThrottle, QuotaRefundMixin
+
+from resumeenhancer.models import UploadedResume
+from .models import Resume, ResumeVersion, ContactInfo, WorkExperience, Education, Skill
+from .serializers import (
+    ResumeSerializer, ContactInfoSerializer, WorkExperienceSerializer, EducationSerializer,
+    SkillSerializer, SectionReorderSerializer, ResumeVersionSerializer, TextEnhancementSerializer,
+    ResumeImportSerializer, ResumeCloneSerializer, ResumePatchSerializer, JobMatchSerializer
+)
+from .importers import ResumeImporter
+from .search import search_resumes
+from .autocomplete import skill_index
+from .versioning import get_document, record_version, restore_version
+from .rendering import DEFAULT_TEMPLATE, RENDER_FORMATS, TEMPLATES, UnsupportedCharacters
+from .exports import CONTENT_TYPES, BULK_EXPORT_FORMATS, aiter_stream, get_artifact, stream_ndjson, stream_zip
+from .patching import ResumePatch, PatchError, VersionConflict
 from .permissions import IsPremiumUser
 from .services import GeminiTextEnhancementService
 
 
-class ResumeViewSet(viewsets.ModelViewSet):
+class ResumeViewSet(IdempotencyMixin, viewsets.ModelViewSet):
     """ViewSet for CRUD operations on Resume model with nested serialization."""
     
     serializer_class = ResumeSerializer
     permission_classes = [IsAuthenticated]
+    lookup_value_regex = '[0-9]+'
+    # Actions that create a resume honour Idempotency-Key
+    idempotent_actions = ('create', 'clone', 'import_upload')
+    # Checked by QueryInspectionMiddleware: reads cost one query per table,
+    # the resume and its four sections, plus the page count for list or the
+    # recorded version when export renders afresh. Writes also version and
+    # reindex the resume; they are only checked for repeated queries until
+    # those paths are trimmed and can be given ceilings of their own.
+    query_budgets = {
+        'list': 6, 'retrieve': 5, 'export': 6, 'versions': 2, 'version_detail': 2,
+    }
     
     def get_queryset(self):
         """Return resumes for the current user only."""
@@ -30,7 +64,7 @@ class ResumeViewSet(viewsets.ModelViewSet):
     
     def get_permissions(self):
         """Set permissions based on action."""
-        if self.action in ['create', 'update', 'partial_update', 'destroy']:
+        if self.action in ['create', 'update', 'partial_update', 'destroy', 'import_upload', 'restore', 'clone', 'apply_patch']:
             # Only premium users can create/modify resumes
             permission_classes = [IsAuthenticated, IsPremiumUser]
         else:
@@ -47,6 +81,7 @@ class ResumeViewSet(viewsets.ModelViewSet):
         
         # The serializer's create method handles nested object creation
         resume = serializer.save()
+        resume.version = record_version(resume.pk)
         
         # Return the created resume with all nested data
         response_serializer = self.get_serializer(resume)
@@ -63,6 +98,7 @@ class ResumeViewSet(viewsets.ModelViewSet):
         
         # The serializer's update method handles nested object updates
         resume = serializer.save()
+        resume.version = record_version(resume.pk)
         
         # Return the updated resume with all nested data
         response_serializer = self.get_serializer(resume)
@@ -70,7 +106,14 @@ class ResumeViewSet(viewsets.ModelViewSet):
     
     @action(detail=True, methods=['get'])
     def export(self, request, pk=None):
-        """Export resume data in a structured format."""
+        """
+        Export resume data in a structured format, or as a rendered file
+        with ?type=pdf|docx and an optional ?template=.
+        """
+        file_format = request.query_params.get('type', 'json')
+        if file_format != 'json':
+            return self._export_file(request, pk, file_format)
+        
         resume = self.get_object()
         serializer = self.get_serializer(resume)
         
@@ -82,12 +125,351 @@ class ResumeViewSet(viewsets.ModelViewSet):
         }
         
         return Response(export_data)
+    
+    def _export_file(self, request, pk, file_format):
+        """Serve the rendered artifact for the resume's current version from storage."""
+        template = request.query_params.get('template', DEFAULT_TEMPLATE)
+        if file_format not in RENDER_FORMATS:
+            return Response({'error': f"type must be one of json, {', '.join(RENDER_FORMATS)}"}, status=status.HTTP_400_BAD_REQUEST)
+        if template not in TEMPLATES:
+            return Response({'error': f"template must be one of {', '.join(TEMPLATES)}"}, status=status.HTTP_400_BAD_REQUEST)
+        
+        resume = get_object_or_404(Resume.objects.filter(user=request.user), pk=pk)
+        try:
+            name = get_artifact(resume, template, file_format)
+        except UnsupportedCharacters as e:
+            return Response({'error': str(e)}, status=status.HTTP_422_UNPROCESSABLE_ENTITY)
+        except Exception as e:
+            print(f"Resume export failed for resume {resume.pk}: {e}")
+            return Response({'error': 'The resume could not be rendered.'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        
+        return FileResponse(
+            default_storage.open(name, 'rb'),
+            as_attachment=True,
+            filename=f"{slugify(resume.title) or 'resume'}.{file_format}",
+            content_type=CONTENT_TYPES[file_format]
+        )
+    
+    @action(detail=False, methods=['get'], url_path='bulk-export')
+    def bulk_export(self, request):
+        """Stream every resume and upload of the account as NDJSON (default) or ?type=zip."""
+        file_format = request.query_params.get('type', 'ndjson')
+        if file_format not in BULK_EXPORT_FORMATS:
+            return Response({'error': f"type must be one of {', '.join(BULK_EXPORT_FORMATS)}"}, status=status.HTTP_400_BAD_REQUEST)
+        
+        stream = stream_zip(request.user) if file_format == 'zip' else stream_ndjson(request.user)
+        if isinstance(request._request, ASGIRequest):
+            stream = aiter_stream(stream)
+        response = StreamingHttpResponse(stream, content_type=BULK_EXPORT_FORMATS[file_format])
+        filename = f"{slugify(request.user.username) or 'account'}-export-{timezone.now():%Y%m%d}.{file_format}"
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+    
+    @action(detail=True, methods=['get'])
+    def versions(self, request, pk=None):
+        """List the resume's recorded versions, newest first."""
+        resume = get_object_or_404(Resume.objects.filter(user=request.user), pk=pk)
+        serializer = ResumeVersionSerializer(resume.versions.all(), many=True)
+        return Response({
+            'current_version': resume.version,
+            'versions': serializer.data
+        })
+    
+    @action(detail=True, methods=['get'], url_path=r'versions/(?P<version>[0-9]+)')
+    def version_detail(self, request, pk=None, version=None):
+        """Return the resume as it was at an earlier version."""
+        resume = get_object_or_404(Resume.objects.filter(user=request.user), pk=pk)
+        try:
+            document = get_document(resume, int(version))
+        except ResumeVersion.DoesNotExist:
+            return Response({'error': 'Version not found'}, status=status.HTTP_404_NOT_FOUND)
+    
+        return Response({'version': int(version), 'resume_data': document})
+    
+    @action(detail=True, methods=['post'], url_path=r'versions/(?P<version>[0-9]+)/restore')
+    def restore(self, request, pk=None, version=None):
+        """Restore an earlier version; the restore is recorded as a new version."""
+        resume = get_object_or_404(Resume.objects.filter(user=request.user), pk=pk)
+        try:
+            restore_version(resume, int(version))
+        except ResumeVersion.DoesNotExist:
+            return Response({'error': 'Version not found'}, status=status.HTTP_404_NOT_FOUND)
+    
+        response_serializer = self.get_serializer(self.get_queryset().get(pk=resume.pk))
+        return Response(response_serializer.data)
+    
+    @action(detail=True, methods=['post'])
+    @transaction.atomic
+    def clone(self, request, pk=None):
+        """Copy a resume and all of its sections server-side."""
+        serializer = ResumeCloneSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        
+        source = get_object_or_404(Resume.objects.filter(user=request.user), pk=pk)
+        title = serializer.validated_data.get('title') or f"{source.title} (copy)"
+        resume = Resume.objects.create(user=request.user, title=title[:200])
+        
+        # One read and one bulk insert per section, however long the resume is
+        for model in [ContactInfo, WorkExperience, Education, Skill]:
+            fields = [
+                field.attname for field in model._meta.concrete_fields
+                if field.name not in ('id', 'resume', 'created_at', 'updated_at')
+            ]
+            rows = model.objects.filter(resume=source).order_by('pk').values(*fields)
+            model.objects.bulk_create(model(resume=resume, **row) for row in rows)
+        
+        record_version(resume.pk)
+        
+        response_serializer = self.get_serializer(self.get_queryset().get(pk=resume.pk))
+        return Response(response_serializer.data, status=status.HTTP_201_CREATED)
+    
+    @action(detail=True, methods=['post'], url_path='patch')
+    def apply_patch(self, request, pk=None):
+        """Apply a batch of JSON-Patch style operations, e.g. from editor autosave."""
+        serializer = ResumePatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        
+        try:
+            patch = ResumePatch(serializer.validated_data['operations'])
+            version, created = patch.apply(int(pk), request.user, serializer.validated_data['base_version'])
+        except PatchError as e:
+            return Response(
+                {'error': e.message, 'operation': e.index},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        except VersionConflict as e:
+            return Response(
+                {'error': 'The resume has changed since base_version.', 'current_version': e.current_version},
+                status=status.HTTP_409_CONFLICT
+            )
+        except Resume.DoesNotExist:
+            return Response({'error': 'Resume not found'}, status=status.HTTP_404_NOT_FOUND)
+        
+        return Response({'version': version, 'created': created})
+    
+    @action(detail=False, methods=['post'], url_path='import')
+    def import_upload(self, request):
+        """Create a structured resume from a previously uploaded PDF."""
+        serializer = ResumeImportSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        
+        try:
+            uploaded_resume = UploadedResume.objects.get(
+                id=serializer.validated_data['upload_id'],
+                user=request.user
+            )
+        except UploadedResume.DoesNotExist:
+            return Response({'error': 'Upload not found'}, status=status.HTTP_404_NOT_FOUND)
+        
+        importer = ResumeImporter()
+        resume = importer.import_upload(
+            uploaded_resume,
+            request.user,
+            title=serializer.validated_data.get('title')
+        )
+        
+        response_serializer = self.get_serializer(self.get_queryset().get(pk=resume.pk))
+        return Response({
+            'resume': response_serializer.data,
+            'import': {
+                'upload_id': uploaded_resume.id,
+                'llm_sections': importer.llm_sections,
+                'timings_ms': importer.timings,
+            }
+        }, status=status.HTTP_201_CREATED)
 
 
-class TextEnhancementView(APIView):
+class ResumeSectionViewSet(viewsets.ModelViewSet):
+    """
+    Base ViewSet for the entries of one resume section, routed under
+    /resumes/{resume_pk}/.
+    
+    Each write touches only the affected rows and records a new resume
+    version. Ownership is checked through a join on the parent resume,
+    which is never loaded.
+    """
+    
+    permission_classes = [IsAuthenticated]
+    section_model = None
+    # Page count and page, or the one entry; writes are left unbudgeted as on ResumeViewSet
+    query_budgets = {'list': 2, 'retrieve': 1}
+    
+    @property
+    def resume_pk(self):
+        """Id of the parent resume from the URL."""
+        return int(self.kwargs['resume_pk'])
+    
+    def get_queryset(self):
+        """Return the section's entries if the resume belongs to the current user."""
+        return self.section_model.objects.filter(
+            resume_id=self.resume_pk,
+            resume__user=self.request.user
+        ).annotate(resume_user_id=F('resume__user_id'))
+    
+    def get_permissions(self):
+        """Set permissions based on action."""
+        if self.action in ['create', 'update', 'partial_update', 'destroy', 'reorder']:
+            permission_classes = [IsAuthenticated, IsPremiumUser]
+        else:
+            permission_classes = [IsAuthenticated]
+        
+        return [permission() for permission in permission_classes]
+    
+    @transaction.atomic
+    def create(self, request, *args, **kwargs):
+        return super().create(request, *args, **kwargs)
+    
+    @transaction.atomic
+    def update(self, request, *args, **kwargs):
+        return super().update(request, *args, **kwargs)
+    
+    @transaction.atomic
+    def destroy(self, request, *args, **kwargs):
+        return super().destroy(request, *args, **kwargs)
+    
+    def perform_create(self, serializer):
+        """Append the entry to the section unless a position is given."""
+        resume_pk = self.resume_pk
+        if not Resume.objects.filter(pk=resume_pk, user=self.request.user).exists():
+            raise NotFound("Resume not found.")
+        
+        position = serializer.validated_data.get('position')
+        if position is None:
+            last = self.section_model.objects.filter(resume_id=resume_pk).aggregate(last=Max('position'))['last']
+            position = 0 if last is None else last + 1
+        
+        self._save(serializer, resume_id=resume_pk, position=position)
+        record_version(resume_pk)
+    
+    def perform_update(self, serializer):
+        self._save(serializer)
+        record_version(self.resume_pk)
+    
+    def perform_destroy(self, instance):
+        instance.delete()
+        record_version(self.resume_pk)
+    
+    def _save(self, serializer, **kwargs):
+        """Save the entry, turning unique constraint violations into a 400."""
+        try:
+            with transaction.atomic():
+                serializer.save(**kwargs)
+        except IntegrityError:
+            raise ValidationError({'error': 'This entry already exists on the resume.'})
+    
+    @action(detail=False, methods=['post'])
+    @transaction.atomic
+    def reorder(self, request, resume_pk=None):
+        """Set the order of every entry in the section with one bulk update."""
+        serializer = SectionReorderSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        order = serializer.validated_data['order']
+        
+        entries = list(self.get_queryset().only('id', 'position'))
+        if {entry.id for entry in entries} != set(order):
+            return Response(
+                {'error': 'order must list every entry in the section exactly once.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        positions = {entry_id: index for index, entry_id in enumerate(order)}
+        for entry in entries:
+            entry.position = positions[entry.id]
+        self.section_model.objects.bulk_update(entries, ['position'])
+        record_version(self.resume_pk)
+        
+        response_serializer = self.get_serializer(self.get_queryset(), many=True)
+        return Response(response_serializer.data)
+
+
+class WorkExperienceViewSet(ResumeSectionViewSet):
+    """Work experience entries of a resume."""
+    
+    serializer_class = WorkExperienceSerializer
+    section_model = WorkExperience
+
+
+class EducationViewSet(ResumeSectionViewSet):
+    """Education entries of a resume."""
+    
+    serializer_class = EducationSerializer
+    section_model = Education
+
+
+class SkillViewSet(ResumeSectionViewSet):
+    """Skills of a resume."""
+    
+    serializer_class = SkillSerializer
+    section_model = Skill
+
+
+class ResumeContactInfoView(APIView):
+    """Read and edit a resume's contact info without touching its other sections."""
+    
+    permission_classes = [IsAuthenticated]
+    
+    def get_permissions(self):
+        """Reads are open to all authenticated users, writes need premium."""
+        if self.request.method == 'GET':
+            return [IsAuthenticated()]
+        return [IsAuthenticated(), IsPremiumUser()]
+    
+    def _get_contact_info(self, request, resume_pk):
+        return ContactInfo.objects.filter(resume_id=resume_pk, resume__user=request.user).first()
+    
+    def get(self, request, resume_pk):
+        """Return the contact info."""
+        contact_info = self._get_contact_info(request, resume_pk)
+        if contact_info is None:
+            return Response({'error': 'Contact info not found'}, status=status.HTTP_404_NOT_FOUND)
+        return Response(ContactInfoSerializer(contact_info).data)
+    
+    @transaction.atomic
+    def put(self, request, resume_pk):
+        """Create or replace the contact info."""
+        contact_info = self._get_contact_info(request, resume_pk)
+        if contact_info is None:
+            if not Resume.objects.filter(pk=resume_pk, user=request.user).exists():
+                return Response({'error': 'Resume not found'}, status=status.HTTP_404_NOT_FOUND)
+            serializer = ContactInfoSerializer(data=request.data)
+            serializer.is_valid(raise_exception=True)
+            serializer.save(resume_id=resume_pk)
+            record_version(resume_pk)
+            return Response(serializer.data, status=status.HTTP_201_CREATED)
+        
+        return self._update(contact_info, request.data, resume_pk, partial=False)
+    
+    @transaction.atomic
+    def patch(self, request, resume_pk):
+        """Update some contact info fields."""
+        contact_info = self._get_contact_info(request, resume_pk)
+        if contact_info is None:
+            return Response({'error': 'Contact info not found'}, status=status.HTTP_404_NOT_FOUND)
+        return self._update(contact_info, request.data, resume_pk, partial=True)
+    
+    @transaction.atomic
+    def delete(self, request, resume_pk):
+        """Remove the contact info."""
+        deleted, _ = ContactInfo.objects.filter(resume_id=resume_pk, resume__user=request.user).delete()
+        if not deleted:
+            return Response({'error': 'Contact info not found'}, status=status.HTTP_404_NOT_FOUND)
+        record_version(resume_pk)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+    
+    def _update(self, contact_info, data, resume_pk, partial):
+        serializer = ContactInfoSerializer(contact_info, data=data, partial=partial)
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+        record_version(resume_pk)
+        return Response(serializer.data)
+
+
+class TextEnhancementView(IdempotencyMixin, QuotaRefundMixin, AsyncAPIView):
     """Async view for AI text enhancement."""
     
     permission_classes = [IsAuthenticated, IsPremiumUser]
+    throttle_classes = [AIQuotaThrottle]
+    throttle_scope = 'enhance-text'
     
     async def post(self, request):
         """Enhance text using AI asynchronously."""
@@ -122,32 +504,96 @@ class ResumeAnalyticsView(APIView):
     """View for resume analytics and insights."""
     
     permission_classes = [IsAuthenticated]
+    query_budget = 5
     
     def get(self, request):
         """Get analytics for user's resumes."""
         user_resumes = Resume.objects.filter(user=request.user)
         
+        # One count per table rather than one per resume
         analytics = {
             'total_resumes': user_resumes.count(),
-            'total_work_experiences': sum(
-                resume.work_experiences.count() for resume in user_resumes
-            ),
-            'total_education_entries': sum(
-                resume.education_entries.count() for resume in user_resumes
-            ),
-            'total_skills': sum(
-                resume.skills.count() for resume in user_resumes
-            ),
+            'total_work_experiences': WorkExperience.objects.filter(resume__user=request.user).count(),
+            'total_education_entries': Education.objects.filter(resume__user=request.user).count(),
+            'total_skills': Skill.objects.filter(resume__user=request.user).count(),
             'most_recent_resume': None
         }
         
         # Get most recent resume
-        if user_resumes.exists():
-            most_recent = user_resumes.first()
-            analytics['most_recent_resume'] = {
-                'id': most_recent.id,
-                'title': most_recent.title,
-                'updated_at': most_recent.updated_at
-            }
+        most_recent = user_resumes.values('id', 'title', 'updated_at').first()
+        if most_recent is not None:
+            analytics['most_recent_resume'] = most_recent
         
         return Response(analytics)
+
+
+class ResumeSearchView(APIView):
+    """Full-text search over the current user's resumes and their sections."""
+    
+    permission_classes = [IsAuthenticated]
+    query_budget = 3
+    
+    def get(self, request):
+        """Return the user's resumes matching `q`, best match first."""
+        query = request.query_params.get('q', '').strip()
+        if not query:
+            return Response({'error': 'A search query is required.'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        try:
+            limit = min(max(int(request.query_params.get('limit', 20)), 1), 100)
+        except ValueError:
+            return Response({'error': 'limit must be an integer.'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        results = search_resumes(request.user, query, limit=limit)
+        return Response({
+            'query': query,
+            'count': len(results),
+            'results': results
+        })
+
+
+class SkillAutocompleteView(APIView):
+    """Skill name suggestions served from the in-memory prefix index."""
+    
+    permission_classes = [IsAuthenticated]
+    query_budget = 1
+    
+    def get(self, request):
+        """Return skills starting with `q`, most used first."""
+        prefix = request.query_params.get('q', '')
+        
+        try:
+            limit = min(max(int(request.query_params.get('limit', 10)), 1), 50)
+        except ValueError:
+            return Response({'error': 'limit must be an integer.'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        return Response({
+            'query': prefix,
+            'suggestions': skill_index.get_index().suggest(prefix, limit=limit)
+        })
+
+
+class JobMatchView(APIView):
+    """Rank all of the user's resumes against a job description locally."""
+    
+    permission_classes = [IsAuthenticated]
+    query_budget = 2
+    
+    def post(self, request):
+        """Score every resume with BM25 and list the keywords each one is missing."""
+        serializer = JobMatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        
+        # numpy and scipy are only loaded once a process serves a match
+        from .matching import get_corpus
+        corpus = get_corpus(request.user)
+        keywords, results = corpus.rank(
+            serializer.validated_data['job_description'],
+            limit=serializer.validated_data['limit']
+        )
+        
+        return Response({
+            'keywords': keywords,
+            'count': len(results),
+            'results': results
+        })
@@ -0,0 +1,109 @@
+import re
+
+from resume_platform.resume_text import BULLET_RE, EMAIL_RE, find_phone, split_sections
+
+ACTION_VERBS = {
+    'achieved', 'analyzed', 'architected', 'automated', 'boosted', 'built',
+    'championed', 'collaborated', 'consolidated', 'coordinated', 'created',
+    'cut', 'decreased', 'delivered', 'deployed', 'designed', 'developed',
+    'directed', 'drove', 'eliminated', 'enabled', 'engineered', 'established',
+    'executed', 'expanded', 'generated', 'grew', 'implemented', 'improved',
+    'increased', 'initiated', 'introduced', 'launched', 'led', 'managed',
+    'mentored', 'migrated', 'modernized', 'negotiated', 'optimized',
+    'orchestrated', 'organized', 'overhauled', 'oversaw', 'pioneered',
+    'planned', 'produced', 'reduced', 'redesigned', 'refactored', 'resolved',
+    'restructured', 'revamped', 'saved', 'scaled', 'shipped', 'simplified',
+    'spearheaded', 'streamlined', 'strengthened', 'supervised', 'trained',
+    'transformed', 'tripled', 'doubled', 'won', 'wrote',
+}
+
+# Key under UploadedResume.analysis_results holding the local result
+PROVISIONAL_KEY = 'provisional'
+
+QUANTITY_RE = re.compile(r"\d|%|\$|€|£")
+
+# Score weights, summing to 100
+SECTION_POINTS = {'experience': 15, 'education': 10, 'skills': 10, 'summary': 5}
+CONTACT_POINTS = 10
+ACTION_VERB_POINTS = 20
+QUANTIFIED_POINTS = 20
+LENGTH_POINTS = 10
+IDEAL_WORDS = (300, 900)
+
+
+class LocalResumeAnalyzer:
+    """
+    Cheap, deterministic analysis of extracted resume text.
+
+    It runs in milliseconds right after extraction so users get a
+    provisional score while the AI analysis is still in flight.
+    """
+
+    def analyze(self, text: str, page_count: int = 0) -> dict:
+        """Return the provisional score and the metrics it was computed from."""
+        sections = split_sections(text)
+        words = text.split()
+        bullets = self._bullets(sections.get('experience', '') or text)
+
+        action_bullets = sum(1 for bullet in bullets if self._starts_with_action_verb(bullet))
+        quantified_bullets = sum(1 for bullet in bullets if QUANTITY_RE.search(bullet))
+        action_verb_density = action_bullets / len(bullets) if bullets else 0.0
+        quantified_ratio = quantified_bullets / len(bullets) if bullets else 0.0
+
+        section_presence = {name: bool(sections.get(name)) for name in SECTION_POINTS}
+        has_contact = bool(EMAIL_RE.search(text) or find_phone(text))
+
+        score = sum(points for name, points in SECTION_POINTS.items() if section_presence[name])
+        score += CONTACT_POINTS if has_contact else 0
+        score += ACTION_VERB_POINTS * action_verb_density
+        score += QUANTIFIED_POINTS * quantified_ratio
+        score += LENGTH_POINTS * self._length_factor(len(words))
+
+        return {
+            'score': round(score),
+            'sections': {**section_presence, 'contact': has_contact},
+            'word_count': len(words),
+            'page_count': page_count,
+            'bullet_count': len(bullets),
+            'action_verb_density': round(action_verb_density, 3),
+            'quantified_bullet_ratio': round(quantified_ratio, 3),
+            'improvements': self._improvements(
+                section_presence, has_contact, action_verb_density, quantified_ratio, len(words)
+            ),
+        }
+
+    def _bullets(self, text: str) -> list:
+        """Return bullet lines, or every non-empty line when the text has no bullets."""
+        lines = [line.strip() for line in text.splitlines() if line.strip()]
+        bullets = [BULLET_RE.sub('', line) for line in lines if BULLET_RE.match(line)]
+        return bullets or [line for line in lines if len(line.split()) >= 4]
+
+    def _starts_with_action_verb(self, bullet: str) -> bool:
+        first_word = re.sub(r"[^a-z]", "", bullet.split()[0].lower()) if bullet.split() else ''
+        return first_word in ACTION_VERBS
+
+    def _length_factor(self, word_count: int) -> float:
+        """1.0 inside the ideal word range, falling off linearly outside it."""
+        low, high = IDEAL_WORDS
+        if word_count < low:
+            return word_count / low
+        if word_count > high:
+            return max(0.0, 1 - (word_count - high) / high)
+        return 1.0
+
+    def _improvements(self, section_presence, has_contact, action_verb_density, quantified_ratio, word_count) -> list:
+        improvements = []
+        for name, present in section_presence.items():
+            if not present:
+                improvements.append(f"Add a clearly labelled {name} section.")
+        if not has_contact:
+            improvements.append("Include an email address or phone number.")
+        if action_verb_density < 0.5:
+            improvements.append("Start more bullet points with strong action verbs.")
+        if quantified_ratio < 0.3:
+            improvements.append("Quantify more achievements with numbers, percentages or amounts.")
+        if word_count < IDEAL_WORDS[0]:
+            improvements.append("Expand on your experience; the resume is quite short.")
+        elif word_count > IDEAL_WORDS[1]:
+            improvements.append("Tighten the wording; the resume is longer than most reviewers read.")
+        return improvements
@@ -0,0 +1,119 @@
+import time
+import uuid
+import asyncio
+import statistics
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.test import AsyncClient, override_settings
+from django.test.utils import setup_databases, teardown_databases
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import AccessToken
+
+from resume_platform.db_routers import PRIMARY, replica_aliases
+from users.models import CustomUser
+from resumeenhancer.models import AnalysisResult, ExtractedResumeText, UploadedResume
+from resumeenhancer.services import GeminiResumeAnalysisService, ResumeTextExtractionService
+from resumeenhancer.tasks import run_ai_analysis
+
+SAMPLE_TEXT = "Jane Doe\nEXPERIENCE\nSenior Engineer at Acme\n- Led a migration to Python, cutting latency by 40%"
+
+
+class Command(BaseCommand):
+    """
+    Measure enhancer throughput in-process through the ASGI handler.
+
+    Everything runs against a throwaway test database, created and dropped
+    by the command, so the configured database is never written to.
+    """
+
+    help = "Benchmark the upload status endpoint and the cached analysis pipeline under ASGI."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--requests', type=int, default=500,
+            help="Number of status requests to send (default: 500)."
+        )
+        parser.add_argument(
+            '--uploads', type=int, default=100,
+            help="Number of uploads to run through the analysis pipeline (default: 100)."
+        )
+        parser.add_argument(
+            '--concurrency', type=int, default=20,
+            help="Requests or analyses in flight at the same time (default: 20)."
+        )
+
+    def handle(self, *args, **options):
+        if options['concurrency'] < 1:
+            raise CommandError("--concurrency must be at least 1.")
+
+        # Replicas read the test database too, as they would in a test run
+        for alias in replica_aliases():
+            connections[alias].settings_dict['TEST']['MIRROR'] = PRIMARY
+        old_config = setup_databases(verbosity=0, interactive=False, aliases={PRIMARY})
+        try:
+            user = CustomUser.objects.create(username=f"benchmark-{uuid.uuid4().hex[:12]}")
+            upload_ids = self._create_uploads(user, options['uploads'])
+            with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+                asyncio.run(self._run(user, upload_ids, options))
+        finally:
+            teardown_databases(old_config, verbosity=0)
+
+    def _create_uploads(self, user, count):
+        """Create finished uploads whose text already has a cached analysis."""
+        text_hash = ResumeTextExtractionService.hash_text(SAMPLE_TEXT)
+        AnalysisResult.objects.get_or_create(
+            text_hash=text_hash,
+            prompt_version=GeminiResumeAnalysisService.PROMPT_VERSION,
+            model_name=GeminiResumeAnalysisService.MODEL_NAME,
+            defaults={'results': {'summary': 'Benchmark', 'score': 80}}
+        )
+        uploads = UploadedResume.objects.bulk_create([
+            UploadedResume(user=user, original_file='benchmark.pdf', status='complete')
+            for _ in range(max(count, 1))
+        ])
+        ExtractedResumeText.objects.bulk_create([
+            ExtractedResumeText(uploaded_resume=upload, text=SAMPLE_TEXT, text_hash=text_hash, page_count=1)
+            for upload in uploads
+        ])
+        return [upload.id for upload in uploads]
+
+    async def _run(self, user, upload_ids, options):
+        client = AsyncClient()
+        headers = {'Authorization': f"Bearer {AccessToken.for_user(user)}"}
+        semaphore = asyncio.Semaphore(options['concurrency'])
+
+        async def status_request(index):
+            async with semaphore:
+                started = time.perf_counter()
+                response = await client.get(
+                    f"/api/enhancer/status/{upload_ids[index % len(upload_ids)]}/", headers=headers
+                )
+                if response.status_code != 200:
+                    raise CommandError(f"Status request failed with {response.status_code}")
+                return time.perf_counter() - started
+
+        await self._measure('status view', [status_request(i) for i in range(options['requests'])])
+
+        await UploadedResume.objects.filter(id__in=upload_ids).aupdate(status='pending', updated_at=timezone.now())
+
+        async def analysis(upload_id):
+            async with semaphore:
+                started = time.perf_counter()
+                await run_ai_analysis(upload_id)
+                return time.perf_counter() - started
+
+        await self._measure('cached analysis', [analysis(upload_id) for upload_id in upload_ids])
+
+        completed = await UploadedResume.objects.filter(id__in=upload_ids, status='complete').acount()
+        self.stdout.write(f"  {completed}/{len(upload_ids)} analyses completed")
+
+    async def _measure(self, label, coroutines):
+        started = time.perf_counter()
+        latencies = sorted(await asyncio.gather(*coroutines))
+        elapsed = time.perf_counter() - started
+        p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+        self.stdout.write(
+            f"{label}: {len(latencies) / elapsed:,.0f}/s, "
+            f"p50 {statistics.median(latencies) * 1000:.1f} ms, p95 {p95 * 1000:.1f} ms"
+        )
@@ -0,0 +1,75 @@
+import time
+from django.core.management.base import BaseCommand, CommandError
+
+from resumeenhancer.models import UploadedResume
+from resumeenhancer.retention import (
+    S3_DELETE_LIMIT, RetentionPolicy, delete_files, delete_in_chunks, delete_uploads, iter_expired_batches
+)
+
+
+class Command(BaseCommand):
+    """Delete uploads past their retention period, with their stored files."""
+
+    help = "Delete expired uploads and their files in batches at a controlled rate."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=500,
+            help=f"Uploads deleted per batch, at most {S3_DELETE_LIMIT} (default: 500)."
+        )
+        parser.add_argument(
+            '--rate', type=float, default=200.0,
+            help="Maximum number of uploads deleted per second (default: 200)."
+        )
+        parser.add_argument(
+            '--limit', type=int, default=None,
+            help="Stop after this many uploads."
+        )
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help="Count the expired uploads without deleting anything."
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        if not 1 <= batch_size <= S3_DELETE_LIMIT:
+            raise CommandError(f"--batch-size must be between 1 and {S3_DELETE_LIMIT}.")
+        if options['rate'] <= 0:
+            raise CommandError("--rate must be greater than zero.")
+
+        policy = RetentionPolicy()
+        expired = policy.expired_uploads()
+
+        if options['dry_run']:
+            self.stdout.write(f"{expired.count()} uploads would be deleted.")
+            return
+
+        # Each batch deletes its files before its rows, so an interrupted run
+        # never leaves a file without a row and the next run picks up the rest
+        storage = UploadedResume._meta.get_field('original_file').storage
+        limit = options['limit']
+        deleted = kept = 0
+        for batch in iter_expired_batches(expired, batch_size):
+            if limit is not None:
+                batch = batch[:limit - deleted - kept]
+            started = time.monotonic()
+
+            failed = set(delete_files(storage, [name for _, name in batch if name]))
+            # Rows whose file could not be deleted stay for the next run
+            upload_ids = [upload_id for upload_id, name in batch if name not in failed]
+            deleted += delete_uploads(upload_ids)
+            kept += len(batch) - len(upload_ids)
+            self.stdout.write(f"Deleted {deleted} uploads so far.")
+
+            if limit is not None and deleted + kept >= limit:
+                break
+            time.sleep(max(0.0, len(batch) / options['rate'] - (time.monotonic() - started)))
+
+        analyses = delete_in_chunks(policy.orphaned_analysis_results(), batch_size)
+        batches = delete_in_chunks(policy.empty_batches(), batch_size)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Deleted {deleted} expired uploads, {analyses} unused cached analyses and {batches} empty batches."
+        ))
+        if kept:
+            self.stdout.write(self.style.WARNING(f"Kept {kept} uploads whose files could not be deleted."))
@@ -0,0 +1,91 @@
+import asyncio
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from resumeenhancer.models import UploadedResume
+from resumeenhancer.services import GeminiResumeAnalysisService
+from resumeenhancer.tasks import run_ai_analysis
+
+
+class Command(BaseCommand):
+    """Re-analyze finished uploads whose results predate the current prompt version."""
+
+    help = "Re-analyze uploads with the current analysis prompt at a controlled rate."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rate', type=float, default=1.0,
+            help="Maximum number of analyses started per second (default: 1)."
+        )
+        parser.add_argument(
+            '--concurrency', type=int, default=settings.RESUME_ANALYSIS_CONCURRENCY,
+            help="Maximum number of analyses running at the same time."
+        )
+        parser.add_argument(
+            '--limit', type=int, default=None,
+            help="Stop after this many uploads."
+        )
+        parser.add_argument(
+            '--user', type=int, default=None,
+            help="Only re-analyze uploads belonging to this user id."
+        )
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help="List how many uploads would be re-analyzed without doing it."
+        )
+
+    def handle(self, *args, **options):
+        if options['rate'] <= 0:
+            raise CommandError("--rate must be greater than zero.")
+        if options['concurrency'] < 1:
+            raise CommandError("--concurrency must be at least 1.")
+
+        queryset = (
+            UploadedResume.objects
+            .filter(status__in=['complete', 'failed'])
+            .exclude(prompt_version=GeminiResumeAnalysisService.PROMPT_VERSION)
+            .order_by('id')
+        )
+        if options['user'] is not None:
+            queryset = queryset.filter(user_id=options['user'])
+
+        upload_ids = list(queryset.values_list('id', flat=True)[:options['limit']])
+
+        if options['dry_run']:
+            self.stdout.write(f"{len(upload_ids)} uploads would be re-analyzed.")
+            return
+
+        queued = asyncio.run(self._reanalyze(upload_ids, options['rate'], options['concurrency']))
+        self.stdout.write(self.style.SUCCESS(
+            f"Re-analyzed {queued} uploads with prompt {GeminiResumeAnalysisService.PROMPT_VERSION}."
+        ))
+
+    async def _reanalyze(self, upload_ids, rate, concurrency):
+        """Start one analysis every 1/rate seconds, with at most `concurrency` in flight."""
+        semaphore = asyncio.Semaphore(concurrency)
+        interval = 1.0 / rate
+        tasks = []
+
+        async def analyze(upload_id):
+            try:
+                await run_ai_analysis(upload_id)
+            finally:
+                semaphore.release()
+
+        for upload_id in upload_ids:
+            await semaphore.acquire()
+
+            # Skip uploads a user re-analyzed since the ids were selected
+            queued = await UploadedResume.objects.filter(
+                id=upload_id, status__in=['complete', 'failed']
+            ).aupdate(status='pending', updated_at=timezone.now())
+            if not queued:
+                semaphore.release()
+                continue
+
+            tasks.append(asyncio.create_task(analyze(upload_id)))
+            await asyncio.sleep(interval)
+
+        await asyncio.gather(*tasks)
+        return len(tasks)
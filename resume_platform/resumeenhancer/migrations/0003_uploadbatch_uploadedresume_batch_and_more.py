@@ -0,0 +1,40 @@
+# Generated by Django 5.2.3 on 2026-10-19 16:44
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('resumeenhancer', '0002_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UploadBatch',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('total_files', models.PositiveIntegerField(help_text='Number of files accepted in this batch')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='upload_batches', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Upload Batch',
+                'verbose_name_plural': 'Upload Batches',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.AddField(
+            model_name='uploadedresume',
+            name='batch',
+            field=models.ForeignKey(blank=True, help_text='Batch this resume was uploaded in, if any', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='uploads', to='resumeenhancer.uploadbatch'),
+        ),
+        migrations.AddIndex(
+            model_name='uploadedresume',
+            index=models.Index(fields=['batch', 'status'], name='resumeenhan_batch_i_2da8ed_idx'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.3 on 2026-10-19 16:45
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('resumeenhancer', '0003_uploadbatch_uploadedresume_batch_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExtractedResumeText',
+            fields=[
+                ('uploaded_resume', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='extracted_text', serialize=False, to='resumeenhancer.uploadedresume')),
+                ('text', models.TextField(blank=True, help_text='Normalized text extracted from the original file')),
+                ('text_hash', models.CharField(db_index=True, help_text='SHA-256 hex digest of the normalized text', max_length=64)),
+                ('page_count', models.PositiveIntegerField(default=0, help_text='Number of pages in the original file')),
+                ('extraction_time_ms', models.FloatField(default=0, help_text='Time spent extracting the text, in milliseconds')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Extracted Resume Text',
+                'verbose_name_plural': 'Extracted Resume Texts',
+            },
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.3 on 2026-10-19 16:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('resumeenhancer', '0004_extractedresumetext'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='uploadedresume',
+            name='prompt_version',
+            field=models.CharField(blank=True, help_text='Analysis prompt version that produced the current results', max_length=20),
+        ),
+        migrations.CreateModel(
+            name='AnalysisResult',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('text_hash', models.CharField(help_text='SHA-256 hex digest of the analyzed text', max_length=64)),
+                ('prompt_version', models.CharField(help_text='Version of the analysis prompt', max_length=20)),
+                ('model_name', models.CharField(help_text='Name of the model that produced the analysis', max_length=100)),
+                ('results', models.JSONField(help_text='AI analysis results stored as JSON')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Analysis Result',
+                'verbose_name_plural': 'Analysis Results',
+                'constraints': [models.UniqueConstraint(fields=('text_hash', 'prompt_version', 'model_name'), name='unique_analysis_per_text_prompt_model')],
+            },
+        ),
+    ]
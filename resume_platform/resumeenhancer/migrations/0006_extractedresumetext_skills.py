@@ -0,0 +1,18 @@
+# Generated by Django 5.2.3 on 2026-10-19 16:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('resumeenhancer', '0005_uploadedresume_prompt_version_analysisresult'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='extractedresumetext',
+            name='skills',
+            field=models.JSONField(blank=True, default=list, help_text='Dictionary skills found in the text, with category and mention count'),
+        ),
+    ]
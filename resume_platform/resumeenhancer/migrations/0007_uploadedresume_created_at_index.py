@@ -0,0 +1,19 @@
+# Generated by Django 5.2.3 on 2026-10-19 17:30
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('resumeenhancer', '0006_extractedresumetext_skills'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='uploadedresume',
+            index=models.Index(fields=['created_at', 'id'], name='resumeenhan_created_c3ac04_idx'),
+        ),
+    ]
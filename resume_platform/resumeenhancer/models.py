@@ -1,7 +1,38 @@
+import uuid
 from django.db import models
 from django.conf import settings
 
 
+class UploadBatch(models.Model):
+    """Group of resumes uploaded together in a single batch request."""
+    
+    id = models.UUIDField(
+        primary_key=True,
+        default=uuid.uuid4,
+        editable=False
+    )
+    
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='upload_batches'
+    )
+    
+    total_files = models.PositiveIntegerField(
+        help_text="Number of files accepted in this batch"
+    )
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name = 'Upload Batch'
+        verbose_name_plural = 'Upload Batches'
+    
+    def __str__(self):
+        return f"{self.user.username} - batch {self.id} ({self.total_files} files)"
+
+
 class UploadedResume(models.Model):
     """Model to track uploaded resumes for AI enhancement."""
     
@@ -18,6 +49,15 @@ class UploadedResume(models.Model):
         related_name='uploaded_resumes'
     )
     
+    batch = models.ForeignKey(
+        UploadBatch,
+        on_delete=models.SET_NULL,
+        blank=True,
+        null=True,
+        related_name='uploads',
+        help_text="Batch this resume was uploaded in, if any"
+    )
+    
     original_file = models.FileField(
         upload_to='uploaded_resumes/%Y/%m/%d/',
         help_text="Original resume file uploaded by user"
@@ -36,11 +76,22 @@ class UploadedResume(models.Model):
         help_text="AI analysis results stored as JSON"
     )
     
+    prompt_version = models.CharField(
+        max_length=20,
+        blank=True,
+        help_text="Analysis prompt version that produced the current results"
+    )
+    
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['batch', 'status']),
+            # Retention scans expired uploads oldest first
+            models.Index(fields=['created_at', 'id']),
+        ]
         verbose_name = 'Uploaded Resume'
         verbose_name_plural = 'Uploaded Resumes'
     
@@ -51,3 +102,90 @@ class UploadedResume(models.Model):
     def is_processing_complete(self):
         """Check if processing is complete (success or failure)."""
         return self.status in ['complete', 'failed']
+
+
+
+class ExtractedResumeText(models.Model):
+    """Normalized text extracted from an uploaded resume, stored once per upload."""
+    
+    uploaded_resume = models.OneToOneField(
+        UploadedResume,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='extracted_text'
+    )
+    
+    text = models.TextField(
+        blank=True,
+        help_text="Normalized text extracted from the original file"
+    )
+    
+    text_hash = models.CharField(
+        max_length=64,
+        db_index=True,
+        help_text="SHA-256 hex digest of the normalized text"
+    )
+    
+    page_count = models.PositiveIntegerField(
+        default=0,
+        help_text="Number of pages in the original file"
+    )
+    
+    skills = models.JSONField(
+        default=list,
+        blank=True,
+        help_text="Dictionary skills found in the text, with category and mention count"
+    )
+    
+    extraction_time_ms = models.FloatField(
+        default=0,
+        help_text="Time spent extracting the text, in milliseconds"
+    )
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        verbose_name = 'Extracted Resume Text'
+        verbose_name_plural = 'Extracted Resume Texts'
+    
+    def __str__(self):
+        return f"Text for upload {self.uploaded_resume_id} ({self.page_count} pages)"
+
+
+
+class AnalysisResult(models.Model):
+    """Cached AI analysis keyed by resume text, prompt version and model."""
+    
+    text_hash = models.CharField(
+        max_length=64,
+        help_text="SHA-256 hex digest of the analyzed text"
+    )
+    
+    prompt_version = models.CharField(
+        max_length=20,
+        help_text="Version of the analysis prompt"
+    )
+    
+    model_name = models.CharField(
+        max_length=100,
+        help_text="Name of the model that produced the analysis"
+    )
+    
+    results = models.JSONField(
+        help_text="AI analysis results stored as JSON"
+    )
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['text_hash', 'prompt_version', 'model_name'],
+                name='unique_analysis_per_text_prompt_model'
+            ),
+        ]
+        verbose_name = 'Analysis Result'
+        verbose_name_plural = 'Analysis Results'
+    
+    def __str__(self):
+        return f"{self.text_hash[:12]} ({self.prompt_version}, {self.model_name})"
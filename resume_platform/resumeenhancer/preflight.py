@@ -0,0 +1,130 @@
+from django.conf import settings
+from django.core.files.uploadhandler import FileUploadHandler, SkipFile
+
+from resume_platform.warmup import pdf_reader
+
+MAX_UPLOAD_SIZE = 10 * 1024 * 1024
+PDF_MAGIC = b'%PDF-'
+# Readers accept the header anywhere in the first 1024 bytes, and %%EOF
+# anywhere in the last 1024
+HEADER_WINDOW = 1024
+TAIL_WINDOW = 1024
+# Pages sampled for a text layer; scans have none on any page
+TEXT_SAMPLE_PAGES = 3
+
+
+class PreflightReport:
+    """What the pre-flight checks found out about one uploaded file."""
+
+    def __init__(self, field_name, file_name):
+        self.field_name = field_name
+        self.file_name = file_name
+        self.error = None
+        # Set when the file was dropped while streaming and never buffered
+        self.skipped = False
+        self.size = 0
+        self.page_count = None
+        self._head = b''
+        self._tail = b''
+
+    def reject(self, error):
+        if self.error is None:
+            self.error = error
+
+    def feed(self, chunk):
+        """Check the next chunk of the file as it arrives."""
+        if len(self._head) < HEADER_WINDOW:
+            self._head += chunk[:HEADER_WINDOW - len(self._head)]
+            if len(self._head) >= HEADER_WINDOW and PDF_MAGIC not in self._head:
+                self.reject('The file is not a PDF')
+        self.size += len(chunk)
+        if self.size > MAX_UPLOAD_SIZE:
+            self.reject('File size must be less than 10MB')
+        self._tail = (self._tail + chunk)[-TAIL_WINDOW:]
+
+    def finish(self):
+        """Check what only the whole file shows: a header in a short file, and the trailer."""
+        if PDF_MAGIC not in self._head:
+            self.reject('The file is not a PDF')
+        elif b'%%EOF' not in self._tail or b'startxref' not in self._tail:
+            self.reject('The PDF is incomplete or damaged')
+
+    def inspect(self, uploaded_file):
+        """
+        Parse the received file for what the bytes alone don't show:
+        encryption, the page count, and whether there is text to analyze.
+        Only the cross-reference table and the sampled pages are read.
+        """
+        PdfReader = pdf_reader()
+        try:
+            uploaded_file.seek(0)
+            reader = PdfReader(uploaded_file)
+            if reader.is_encrypted:
+                self.reject('Password-protected PDFs are not supported')
+                return
+
+            self.page_count = len(reader.pages)
+            if self.page_count == 0:
+                self.reject('The PDF has no pages')
+            elif self.page_count > settings.RESUME_UPLOAD_MAX_PAGES:
+                self.reject(f'Resumes may have at most {settings.RESUME_UPLOAD_MAX_PAGES} pages')
+            elif not any(
+                (reader.pages[index].extract_text() or '').strip()
+                for index in range(min(self.page_count, TEXT_SAMPLE_PAGES))
+            ):
+                self.reject('The PDF has no text layer; scanned images are not supported')
+        except Exception as e:
+            print(f"Pre-flight could not read {self.file_name}: {e}")
+            self.reject('The PDF could not be read')
+        finally:
+            uploaded_file.seek(0)
+
+
+class PdfPreflightHandler(FileUploadHandler):
+    """
+    Upload handler that checks each file while it streams in.
+
+    Installed ahead of Django's handlers, it sees every chunk before they
+    buffer it. A file without a .pdf name or a PDF header, or one that
+    grows past MAX_UPLOAD_SIZE, is skipped on the spot, so the rest of it
+    is read past and never kept in memory or on disk. Once a file is
+    complete its trailer is checked. Reports are kept in arrival order on
+    request.upload_preflight; see match_uploads.
+    """
+
+    def __init__(self, request=None):
+        super().__init__(request)
+        request.upload_preflight = []
+
+    def new_file(self, field_name, file_name, *args, **kwargs):
+        super().new_file(field_name, file_name, *args, **kwargs)
+        self.report = PreflightReport(field_name, file_name)
+        self.request.upload_preflight.append(self.report)
+        if not file_name.lower().endswith('.pdf'):
+            # Skipped with the first chunk, once every handler has opened the file
+            self.report.reject('Only PDF files are supported')
+
+    def receive_data_chunk(self, raw_data, start):
+        self.report.feed(raw_data)
+        if self.report.error is not None:
+            self.report.skipped = True
+            raise SkipFile()
+        return raw_data
+
+    def file_complete(self, file_size):
+        self.report.finish()
+        # The next handler returns the file itself
+        return None
+
+
+def match_uploads(request, field_name):
+    """
+    [(file, report)] for each file sent under field_name, in upload order.
+    Files skipped while streaming come with None in place of the file.
+    """
+    files = iter(request.FILES.getlist(field_name))
+    return [
+        (None if report.skipped else next(files), report)
+        for report in getattr(request, 'upload_preflight', [])
+        if report.field_name == field_name
+    ]
@@ -0,0 +1,137 @@
+from datetime import timedelta
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Exists, OuterRef, Q
+from django.utils import timezone
+
+from .models import AnalysisResult, ExtractedResumeText, UploadBatch, UploadedResume
+
+# Most keys one S3 DeleteObjects request accepts
+S3_DELETE_LIMIT = 1000
+# Uploads still queued or being analyzed are never collected
+FINISHED_STATUSES = ['complete', 'failed']
+
+
+class RetentionPolicy:
+    """
+    Decides which uploads have outlived their retention period.
+
+    UPLOAD_RETENTION_DAYS maps a subscription_status to the number of days
+    its users' uploads are kept, with 'default' for any other status.
+    Failed uploads are kept for the 'failed' period instead when that is
+    shorter.
+    """
+
+    def __init__(self, days=None, now=None):
+        self.days = days or settings.UPLOAD_RETENTION_DAYS
+        self.now = now or timezone.now()
+
+    def cutoff(self, key):
+        """Uploads of this class created before the cutoff have expired."""
+        return self.now - timedelta(days=self.days[key])
+
+    @property
+    def latest_cutoff(self):
+        """No upload created after this has expired, whatever its class."""
+        return self.now - timedelta(days=min(self.days.values()))
+
+    def expired_uploads(self):
+        """Queryset of the finished uploads past their retention period."""
+        plans = [status for status in self.days if status not in ('default', 'failed')]
+        expired = ~Q(user__subscription_status__in=plans) & Q(created_at__lt=self.cutoff('default'))
+        for plan in plans:
+            expired |= Q(user__subscription_status=plan, created_at__lt=self.cutoff(plan))
+        if 'failed' in self.days:
+            expired |= Q(status='failed', created_at__lt=self.cutoff('failed'))
+
+        # The bound on created_at alone keeps the scan on the (created_at, id) index
+        return UploadedResume.objects.filter(
+            expired, created_at__lt=self.latest_cutoff, status__in=FINISHED_STATUSES
+        )
+
+    def orphaned_analysis_results(self):
+        """Cached analyses older than the retention period whose text no upload has any more."""
+        return AnalysisResult.objects.filter(created_at__lt=self.latest_cutoff).exclude(
+            Exists(ExtractedResumeText.objects.filter(text_hash=OuterRef('text_hash')))
+        )
+
+    def empty_batches(self):
+        """Upload batches older than the retention period with no uploads left."""
+        return UploadBatch.objects.filter(created_at__lt=self.latest_cutoff).exclude(
+            Exists(UploadedResume.objects.filter(batch=OuterRef('pk')))
+        )
+
+
+def iter_expired_batches(queryset, batch_size):
+    """
+    Yield [(id, file name)] batches of the queryset in (created_at, id)
+    order, each fetched by seeking past the previous batch's last row
+    rather than by offset, so every batch is one index range scan.
+    """
+    last = None
+    while True:
+        page = queryset
+        if last is not None:
+            page = page.filter(Q(created_at__gt=last[0]) | Q(created_at=last[0], id__gt=last[1]))
+        rows = list(page.order_by('created_at', 'id').values_list('created_at', 'id', 'original_file')[:batch_size])
+        if not rows:
+            return
+        last = rows[-1][:2]
+        yield [(upload_id, name) for _, upload_id, name in rows]
+
+
+def delete_files(storage, names):
+    """
+    Delete stored files, returning the names that could not be deleted.
+
+    S3 storages get one DeleteObjects request per S3_DELETE_LIMIT names;
+    any other storage, such as a local FileSystemStorage, deletes one by one.
+    """
+    if not names:
+        return []
+
+    bucket = getattr(storage, 'bucket', None)
+    if bucket is None:
+        failed = []
+        for name in names:
+            try:
+                storage.delete(name)
+            except OSError as e:
+                print(f"Could not delete {name}: {e}")
+                failed.append(name)
+        return failed
+
+    # S3 keys as S3Storage derives them from file names
+    from storages.utils import clean_name
+    keys = {storage._normalize_name(clean_name(name)): name for name in names}
+    key_list = list(keys)
+    failed = []
+    for start in range(0, len(key_list), S3_DELETE_LIMIT):
+        response = bucket.delete_objects(Delete={
+            'Objects': [{'Key': key} for key in key_list[start:start + S3_DELETE_LIMIT]],
+            'Quiet': True,
+        })
+        for error in response.get('Errors', []):
+            print(f"Could not delete {error['Key']}: {error.get('Code')} {error.get('Message')}")
+            failed.append(keys[error['Key']])
+    return failed
+
+
+def delete_uploads(upload_ids):
+    """Delete upload rows and their extracted text in one short transaction."""
+    with transaction.atomic():
+        _, deleted = UploadedResume.objects.filter(id__in=upload_ids).delete()
+    return deleted.get(UploadedResume._meta.label, 0)
+
+
+def delete_in_chunks(queryset, batch_size):
+    """Delete the queryset's rows batch_size ids at a time; returns the number of rows deleted."""
+    model = queryset.model
+    deleted = 0
+    while True:
+        ids = list(queryset.order_by('pk').values_list('pk', flat=True)[:batch_size])
+        if not ids:
+            return deleted
+        with transaction.atomic():
+            model.objects.filter(pk__in=ids).delete()
+        deleted += len(ids)
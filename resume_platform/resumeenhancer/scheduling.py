@@ -0,0 +1,170 @@
+import asyncio
+import heapq
+import itertools
+import time
+import weakref
+from collections import defaultdict, deque
+from django.conf import settings
+
+from .tasks import run_ai_analysis
+
+# Wait samples kept per priority class for the percentiles
+WAIT_SAMPLES = 1000
+
+
+class _Job:
+    __slots__ = ('upload_id', 'user_id', 'priority_class', 'finish_tag', 'enqueued_at', 'future', 'dispatched')
+
+    def __init__(self, upload_id, user_id, priority_class, finish_tag, future):
+        self.upload_id = upload_id
+        self.user_id = user_id
+        self.priority_class = priority_class
+        self.finish_tag = finish_tag
+        self.enqueued_at = time.monotonic()
+        self.future = future
+        self.dispatched = False
+
+
+class AnalysisScheduler:
+    """
+    Dispatches queued analyses by weighted fair queueing across users.
+
+    Each user gets a share of the RESUME_ANALYSIS_CONCURRENCY slots in
+    proportion to the weight of their priority class, so one user's flood of
+    uploads only delays their own queue. Jobs are ordered by a virtual
+    finish tag (self-clocked fair queueing): a user's next job finishes
+    1/weight after the later of their previous job and the current virtual
+    time. A job that has waited longer than RESUME_ANALYSIS_MAX_WAIT_SECONDS
+    is dispatched ahead of the fair order, so no class can be starved.
+
+    The event loop only keeps weak references to tasks, so every task the
+    scheduler starts is held in a set until it finishes.
+    """
+
+    def __init__(self, concurrency, weights, max_wait):
+        self.concurrency = concurrency
+        self.weights = weights
+        self.max_wait = max_wait
+        self.running = 0
+        self.virtual_time = 0.0
+        self._sequence = itertools.count()
+        self._heap = []
+        self._arrivals = deque()
+        self._last_finish = {}
+        self._pending = defaultdict(int)
+        self._waits = defaultdict(lambda: deque(maxlen=WAIT_SAMPLES))
+        self._tasks = set()
+
+    def priority_class(self, user):
+        """Priority class for a user, from their subscription status."""
+        status = user.subscription_status
+        return status if status in self.weights else 'free'
+
+    async def run(self, upload_id, user):
+        """Queue the analysis of an upload and wait until it has run."""
+        future = asyncio.get_running_loop().create_future()
+        priority_class = self.priority_class(user)
+
+        start = max(self.virtual_time, self._last_finish.get(user.pk, 0.0))
+        finish_tag = start + 1 / self.weights[priority_class]
+        self._last_finish[user.pk] = finish_tag
+
+        job = _Job(upload_id, user.pk, priority_class, finish_tag, future)
+        heapq.heappush(self._heap, (finish_tag, next(self._sequence), job))
+        self._arrivals.append(job)
+        self._pending[priority_class] += 1
+
+        self._dispatch()
+        await future
+
+    def submit(self, upload_id, user):
+        """Queue the analysis of an upload in the background and return its task."""
+        return self.spawn(self.run(upload_id, user))
+
+    def spawn(self, coroutine):
+        """Run a coroutine as a task that is referenced until done and whose failure is reported."""
+        task = asyncio.create_task(coroutine)
+        self._tasks.add(task)
+        task.add_done_callback(self._task_done)
+        return task
+
+    def _task_done(self, task):
+        self._tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            print(f"Background analysis task failed: {task.exception()!r}")
+
+    def _dispatch(self):
+        """Start queued jobs while there are free slots."""
+        while self.running < self.concurrency:
+            job = self._next_job()
+            if job is None:
+                return
+            job.dispatched = True
+            self.running += 1
+            self._pending[job.priority_class] -= 1
+            self.virtual_time = max(self.virtual_time, job.finish_tag)
+            self._waits[job.priority_class].append(time.monotonic() - job.enqueued_at)
+            self.spawn(self._execute(job))
+
+    def _next_job(self):
+        # Jobs taken out of order stay in the other structure; skip them lazily
+        while self._arrivals and self._arrivals[0].dispatched:
+            self._arrivals.popleft()
+        while self._heap and self._heap[0][2].dispatched:
+            heapq.heappop(self._heap)
+
+        # Starvation protection: the oldest job goes first once it waited too long
+        if self._arrivals and time.monotonic() - self._arrivals[0].enqueued_at >= self.max_wait:
+            return self._arrivals.popleft()
+        if self._heap:
+            return heapq.heappop(self._heap)[2]
+        return None
+
+    async def _execute(self, job):
+        try:
+            await run_ai_analysis(job.upload_id)
+            if not job.future.done():
+                job.future.set_result(None)
+        except Exception as e:
+            if not job.future.done():
+                job.future.set_exception(e)
+                # Retrieved even if the waiter is cancelled before it awaits the future
+                job.future.add_done_callback(lambda future: future.exception())
+        finally:
+            self.running -= 1
+            if not self.running and not self._heap:
+                # Idle; old finish tags no longer matter
+                self._last_finish.clear()
+            self._dispatch()
+
+    def stats(self):
+        """Queue depth and wait-time percentiles (seconds) per priority class."""
+        stats = {}
+        for priority_class in self.weights:
+            waits = sorted(self._waits[priority_class])
+            stats[priority_class] = {
+                'queued': self._pending[priority_class],
+                'samples': len(waits),
+                **{
+                    f"p{percentile}": round(waits[min(len(waits) - 1, len(waits) * percentile // 100)], 3) if waits else None
+                    for percentile in (50, 90, 99)
+                },
+            }
+        return {'running': self.running, 'concurrency': self.concurrency, 'classes': stats}
+
+
+# asyncio primitives belong to one event loop, so each loop gets its own scheduler
+_schedulers = weakref.WeakKeyDictionary()
+
+
+def get_scheduler():
+    """The analysis scheduler for the running event loop."""
+    loop = asyncio.get_running_loop()
+    scheduler = _schedulers.get(loop)
+    if scheduler is None:
+        scheduler = _schedulers[loop] = AnalysisScheduler(
+            concurrency=settings.RESUME_ANALYSIS_CONCURRENCY,
+            weights=settings.RESUME_ANALYSIS_CLASS_WEIGHTS,
+            max_wait=settings.RESUME_ANALYSIS_MAX_WAIT_SECONDS,
+        )
+    return scheduler
@@ -1,40 +1,116 @@
 import os
 import io
+import re
+import json
+import time
 import asyncio
-import google.generativeai as genai
-from PyPDF2 import PdfReader
+import hashlib
+import unicodedata
 
-class GeminiResumeAnalysisService:
+from resume_platform.warmup import gemini, pdf_reader
+from resumebuilder.skill_extraction import get_skill_extractor
+from .models import AnalysisResult, ExtractedResumeText
+
+
+class ResumeTextExtractionService:
     """
-    A service class to handle all interactions with the Google Gemini API
-    for resume analysis.
+    Extracts normalized text from uploaded PDFs and stores it so each file
+    is only downloaded and parsed once.
     """
 
-    def __init__(self):
-        # Configure the Gemini API client from the environment variable.
-        # This will be called once when the service is instantiated.
-        api_key = os.environ.get('GOOGLE_API_KEY')
-        if not api_key:
-            raise ValueError("GOOGLE_API_KEY environment variable not set.")
-        genai.configure(api_key=api_key)
-
-    def _extract_text_from_pdf(self, pdf_file_content: bytes) -> str:
+    def extract(self, pdf_file_content: bytes) -> dict:
         """
-        Extracts raw text content from the bytes of a PDF file.
+        Extracts and normalizes the text of a PDF, with page count and timing.
         This is a synchronous, CPU-bound operation.
         """
+        started = time.perf_counter()
         text = ""
+        page_count = 0
         try:
             # Create a file-like object from the bytes content
-            pdf_file = io.BytesIO(pdf_file_content)
-            reader = PdfReader(pdf_file)
-            for page in reader.pages:
-                text += page.extract_text() or ""
+            PdfReader = pdf_reader()
+            reader = PdfReader(io.BytesIO(pdf_file_content))
+            page_count = len(reader.pages)
+            text = "\n".join(page.extract_text() or "" for page in reader.pages)
         except Exception as e:
             # Handle potential PyPDF2 errors
             print(f"Error extracting PDF text: {e}")
-            return "" # Return empty string on failure
-        return text
+            text = ""
+
+        return {
+            'text': self.normalize_text(text),
+            'page_count': page_count,
+            'extraction_time_ms': (time.perf_counter() - started) * 1000,
+        }
+
+    @staticmethod
+    def normalize_text(text: str) -> str:
+        """Normalize unicode and whitespace while keeping the line structure."""
+        text = unicodedata.normalize('NFKC', text)
+        lines = (re.sub(r'[ \t]+', ' ', line).strip() for line in text.splitlines())
+        text = "\n".join(lines)
+        return re.sub(r'\n{3,}', '\n\n', text).strip()
+
+    @staticmethod
+    def hash_text(text: str) -> str:
+        """Return the SHA-256 hex digest used to identify a normalized text."""
+        return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+    async def get_or_extract(self, uploaded_resume) -> ExtractedResumeText:
+        """
+        Return the stored text for an upload, reading and parsing the
+        original file only the first time.
+        """
+        extracted = await ExtractedResumeText.objects.filter(uploaded_resume=uploaded_resume).afirst()
+        if extracted is not None:
+            return extracted
+
+        # Reading from storage and parsing the PDF don't touch the database,
+        # so they run in the default executor instead of the sync thread.
+        loop = asyncio.get_running_loop()
+        file_content = await loop.run_in_executor(None, self._read_file, uploaded_resume)
+        result = await loop.run_in_executor(None, self.extract, file_content)
+        result['skills'] = await loop.run_in_executor(None, get_skill_extractor().extract, result['text'])
+        return await self._store(uploaded_resume, result)
+
+    def _read_file(self, uploaded_resume) -> bytes:
+        """Read the original file from storage."""
+        with uploaded_resume.original_file.open('rb') as f:
+            return f.read()
+
+    async def _store(self, uploaded_resume, result: dict) -> ExtractedResumeText:
+        """Persist an extraction result, keeping the first one if two race."""
+        extracted, _ = await ExtractedResumeText.objects.aget_or_create(
+            uploaded_resume=uploaded_resume,
+            defaults={
+                'text': result['text'],
+                'text_hash': self.hash_text(result['text']),
+                'page_count': result['page_count'],
+                'skills': result.get('skills', []),
+                'extraction_time_ms': result['extraction_time_ms'],
+            }
+        )
+        return extracted
+
+
+class GeminiResumeAnalysisService:
+    """
+    A service class to handle all interactions with the Google Gemini API
+    for resume analysis.
+    """
+
+    # Bump PROMPT_VERSION whenever the analysis prompt changes so cached
+    # results from the previous prompt are no longer served.
+    PROMPT_VERSION = 'v1'
+    MODEL_NAME = 'gemini-1.5-flash'
+
+    def __init__(self):
+        # Configure the Gemini API client from the environment variable.
+        # This will be called once when the service is instantiated.
+        api_key = os.environ.get('GOOGLE_API_KEY')
+        if not api_key:
+            raise ValueError("GOOGLE_API_KEY environment variable not set.")
+        gemini().configure(api_key=api_key)
 
     def _get_analysis_prompt(self, resume_text: str) -> str:
         """
@@ -64,20 +140,54 @@ class GeminiResumeAnalysisService:
 
     async def analyze_resume(self, pdf_file_content: bytes) -> dict:
         """
-        The main public method to perform the full resume analysis.
+        Performs the full resume analysis on the raw bytes of a PDF.
         It orchestrates text extraction and the async API call.
         """
         # Step 1: Extract text from the PDF. This is synchronous.
         loop = asyncio.get_running_loop()
-        resume_text = await loop.run_in_executor(
-            None, self._extract_text_from_pdf, pdf_file_content
+        extraction = await loop.run_in_executor(
+            None, ResumeTextExtractionService().extract, pdf_file_content
         )
+        return await self.analyze_text(extraction['text'])
+
+    @classmethod
+    async def get_cached_analysis(cls, text_hash: str):
+        """
+        Returns the stored analysis for this text under the current prompt
+        version and model, or None. Doesn't need an API key.
+        """
+        return await AnalysisResult.objects.filter(
+            text_hash=text_hash,
+            prompt_version=cls.PROMPT_VERSION,
+            model_name=cls.MODEL_NAME
+        ).values_list('results', flat=True).afirst()
 
+    async def analyze_extracted(self, extracted: ExtractedResumeText) -> dict:
+        """
+        Analyzes stored resume text and caches a successful result under the
+        current prompt version and model. Check get_cached_analysis first.
+        """
+        analysis_results = await self.analyze_text(extracted.text)
+
+        # Only successful analyses are cached so failures can be retried
+        if 'error' not in analysis_results:
+            await AnalysisResult.objects.aget_or_create(
+                text_hash=extracted.text_hash,
+                prompt_version=self.PROMPT_VERSION,
+                model_name=self.MODEL_NAME,
+                defaults={'results': analysis_results}
+            )
+        return analysis_results
+
+    async def analyze_text(self, resume_text: str) -> dict:
+        """
+        Analyzes already extracted resume text with the Gemini API.
+        """
         if not resume_text:
             return {"error": "Could not extract text from the provided PDF."}
 
         # Step 2: Prepare the model and prompt
-        model = genai.GenerativeModel('gemini-1.5-flash')
+        model = gemini().GenerativeModel(self.MODEL_NAME)
         prompt = self._get_analysis_prompt(resume_text)
 
         # Step 3: Make the asynchronous API call to Gemini
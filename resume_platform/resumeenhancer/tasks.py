@@ -0,0 +1,64 @@
+from asgiref.sync import sync_to_async
+from django.utils import timezone
+
+from .heuristics import PROVISIONAL_KEY, LocalResumeAnalyzer
+from .models import UploadedResume
+from .services import GeminiResumeAnalysisService, ResumeTextExtractionService
+
+
+async def run_ai_analysis(upload_id):
+    """Run AI analysis on an uploaded resume asynchronously."""
+    uploads = UploadedResume.objects.filter(id=upload_id)
+    provisional = None
+    # Queryset updates skip auto_now, so every one sets updated_at itself
+
+    try:
+        # Claim the upload; a second run for the same upload finds nothing to do
+        if not await uploads.filter(status='pending').aupdate(status='processing', updated_at=timezone.now()):
+            return
+        uploaded_resume = await UploadedResume.objects.only('id', 'original_file').aget(id=upload_id)
+
+        # The file is only downloaded and parsed the first time; later
+        # runs read the stored text.
+        extracted = await ResumeTextExtractionService().get_or_extract(uploaded_resume)
+
+        # Results already computed for this text, prompt version and model
+        # are served from the cache without calling the AI.
+        analysis_results = await GeminiResumeAnalysisService.get_cached_analysis(extracted.text_hash)
+        if analysis_results is None:
+            # Store a local heuristic result the status view can show while
+            # the AI analysis is in flight. The AI result replaces it. Scoring
+            # is CPU work, so it stays off the event loop.
+            provisional = await sync_to_async(LocalResumeAnalyzer().analyze, thread_sensitive=False)(
+                extracted.text, extracted.page_count
+            )
+            provisional['skills'] = [skill['name'] for skill in extracted.skills]
+            await uploads.filter(status='processing').aupdate(
+                analysis_results={PROVISIONAL_KEY: provisional}, updated_at=timezone.now()
+            )
+
+            analysis_service = GeminiResumeAnalysisService()
+            analysis_results = await analysis_service.analyze_extracted(extracted)
+            if 'error' in analysis_results:
+                analysis_results = {**analysis_results, PROVISIONAL_KEY: provisional}
+
+        # Update with results, only if nothing else has taken over the upload
+        await uploads.filter(status='processing').aupdate(
+            analysis_results=analysis_results,
+            prompt_version=GeminiResumeAnalysisService.PROMPT_VERSION,
+            status='complete' if 'error' not in analysis_results else 'failed',
+            updated_at=timezone.now()
+        )
+
+    except Exception as e:
+        print(f"Analysis failed for upload_id {upload_id}: {e}")
+        try:
+            analysis_results = {'error': str(e)}
+            if provisional:
+                analysis_results[PROVISIONAL_KEY] = provisional
+            # Leave the upload alone if another run or a reanalyze has taken it over
+            await uploads.filter(status='processing').aupdate(
+                status='failed', analysis_results=analysis_results, updated_at=timezone.now()
+            )
+        except Exception:
+            pass # If we can't save the error, log it in a real app
@@ -1,3 +1,201 @@
-from django.test import TestCase
+import shutil
+import tempfile
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
 
-# Create your tests here.
+from users.models import CustomUser
+from .models import ExtractedResumeText, UploadedResume
+from .retention import S3_DELETE_LIMIT, RetentionPolicy, delete_files
+
+RETENTION_DAYS = {'premium': 365, 'default': 90, 'failed': 14}
+
+
+@override_settings(UPLOAD_RETENTION_DAYS=RETENTION_DAYS)
+class RetentionTests(TestCase):
+    """Expiry and purging against a local FileSystemStorage standing in for S3."""
+
+    def setUp(self):
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media)
+        storage = override_settings(STORAGES={
+            'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage', 'OPTIONS': {'location': media}},
+            'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+        })
+        storage.enable()
+        self.addCleanup(storage.disable)
+
+        self.free = CustomUser.objects.create(username='free', subscription_status='free')
+        self.premium = CustomUser.objects.create(username='premium', subscription_status='premium')
+
+    def upload(self, user, days_old, status='complete'):
+        upload = UploadedResume(user=user, status=status)
+        upload.original_file.save('resume.pdf', ContentFile(b'%PDF-1.4'), save=False)
+        upload.save()
+        UploadedResume.objects.filter(pk=upload.pk).update(created_at=timezone.now() - timedelta(days=days_old))
+        return upload
+
+    def purge(self, *args):
+        out = StringIO()
+        call_command('purge_expired_uploads', '--rate', '100000', *args, stdout=out)
+        return out.getvalue()
+
+    def remaining(self):
+        return set(UploadedResume.objects.values_list('pk', flat=True))
+
+    def test_cutoffs_per_plan_and_for_failed_uploads(self):
+        expired = {
+            self.upload(self.free, 100).pk,
+            self.upload(self.premium, 400).pk,
+            self.upload(self.free, 20, status='failed').pk,
+            self.upload(self.premium, 20, status='failed').pk,
+        }
+        kept = {
+            self.upload(self.free, 80).pk,
+            self.upload(self.premium, 100).pk,
+            self.upload(self.free, 10, status='failed').pk,
+            # Never collected while queued or being analyzed
+            self.upload(self.free, 400, status='processing').pk,
+        }
+
+        self.assertEqual(set(RetentionPolicy().expired_uploads().values_list('pk', flat=True)), expired)
+        self.purge()
+        self.assertEqual(self.remaining(), kept)
+
+    def test_files_are_deleted_with_their_rows(self):
+        expired = self.upload(self.free, 100)
+        kept = self.upload(self.free, 10)
+        storage = expired.original_file.storage
+
+        self.purge()
+        self.assertFalse(storage.exists(expired.original_file.name))
+        self.assertTrue(storage.exists(kept.original_file.name))
+
+    def test_dry_run_deletes_nothing(self):
+        upload = self.upload(self.free, 100)
+
+        self.assertIn('1 uploads would be deleted', self.purge('--dry-run'))
+        self.assertEqual(self.remaining(), {upload.pk})
+        self.assertTrue(upload.original_file.storage.exists(upload.original_file.name))
+
+    def test_limit_stops_early_and_the_next_run_resumes(self):
+        uploads = [self.upload(self.free, 100 + index).pk for index in range(5)]
+
+        self.purge('--limit', '2', '--batch-size', '1')
+        self.assertEqual(len(self.remaining()), 3)
+        # Oldest first
+        self.assertEqual(self.remaining(), set(uploads[:3]))
+
+        self.purge('--batch-size', '2')
+        self.assertEqual(self.remaining(), set())
+
+    def test_rows_whose_file_was_not_deleted_are_kept(self):
+        stuck = self.upload(self.free, 100)
+        self.upload(self.free, 101)
+
+        with mock.patch(
+            'resumeenhancer.management.commands.purge_expired_uploads.delete_files',
+            return_value=[stuck.original_file.name],
+        ):
+            out = self.purge()
+
+        self.assertEqual(self.remaining(), {stuck.pk})
+        self.assertIn('Kept 1 uploads', out)
+
+
+class FakeBucket:
+    def __init__(self, failing):
+        self.failing = failing
+        self.requests = []
+
+    def delete_objects(self, Delete):
+        keys = [entry['Key'] for entry in Delete['Objects']]
+        self.requests.append(keys)
+        return {'Errors': [
+            {'Key': key, 'Code': 'AccessDenied', 'Message': 'Access Denied'} for key in keys if key in self.failing
+        ]}
+
+
+class FakeS3Storage:
+    location = 'media'
+
+    def __init__(self, bucket):
+        self.bucket = bucket
+
+    def _normalize_name(self, name):
+        return f"{self.location}/{name}"
+
+
+class DeleteFilesTests(SimpleTestCase):
+    def test_s3_errors_are_returned_as_failed_names(self):
+        bucket = FakeBucket(failing={'media/uploads/b.pdf'})
+
+        failed = delete_files(FakeS3Storage(bucket), ['uploads/a.pdf', 'uploads/b.pdf'])
+
+        self.assertEqual(failed, ['uploads/b.pdf'])
+        self.assertEqual(bucket.requests, [['media/uploads/a.pdf', 'media/uploads/b.pdf']])
+
+    def test_one_request_per_s3_delete_limit(self):
+        bucket = FakeBucket(failing=set())
+        names = [f'uploads/{index}.pdf' for index in range(S3_DELETE_LIMIT + 1)]
+
+        self.assertEqual(delete_files(FakeS3Storage(bucket), names), [])
+        self.assertEqual([len(keys) for keys in bucket.requests], [S3_DELETE_LIMIT, 1])
+
+
+@override_settings(AI_QUOTA_RATES={'resume-analysis': {'default': '3/day'}})
+class AnalysisQuotaTests(TestCase):
+    """Only requests that reach the AI keep the analysis quota they were charged."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = CustomUser.objects.create(username='analyst', subscription_status='free')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.upload = UploadedResume.objects.create(user=self.user, original_file='resume.pdf', status='complete')
+        ExtractedResumeText.objects.create(uploaded_resume=self.upload, text='Python', text_hash='hash')
+
+    def remaining(self, response):
+        return int(response['X-RateLimit-Remaining'])
+
+    def reanalyze(self, upload_id, cached=None):
+        with mock.patch(
+            'resumeenhancer.views.GeminiResumeAnalysisService.get_cached_analysis',
+            mock.AsyncMock(return_value=cached),
+        ), mock.patch('resumeenhancer.views.get_scheduler'):
+            return self.client.post(f'/api/enhancer/reanalyze/{upload_id}/')
+
+    def test_rejected_uploads_are_refunded(self):
+        for _ in range(4):
+            response = self.client.post('/api/enhancer/upload/', {}, format='multipart')
+            self.assertEqual(response.status_code, 400)
+            self.assertEqual(self.remaining(response), 3)
+
+    def test_missing_and_busy_uploads_are_refunded(self):
+        self.assertEqual(self.remaining(self.reanalyze(self.upload.pk + 1)), 3)
+
+        UploadedResume.objects.filter(pk=self.upload.pk).update(status='processing')
+        response = self.reanalyze(self.upload.pk)
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(self.remaining(response), 3)
+
+    def test_cached_analyses_are_refunded(self):
+        response = self.reanalyze(self.upload.pk, cached={'score': 80})
+
+        self.assertTrue(response.data['cached'])
+        self.assertEqual(self.remaining(response), 3)
+
+    def test_queued_analyses_are_charged(self):
+        response = self.reanalyze(self.upload.pk)
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(self.remaining(response), 2)
+
+        # Refunds leave the charged units in place
+        response = self.reanalyze(self.upload.pk + 1)
+        self.assertEqual(self.remaining(response), 2)
@@ -1,9 +1,16 @@
 from django.urls import path
-from .views import ResumeUploadView, ResumeStatusView
+from .views import (
+    ResumeUploadView, ResumeStatusView, BatchResumeUploadView, BatchStatusView, ResumeReanalyzeView,
+    AnalysisQueueStatsView
+)
 
 app_name = 'resumeenhancer'
 
 urlpatterns = [
     path('upload/', ResumeUploadView.as_view(), name='resume-upload'),
     path('status/<int:upload_id>/', ResumeStatusView.as_view(), name='resume-status'),
+    path('reanalyze/<int:upload_id>/', ResumeReanalyzeView.as_view(), name='resume-reanalyze'),
+    path('batch-upload/', BatchResumeUploadView.as_view(), name='batch-upload'),
+    path('batch-status/<uuid:batch_id>/', BatchStatusView.as_view(), name='batch-status'),
+    path('queue-stats/', AnalysisQueueStatsView.as_view(), name='queue-stats'),
 ]
\ No newline at end of file
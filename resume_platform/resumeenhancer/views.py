@@ -1,43 +1,59 @@
 import asyncio
 from django.conf import settings # Import settings
+from django.db import transaction
+from django.db.models import Count
 from django.http import JsonResponse
+from django.utils import timezone
 from rest_framework.views import APIView
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import IsAuthenticated, IsAdminUser
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.parsers import MultiPartParser
 from asgiref.sync import sync_to_async
 import json
 
-from .models import UploadedResume
-from .services import GeminiResumeAnalysisService # <-- IMPORT THE NEW SERVICE
+from resume_platform.async_views import AsyncAPIView
+from resume_platform.idempotency import IdempotencyMixin
+from resume_platform.quotas import AIQuotaThrottle, QuotaRefundMixin
+from .heuristics import PROVISIONAL_KEY
+from .models import UploadBatch, UploadedResume
+from .preflight import PdfPreflightHandler, match_uploads
+from .scheduling import get_scheduler
+from .services import GeminiResumeAnalysisService
 
-class ResumeUploadView(APIView):
+
+class ResumeUploadView(IdempotencyMixin, QuotaRefundMixin, AsyncAPIView):
     """Async view for handling resume file uploads."""
 
     permission_classes = [IsAuthenticated]
     parser_classes = [MultiPartParser]
+    throttle_classes = [AIQuotaThrottle]
+    throttle_scope = 'resume-analysis'
+
+    def initialize_request(self, request, *args, **kwargs):
+        # Check files as they stream in, before Django's handlers buffer them
+        request.upload_handlers.insert(0, PdfPreflightHandler(request))
+        return super().initialize_request(request, *args, **kwargs)
 
     async def post(self, request):
         """Handle resume file upload asynchronously."""
         try:
-            if 'file' not in request.FILES:
+            uploads = match_uploads(request, 'file')
+            if not uploads:
                 return Response({'error': 'No file provided'}, status=status.HTTP_400_BAD_REQUEST)
 
-            uploaded_file = request.FILES['file']
+            uploaded_file, report = uploads[0]
 
-            if not uploaded_file.name.lower().endswith('.pdf'):
-                return Response({'error': 'Only PDF files are supported'}, status=status.HTTP_400_BAD_REQUEST)
-
-            if uploaded_file.size > 10 * 1024 * 1024:
-                return Response({'error': 'File size must be less than 10MB'}, status=status.HTTP_400_BAD_REQUEST)
+            error = await self._validate_file(uploaded_file, report)
+            if error:
+                return Response({'error': error}, status=status.HTTP_400_BAD_REQUEST)
 
             # Create the DB entry first. It now saves the file directly to S3
             # because of our settings.py configuration.
             uploaded_resume = await self._create_uploaded_resume(request.user, uploaded_file)
 
             # Start AI analysis in the background
-            asyncio.create_task(self._run_ai_analysis(uploaded_resume.id))
+            get_scheduler().submit(uploaded_resume.id, request.user)
 
             return Response({
                 'upload_id': uploaded_resume.id,
@@ -50,51 +66,167 @@ class ResumeUploadView(APIView):
             print(f"Upload failed: {e}")
             return Response({'error': 'An unexpected error occurred during upload.'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
-    @sync_to_async
-    def _create_uploaded_resume(self, user, file):
-        """Create UploadedResume object synchronously."""
-        # This function is now simpler because sync_to_async is a decorator
-        return UploadedResume.objects.create(
+    async def _validate_file(self, uploaded_file, report):
+        """
+        Return an error message if the file can't be accepted, else None.
+        Runs before anything is stored or queued: the streaming checks have
+        already looked at the name, size, header and trailer, and a file that
+        passed them is parsed for encryption, page count and a text layer.
+        """
+        if report.error is None:
+            await sync_to_async(report.inspect, thread_sensitive=False)(uploaded_file)
+        return report.error
+
+    async def _create_uploaded_resume(self, user, file):
+        """Create the UploadedResume row, saving the file to storage."""
+        return await UploadedResume.objects.acreate(
             user=user,
             original_file=file,
             status='pending'
         )
 
-    async def _run_ai_analysis(self, upload_id):
-        """Run AI analysis on uploaded resume asynchronously."""
-        get_resume = sync_to_async(UploadedResume.objects.get)
-        save_resume = sync_to_async(lambda r: r.save()) # Use a lambda for saving
+    async def _run_ai_analysis(self, upload_id, user):
+        """Queue the AI analysis of an uploaded resume behind other users' fair share."""
+        await get_scheduler().run(upload_id, user)
+
+
+class BatchResumeUploadView(ResumeUploadView):
+    """Async view for uploading many resumes in a single request."""
 
+    def get_quota_cost(self, request):
+        """Each file in the batch counts against the analysis quota."""
+        return max(len(request.FILES.getlist('files')), 1)
+
+    async def post(self, request):
+        """Store every file, create the rows in bulk and fan out the analyses."""
         try:
-            uploaded_resume = await get_resume(id=upload_id)
-            uploaded_resume.status = 'processing'
-            await save_resume(uploaded_resume)
+            uploads = match_uploads(request, 'files')
+            if not uploads:
+                return Response({'error': 'No files provided'}, status=status.HTTP_400_BAD_REQUEST)
+
+            if len(uploads) > settings.RESUME_BATCH_MAX_FILES:
+                return Response(
+                    {'error': f'A batch may contain at most {settings.RESUME_BATCH_MAX_FILES} files'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
 
-            # Read the file content directly from S3 storage
-            file_content = uploaded_resume.original_file.read()
+            # Reject the whole batch before anything is written to storage
+            errors = {}
+            for uploaded_file, report in uploads:
+                error = await self._validate_file(uploaded_file, report)
+                if error:
+                    errors[report.file_name] = error
+            if errors:
+                return Response({'error': 'Some files were rejected', 'files': errors}, status=status.HTTP_400_BAD_REQUEST)
 
-            # --- USE THE NEW SERVICE ---
-            # Instantiate our service and call the analysis method
-            analysis_service = GeminiResumeAnalysisService()
-            analysis_results = await analysis_service.analyze_resume(file_content)
+            stored_names = await self._store_files([uploaded_file for uploaded_file, _ in uploads])
+            try:
+                batch, uploaded_resumes = await self._create_batch(request.user, stored_names)
+            except Exception:
+                # No row points at the stored files, so nothing would ever delete them
+                await self._delete_files(stored_names)
+                raise
+
+            # Queue the analyses in the background; they share the workers fairly
+            get_scheduler().spawn(self._run_batch_analysis([r.id for r in uploaded_resumes], request.user))
 
-            # Update with results
-            uploaded_resume.analysis_results = analysis_results
-            uploaded_resume.status = 'complete' if 'error' not in analysis_results else 'failed'
-            await save_resume(uploaded_resume)
+            return Response({
+                'batch_id': str(batch.id),
+                'upload_ids': [r.id for r in uploaded_resumes],
+                'total_files': batch.total_files,
+                'status': 'pending',
+                'message': 'Files uploaded successfully. AI analysis started.'
+            }, status=status.HTTP_201_CREATED)
 
         except Exception as e:
-            print(f"Analysis failed for upload_id {upload_id}: {e}")
+            print(f"Batch upload failed: {e}")
+            return Response({'error': 'An unexpected error occurred during upload.'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+    async def _store_files(self, uploaded_files):
+        """Stream each file to storage, a bounded number at a time, and return the stored names."""
+        file_field = UploadedResume._meta.get_field('original_file')
+        semaphore = asyncio.Semaphore(settings.RESUME_ANALYSIS_CONCURRENCY)
+
+        # Storage writes don't touch the database, so they can leave the
+        # shared sync thread and upload in parallel.
+        store = sync_to_async(file_field.storage.save, thread_sensitive=False)
+
+        async def store_one(uploaded_file):
+            async with semaphore:
+                name = file_field.generate_filename(None, uploaded_file.name)
+                return await store(name, uploaded_file, max_length=file_field.max_length)
+
+        results = await asyncio.gather(*(store_one(f) for f in uploaded_files), return_exceptions=True)
+        errors = [result for result in results if isinstance(result, BaseException)]
+        if errors:
+            await self._delete_files([result for result in results if not isinstance(result, BaseException)])
+            raise errors[0]
+        return results
+
+    async def _delete_files(self, stored_names):
+        """Remove files stored for a batch that could not be created."""
+        storage = UploadedResume._meta.get_field('original_file').storage
+        delete = sync_to_async(storage.delete, thread_sensitive=False)
+        for name in stored_names:
             try:
-                # Try to fetch the object again to update its status to failed
-                failed_resume = await get_resume(id=upload_id)
-                failed_resume.status = 'failed'
-                failed_resume.analysis_results = {'error': str(e)}
-                await save_resume(failed_resume)
-            except:
-                pass # If we can't save the error, log it in a real app
-
-class ResumeStatusView(APIView):
+                await delete(name)
+            except Exception as e:
+                print(f"Could not delete orphaned upload {name}: {e}")
+
+    # The async ORM can't run transactions, so this stays in the sync thread
+    @sync_to_async
+    def _create_batch(self, user, stored_names):
+        """Create the batch and all of its UploadedResume rows in one transaction."""
+        with transaction.atomic():
+            batch = UploadBatch.objects.create(user=user, total_files=len(stored_names))
+            uploaded_resumes = UploadedResume.objects.bulk_create([
+                UploadedResume(user=user, batch=batch, original_file=name, status='pending')
+                for name in stored_names
+            ])
+        return batch, uploaded_resumes
+
+    async def _run_batch_analysis(self, upload_ids, user):
+        """Queue every upload in the batch; the scheduler bounds the parallelism."""
+        await asyncio.gather(*(self._run_ai_analysis(upload_id, user) for upload_id in upload_ids))
+
+
+class BatchStatusView(AsyncAPIView):
+    """View to check the aggregate progress of a batch upload."""
+
+    permission_classes = [IsAuthenticated]
+
+    async def get(self, request, batch_id):
+        """Return per-status counts for the batch from a single aggregate query."""
+        try:
+            batch, counts = await self._get_progress(batch_id, request.user)
+        except UploadBatch.DoesNotExist:
+            return Response({'error': 'Batch not found'}, status=status.HTTP_404_NOT_FOUND)
+
+        finished = counts['complete'] + counts['failed']
+        return Response({
+            'batch_id': str(batch.id),
+            'total_files': batch.total_files,
+            'counts': counts,
+            'finished': finished,
+            'is_complete': finished >= batch.total_files,
+        }, status=status.HTTP_200_OK)
+
+    async def _get_progress(self, batch_id, user):
+        """Load the batch and count its uploads by status."""
+        batch = await UploadBatch.objects.aget(id=batch_id, user=user)
+        counts = {key: 0 for key, _ in UploadedResume.STATUS_CHOICES}
+        rows = (
+            UploadedResume.objects.filter(batch=batch)
+            .order_by()
+            .values('status')
+            .annotate(count=Count('id'))
+        )
+        async for row in rows:
+            counts[row['status']] = row['count']
+        return batch, counts
+
+
+class ResumeStatusView(AsyncAPIView):
     """View to check the status of uploaded resume analysis."""
 
     permission_classes = [IsAuthenticated]
@@ -102,8 +234,9 @@ class ResumeStatusView(APIView):
     async def get(self, request, upload_id):
         """Get the current status of resume analysis asynchronously."""
         try:
-            get_resume = sync_to_async(UploadedResume.objects.get)
-            uploaded_resume = await get_resume(id=upload_id, user=request.user)
+            uploaded_resume = await UploadedResume.objects.only(
+                'id', 'status', 'analysis_results'
+            ).aget(id=upload_id, user=request.user)
 
             response_data = {
                 'upload_id': uploaded_resume.id,
@@ -112,8 +245,81 @@ class ResumeStatusView(APIView):
 
             if uploaded_resume.status == 'complete' and uploaded_resume.analysis_results:
                 response_data['analysis_results'] = uploaded_resume.analysis_results
+            elif uploaded_resume.analysis_results and PROVISIONAL_KEY in uploaded_resume.analysis_results:
+                # The AI result isn't available (yet); show the local one
+                response_data['provisional_results'] = uploaded_resume.analysis_results[PROVISIONAL_KEY]
 
             return Response(response_data, status=status.HTTP_200_OK)
 
         except UploadedResume.DoesNotExist:
-            return Response({'error': 'Upload not found'}, status=status.HTTP_404_NOT_FOUND)
\ No newline at end of file
+            return Response({'error': 'Upload not found'}, status=status.HTTP_404_NOT_FOUND)
+
+
+class ResumeReanalyzeView(QuotaRefundMixin, AsyncAPIView):
+    """View to re-run the analysis of an existing upload with the current prompt."""
+
+    permission_classes = [IsAuthenticated]
+    throttle_classes = [AIQuotaThrottle]
+    throttle_scope = 'resume-analysis'
+
+    def is_quota_refunded(self, response):
+        """A cached analysis didn't call the AI either."""
+        return super().is_quota_refunded(response) or response.data.get('cached') is True
+
+    async def post(self, request, upload_id):
+        """Serve a cached analysis immediately or queue a fresh one."""
+        try:
+            uploaded_resume = await UploadedResume.objects.select_related(
+                'extracted_text'
+            ).aget(id=upload_id, user=request.user)
+        except UploadedResume.DoesNotExist:
+            return Response({'error': 'Upload not found'}, status=status.HTTP_404_NOT_FOUND)
+
+        if not uploaded_resume.is_processing_complete:
+            return Response({'error': 'Analysis already in progress'}, status=status.HTTP_409_CONFLICT)
+
+        prompt_version = GeminiResumeAnalysisService.PROMPT_VERSION
+        extracted = getattr(uploaded_resume, 'extracted_text', None)
+        if extracted is not None:
+            cached = await GeminiResumeAnalysisService.get_cached_analysis(extracted.text_hash)
+            if cached is not None:
+                await UploadedResume.objects.filter(id=upload_id).aupdate(
+                    analysis_results=cached,
+                    prompt_version=prompt_version,
+                    status='complete',
+                    updated_at=timezone.now()
+                )
+                return Response({
+                    'upload_id': upload_id,
+                    'status': 'complete',
+                    'prompt_version': prompt_version,
+                    'cached': True,
+                    'analysis_results': cached,
+                }, status=status.HTTP_200_OK)
+
+        # Only one request can move a finished upload back to pending
+        queued = await UploadedResume.objects.filter(
+            id=upload_id, status__in=['complete', 'failed']
+        ).aupdate(status='pending', updated_at=timezone.now())
+        if not queued:
+            return Response({'error': 'Analysis already in progress'}, status=status.HTTP_409_CONFLICT)
+
+        get_scheduler().submit(upload_id, request.user)
+
+        return Response({
+            'upload_id': upload_id,
+            'status': 'pending',
+            'prompt_version': prompt_version,
+            'cached': False,
+            'message': 'Re-analysis started.'
+        }, status=status.HTTP_202_ACCEPTED)
+
+
+class AnalysisQueueStatsView(AsyncAPIView):
+    """View exposing the analysis queue of this worker process."""
+
+    permission_classes = [IsAdminUser]
+
+    async def get(self, request):
+        """Return queue depth and queue-wait percentiles per priority class."""
+        return Response(get_scheduler().stats(), status=status.HTTP_200_OK)
@@ -0,0 +1,59 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import router
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+
+# Fields known from a trusted token; everything else is deferred
+CLAIM_FIELDS = ('subscription_status', 'auth_version')
+
+
+def current_auth_version(user_id):
+    """The user's auth_version, cached for AUTH_VERSION_CACHE_SECONDS; None if there is no such user."""
+    User = get_user_model()
+    key = User.auth_version_cache_key(user_id)
+    version = cache.get(key)
+    if version is None:
+        version = User.objects.filter(pk=user_id).values_list('auth_version', flat=True).first()
+        if version is not None:
+            cache.set(key, version, settings.AUTH_VERSION_CACHE_SECONDS)
+    return version
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """
+    JWT authentication that builds the user from the token's claims.
+
+    Tokens issued with subscription_status and auth_version claims are
+    trusted while auth_version matches the user's current one, which is a
+    cache read. The user is then a model instance with only its id, active
+    flag and claimed fields loaded; other fields load from the database on
+    first access, so only views that need the full user pay for it.
+    Saving a change to the subscription, password or active flag bumps
+    auth_version and clears the cached value. QuerySet.update() bypasses
+    save(), so an update of those fields must also set
+    auth_version=F('auth_version') + 1; tokens then stop being trusted once
+    the cached version expires, within AUTH_VERSION_CACHE_SECONDS. Tokens
+    without the claims, or with a stale version, fall back to loading the
+    user.
+    """
+
+    def get_user(self, validated_token):
+        if not all(claim in validated_token for claim in CLAIM_FIELDS):
+            return super().get_user(validated_token)
+
+        user_id = validated_token.get(jwt_settings.USER_ID_CLAIM)
+        if user_id is None or current_auth_version(user_id) != validated_token['auth_version']:
+            return super().get_user(validated_token)
+
+        User = self.user_model
+        known = {
+            User._meta.get_field(jwt_settings.USER_ID_FIELD).attname: user_id,
+            # Deactivation bumps auth_version, so a matching version means still active
+            'is_active': True,
+            **{claim: validated_token[claim] for claim in CLAIM_FIELDS},
+        }
+        # from_db takes the loaded values in the model's field order
+        field_names = [field.attname for field in User._meta.concrete_fields if field.attname in known]
+        return User.from_db(router.db_for_read(User), field_names, [known[name] for name in field_names])
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.3 on 2026-10-19 17:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customuser',
+            name='auth_version',
+            field=models.PositiveIntegerField(default=0, help_text="Bumped when the subscription, password or active flag changes, so older tokens' claims are no longer trusted"),
+        ),
+    ]
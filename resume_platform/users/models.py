@@ -1,5 +1,6 @@
 from django.contrib.auth.models import AbstractUser
-from django.db import models
+from django.core.cache import cache
+from django.db import models, transaction
 
 
 class CustomUser(AbstractUser):
@@ -25,9 +26,44 @@ class CustomUser(AbstractUser):
         help_text="Current subscription status"
     )
     
+    auth_version = models.PositiveIntegerField(
+        default=0,
+        help_text="Bumped when the subscription, password or active flag changes, so older tokens' claims are no longer trusted"
+    )
+    
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    # Fields whose values are carried in, or vouched for by, issued tokens
+    AUTH_FIELDS = ('subscription_status', 'password', 'is_active')
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_auth_fields = {
+            field: instance.__dict__[field] for field in cls.AUTH_FIELDS if field in instance.__dict__
+        }
+        return instance
+    
+    def save(self, *args, **kwargs):
+        """Bump auth_version when a field that tokens rely on changed."""
+        loaded = getattr(self, '_loaded_auth_fields', {})
+        if any(self.__dict__.get(field, value) != value for field, value in loaded.items()):
+            self.auth_version += 1
+            update_fields = kwargs.get('update_fields')
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'auth_version'}
+            user_id = self.pk
+            transaction.on_commit(lambda: cache.delete(self.auth_version_cache_key(user_id)))
+        super().save(*args, **kwargs)
+        self._loaded_auth_fields = {
+            field: self.__dict__[field] for field in self.AUTH_FIELDS if field in self.__dict__
+        }
+    
+    @staticmethod
+    def auth_version_cache_key(user_id):
+        return f"auth-version:{user_id}"
+    
     def __str__(self):
         return f"{self.username} ({self.subscription_status})"
     
@@ -0,0 +1,40 @@
+from django.contrib.auth import get_user_model
+from dj_rest_auth.jwt_auth import CookieTokenRefreshSerializer
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+
+
+def add_auth_claims(token, user):
+    """Stamp the claims ClaimsJWTAuthentication answers permission checks from."""
+    token['subscription_status'] = user.subscription_status
+    token['auth_version'] = user.auth_version
+    return token
+
+
+class SubscriptionTokenObtainPairSerializer(TokenObtainPairSerializer):
+    """Issues token pairs carrying the user's subscription status and auth version."""
+
+    @classmethod
+    def get_token(cls, user):
+        # Access tokens minted from this refresh token copy its claims
+        return add_auth_claims(super().get_token(user), user)
+
+
+class SubscriptionTokenRefreshSerializer(CookieTokenRefreshSerializer):
+    """
+    Refreshes tokens with the user's current subscription status and auth
+    version, rather than the claims the refresh token was issued with.
+    """
+
+    def validate(self, attrs):
+        refresh = self.token_class(self.extract_refresh_token())
+        user = get_user_model().objects.filter(
+            **{jwt_settings.USER_ID_FIELD: refresh[jwt_settings.USER_ID_CLAIM]}
+        ).only('subscription_status', 'auth_version', 'is_active').first()
+        if user is None or not user.is_active:
+            raise InvalidToken('The user of this token no longer exists or is inactive.')
+
+        attrs['refresh'] = str(add_auth_claims(refresh, user))
+        # Rotation and blacklisting as usual; the cookie was already read
+        return TokenRefreshSerializer.validate(self, attrs)
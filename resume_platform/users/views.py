@@ -1,3 +1,9 @@
-from django.shortcuts import render
+from dj_rest_auth.jwt_auth import get_refresh_view
 
-# Create your views here.
+from .serializers import SubscriptionTokenRefreshSerializer
+
+
+class SubscriptionTokenRefreshView(get_refresh_view()):
+    """dj-rest-auth's refresh view, with cookie support, issuing re-stamped tokens."""
+
+    serializer_class = SubscriptionTokenRefreshSerializer